@@ -6,4 +6,4 @@ class DashboardConfig(AppConfig):
     name = "dashboard"
 
     def ready(self):
-        pass
+        from dashboard import notifications, stream  # noqa: F401
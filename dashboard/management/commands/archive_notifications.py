@@ -0,0 +1,52 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from dashboard import notifications
+
+
+class Command(BaseCommand):
+    help = (
+        "Move old notifications to the NotificationArchive table in batches "
+        "so the hot Notification table and its indexes stay small."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            default=90,
+            help="Archive notifications created more than this many days ago",
+        )
+        parser.add_argument(
+            "--before",
+            help="Archive notifications created before this date (YYYY-MM-DD); "
+            "overrides --older-than-days",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Notifications moved per transaction",
+        )
+
+    def handle(self, *args, **options):
+        if options["before"]:
+            try:
+                day = datetime.date.fromisoformat(options["before"])
+            except ValueError:
+                raise CommandError(f"Invalid date: {options['before']}")
+            before = datetime.datetime.combine(
+                day, datetime.time.min, tzinfo=timezone.get_current_timezone()
+            )
+        else:
+            before = timezone.now() - datetime.timedelta(
+                days=options["older_than_days"]
+            )
+
+        self.stdout.write(
+            self.style.NOTICE(f"🚀 Archiving notifications created before {before}...")
+        )
+        moved = notifications.archive(before, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"🎉 Archived {moved} notifications."))
@@ -2,6 +2,8 @@ from django.contrib.auth.models import User
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.db.models import Exists, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.urls import reverse
 from django.utils import timezone
 
@@ -31,7 +33,30 @@ class NotificationManager(models.Manager):
     def for_user(self, user):
         if user.is_superuser:
             return self.all()
-        return self.filter(user=user) | self.filter(user__isnull=True)
+        # One OR condition (not two ORed querysets) so both branches seek
+        # the partial unread index below.
+        return self.filter(Q(user=user) | Q(user__isnull=True))
+
+    def unread_for(self, user):
+        """
+        Notifications ``user`` has not read, in one query. Broadcasts (user
+        NULL) are shared rows, so whether this user read one comes from
+        their NotificationReadMark and BroadcastReceipt rows, not is_read.
+        """
+        read_through = Coalesce(
+            Subquery(
+                NotificationReadMark.objects.filter(user=user).values(
+                    "last_broadcast_id"
+                )
+            ),
+            0,
+        )
+        receipted = BroadcastReceipt.objects.filter(
+            user=user, notification=OuterRef("pk")
+        )
+        own = Q(user__isnull=False) if user.is_superuser else Q(user=user)
+        broadcast = Q(user__isnull=True, pk__gt=read_through) & Q(~Exists(receipted))
+        return self.filter(own | broadcast, is_read=False)
 
 
 # ---------------------------
@@ -41,7 +66,13 @@ class Notification(models.Model):
     class Meta:
         ordering = ["-created_at"]
         indexes = [
-            models.Index(fields=["user", "is_read"]),
+            # Unread notifications of a user (or broadcasts, user NULL),
+            # newest first: the dropdown and unread-count read path.
+            models.Index(
+                fields=["user", "-created_at"],
+                condition=models.Q(is_read=False),
+                name="notification_unread_idx",
+            ),
             models.Index(fields=["notification_type"]),
             models.Index(fields=["category"]),
             models.Index(fields=["created_at"]),
@@ -109,6 +140,10 @@ class Notification(models.Model):
     # 🔸 Helper Methods
     # ---------------------------
     def mark_as_read(self):
+        # Broadcasts are shared rows, read per user: see
+        # dashboard.notifications.mark_read.
+        if self.user_id is None:
+            raise ValueError("Broadcast notifications are marked read per user.")
         self.is_read = True
         self.save(update_fields=["is_read", "updated_at"])
 
@@ -120,3 +155,74 @@ class Notification(models.Model):
         return (
             f"[{self.category.upper()}] {self.notification_type} → {self.message[:50]}"
         )
+
+
+# ---------------------------
+# 🔹 Broadcast Read Receipts
+# ---------------------------
+class NotificationReadMark(models.Model):
+    """
+    High-water mark of the broadcasts a user has read: every broadcast with
+    ``id <= last_broadcast_id`` counts as read. Reads above the mark are
+    kept as BroadcastReceipt rows until the mark catches up with them.
+    """
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="+"
+    )
+    last_broadcast_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id} read broadcasts through #{self.last_broadcast_id}"
+
+
+class BroadcastReceipt(models.Model):
+    """A broadcast read by one user, above their NotificationReadMark."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    notification = models.ForeignKey(
+        Notification, on_delete=models.CASCADE, related_name="receipts"
+    )
+    read_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "notification"], name="unique_broadcast_receipt"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} read #{self.notification_id}"
+
+
+# ---------------------------
+# 🔹 Archive
+# ---------------------------
+class NotificationArchive(models.Model):
+    """
+    Notifications moved out of the hot table by dashboard.notifications.archive
+    (``python manage.py archive_notifications``). Keeps the original id.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    category = models.CharField(max_length=20)
+    notification_type = models.CharField(max_length=55)
+    message = models.TextField()
+    sent_at = models.DateTimeField(null=True, blank=True)
+    is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    content_type = models.ForeignKey(
+        ContentType, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    object_id = models.PositiveIntegerField(null=True, blank=True)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=["user", "created_at"])]
+
+    def __str__(self):
+        return f"Archived #{self.pk}: {self.notification_type}"
@@ -0,0 +1,332 @@
+"""
+Cached unread-notification summaries for the header dropdown.
+
+Each user's unread count and newest unread notifications are cached
+under a key made of generation counters, so rendering the base layout
+costs no notification query on a hit. A change to a user's own
+notification bumps that user's counter, a change to a broadcast (user
+NULL) bumps the broadcast counter, and every change bumps the "any"
+counter that superusers (who see all notifications) depend on.
+Counters are bumped after commit by the receivers below and by the
+read helpers. Use a shared cache backend when running several processes.
+
+Broadcasts are single shared rows; who read them is tracked per user by
+a NotificationReadMark high-water mark plus BroadcastReceipt rows for
+the reads above it (see ``mark_read`` and ``mark_all_read``). The mark
+only moves over broadcasts older than ``NOTIFICATION_COMMIT_WINDOW``
+seconds, so one committing late below a newer id is not skipped.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import DateTimeField, Value
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from dashboard.models import (
+    BroadcastReceipt,
+    Notification,
+    NotificationArchive,
+    NotificationReadMark,
+)
+from inventory.sql import delete_rows
+
+# Notifications shown in the dropdown.
+DROPDOWN_LIMIT = 10
+
+_ANY = "notifications:generation:any"
+_BROADCAST = "notifications:generation:broadcast"
+
+
+def _user_key(user_id):
+    return f"notifications:generation:user:{user_id}"
+
+
+def _generation_keys(user):
+    if user.is_superuser:
+        return [_ANY]
+    return [_user_key(user.pk), _BROADCAST]
+
+
+def unread_summary(user):
+    """
+    ``{"count": ..., "latest": [...]}`` for ``user``: the number of unread
+    notifications they see and the newest ``DROPDOWN_LIMIT`` of them.
+    """
+    keys = _generation_keys(user)
+    generations = cache.get_many(keys)
+    key = "notifications:unread:{}:{}".format(
+        user.pk, ":".join(str(generations.get(k, 0)) for k in keys)
+    )
+    summary = cache.get(key)
+    if summary is None:
+        unread = Notification.objects.unread_for(user)
+        latest = list(unread.order_by("-created_at")[:DROPDOWN_LIMIT])
+        count = len(latest)
+        if count == DROPDOWN_LIMIT:
+            count = unread.count()
+        summary = {"count": count, "latest": latest}
+        cache.set(key, summary, getattr(settings, "NOTIFICATION_CACHE_TTL", 300))
+    return summary
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def invalidate(user_ids=(), broadcast=False):
+    """
+    Drop the cached summaries affected by a change to the notifications of
+    ``user_ids`` (and to broadcasts, when ``broadcast``).
+    """
+    for user_id in set(user_ids):
+        _bump(_user_key(user_id))
+    if broadcast:
+        _bump(_BROADCAST)
+    _bump(_ANY)
+
+
+def _settled_broadcast_id():
+    # Ids are handed out on insert but become visible on commit, so a
+    # broadcast still in flight can commit below the newest one visible;
+    # moving the mark past it would count it read unseen. Only broadcasts
+    # older than the commit window are assumed to have no such straggler
+    # below them; newer reads are kept as receipts until they are.
+    window = getattr(settings, "NOTIFICATION_COMMIT_WINDOW", 60)
+    settled = (
+        Notification.objects.filter(
+            user__isnull=True,
+            created_at__lt=timezone.now() - timedelta(seconds=window),
+        )
+        .order_by("-pk")
+        .values_list("pk", flat=True)
+        .first()
+    )
+    return settled or 0
+
+
+def _move_mark(mark, through):
+    # Drop the receipts the mark now covers, so receipts only record the
+    # reads above it.
+    if through > mark.last_broadcast_id:
+        mark.last_broadcast_id = through
+        mark.save(update_fields=["last_broadcast_id", "updated_at"])
+        BroadcastReceipt.objects.filter(
+            user_id=mark.user_id, notification_id__lte=through
+        ).delete()
+
+
+def _advance(mark):
+    # Move the mark up to the first broadcast the user has not read, but
+    # not past the settled ones.
+    settled = _settled_broadcast_id()
+    first_unread = (
+        Notification.objects.filter(
+            user__isnull=True,
+            is_read=False,
+            pk__gt=mark.last_broadcast_id,
+            pk__lte=settled,
+        )
+        .exclude(receipts__user_id=mark.user_id)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+        .first()
+    )
+    _move_mark(mark, settled if first_unread is None else first_unread - 1)
+
+
+def _own_unread(user, notifications):
+    # The unread rows of ``notifications`` whose is_read ``user`` flips, and
+    # whose cached summaries that changes: their own, or for a superuser
+    # (who sees every user's rows, see NotificationManager.unread_for) any
+    # user's.
+    own = notifications.filter(is_read=False)
+    if user.is_superuser:
+        own = own.exclude(user=None)
+        return own, {user.pk, *own.values_list("user_id", flat=True).distinct()}
+    return own.filter(user=user), {user.pk}
+
+
+def _mark_read(user, notifications):
+    # One UPDATE for the rows ``user`` owns (for a superuser, every user's
+    # row), receipts for the broadcasts they have not read.
+    with transaction.atomic():
+        own, owners = _own_unread(user, notifications)
+        updated = own.update(is_read=True, updated_at=timezone.now())
+        broadcasts = list(
+            Notification.objects.unread_for(user)
+            .filter(user__isnull=True, pk__in=notifications.values("pk"))
+            .values_list("pk", flat=True)
+        )
+        if broadcasts:
+            BroadcastReceipt.objects.bulk_create(
+                [BroadcastReceipt(user=user, notification_id=pk) for pk in broadcasts],
+                ignore_conflicts=True,
+            )
+            mark, _ = NotificationReadMark.objects.get_or_create(user=user)
+            _advance(mark)
+    transaction.on_commit(lambda: invalidate(owners))
+    return updated + len(broadcasts)
+
+
+def mark_read(user, ids):
+    """
+    Mark the notifications ``ids`` read for ``user``: their own (for a
+    superuser, any user's they opened) with one UPDATE, broadcasts only
+    for them. Returns how many were marked.
+    """
+    return _mark_read(user, Notification.objects.filter(pk__in=list(ids)))
+
+
+def _mark_all_read(user, through, everyone):
+    notifications = Notification.objects.all()
+    if through is not None:
+        notifications = notifications.filter(pk__lte=through)
+    with transaction.atomic():
+        if everyone:
+            own, owners = _own_unread(user, notifications)
+        else:
+            own, owners = notifications.filter(user=user, is_read=False), {user.pk}
+        updated = own.update(is_read=True, updated_at=timezone.now())
+        mark, _ = NotificationReadMark.objects.get_or_create(user=user)
+        settled = _settled_broadcast_id()
+        _move_mark(mark, settled if through is None else min(settled, through))
+        broadcasts = Notification.objects.unread_for(user).filter(user__isnull=True)
+        if through is not None:
+            broadcasts = broadcasts.filter(pk__lte=through)
+        BroadcastReceipt.objects.bulk_create(
+            [
+                BroadcastReceipt(user=user, notification_id=pk)
+                for pk in broadcasts.values_list("pk", flat=True)
+            ],
+            ignore_conflicts=True,
+        )
+    transaction.on_commit(lambda: invalidate(owners))
+    return updated
+
+
+def mark_all_read(user, through=None):
+    """
+    Mark the notifications up to id ``through`` (the newest one the client
+    showed; all of them, when None) read for ``user``: their own rows with
+    one UPDATE (also for a superuser, see ``mark_everyone_read``),
+    broadcasts by moving their mark up to the settled ones plus receipts
+    for the newer ones. Returns the number of notifications updated.
+    """
+    return _mark_all_read(user, through, everyone=False)
+
+
+def mark_everyone_read(user, through=None):
+    """
+    ``mark_all_read`` for a superuser, whose unread count covers every
+    user's rows: the UPDATE flips all of those, not only their own. For
+    other users it is ``mark_all_read``.
+    """
+    return _mark_all_read(user, through, everyone=True)
+
+
+def mark_category_read(user, category):
+    """
+    Mark the notifications of ``category`` read for ``user``: one UPDATE
+    for their own (for a superuser, every user's), receipts for the unread
+    broadcasts. Returns how many were marked.
+    """
+    return _mark_read(user, Notification.objects.filter(category=category))
+
+
+# Notification columns copied to NotificationArchive, in table order.
+_ARCHIVED_FIELDS = [
+    field.attname
+    for field in NotificationArchive._meta.concrete_fields
+    if field.name != "archived_at"
+]
+
+
+def _copy_to_archive(qs, archived_at):
+    # INSERT ... SELECT, so the rows never leave the database.
+    select = qs.order_by().annotate(
+        archived=Value(archived_at, output_field=DateTimeField())
+    ).values(*_ARCHIVED_FIELDS, "archived")
+    sql, params = select.query.sql_with_params()
+    connection = connections[qs.db]
+    columns = ", ".join(
+        connection.ops.quote_name(NotificationArchive._meta.get_field(name).column)
+        for name in [*_ARCHIVED_FIELDS, "archived_at"]
+    )
+    table = connection.ops.quote_name(NotificationArchive._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {table} ({columns}) {sql}", params)
+
+
+def archive(before, user=None, batch_size=1000):
+    """
+    Move notifications created before ``before`` (only ``user``'s own,
+    when given) to NotificationArchive, oldest ids first. Each batch of
+    ``batch_size`` is one transaction: a SELECT of its ids, one INSERT ...
+    SELECT into the archive and one DELETE (plus one for the broadcast
+    receipts). Returns the number of notifications moved.
+    """
+    old = Notification.objects.filter(created_at__lt=before)
+    if user is not None:
+        old = old.filter(user=user)
+    moved = 0
+    while True:
+        with transaction.atomic():
+            rows = list(old.order_by("pk").values_list("pk", "user_id")[:batch_size])
+            if not rows:
+                break
+            batch = old.filter(pk__lte=rows[-1][0])
+            _copy_to_archive(batch, timezone.now())
+            # Set-based deletes: the receipts are the only rows referencing
+            # a notification, and the caches are dropped below instead of
+            # by the per-row delete signals.
+            delete_rows(BroadcastReceipt.objects.filter(notification__in=batch.values("pk")))
+            moved += delete_rows(batch)
+            user_ids = {user_id for _, user_id in rows}
+            transaction.on_commit(
+                lambda user_ids=user_ids: invalidate(
+                    user_ids - {None}, broadcast=None in user_ids
+                )
+            )
+        if len(rows) < batch_size:
+            break
+    return moved
+
+
+def create_many(objs):
+    """
+    ``bulk_create`` the Notification objects ``objs`` and, after commit, do
+    what the per-row signals would have: drop the affected unread
+    summaries and push the new rows to the live stream.
+    """
+    created = Notification.objects.bulk_create(objs)
+    if not created:
+        return created
+    user_ids = {notification.user_id for notification in created}
+
+    def announce():
+        from dashboard.stream import as_event, hub
+
+        invalidate(user_ids - {None}, broadcast=None in user_ids)
+        for notification in created:
+            if notification.pk is not None:
+                hub.publish(as_event(notification))
+
+    transaction.on_commit(announce)
+    return created
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def drop_unread_summary(sender, instance, **kwargs):
+    user_id = instance.user_id
+    transaction.on_commit(
+        lambda: invalidate([user_id] if user_id else (), broadcast=user_id is None)
+    )
@@ -0,0 +1,217 @@
+"""
+Server-Sent Events feed of new notifications for the dashboard header.
+
+Each process has one ``hub``. New Notification rows are published to it
+from post_save (after commit), which reaches the clients connected to
+this process at once. Rows created by other processes are picked up by
+one poller per process, which reads ``id > last seen`` every
+``NOTIFICATION_STREAM_POLL_INTERVAL`` seconds (default 5) while anyone is
+connected; so open tabs cost one indexed query per process and interval
+instead of a page render each. Events already published are not sent
+twice.
+
+An endless stream needs an ASGI server. Under WSGI each response would
+hold a worker for good, so there ``snapshot`` answers instead: what is
+new since ``Last-Event-ID`` and the unread count, after which the
+browser reconnects every ``NOTIFICATION_STREAM_RETRY`` seconds.
+"""
+
+import asyncio
+import collections
+import json
+import logging
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Max
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from dashboard.models import Notification
+from dashboard.notifications import unread_summary
+
+logger = logging.getLogger(__name__)
+
+EVENT_FIELDS = (
+    "id",
+    "user_id",
+    "notification_type",
+    "category",
+    "message",
+    "created_at",
+)
+# Events buffered per connection before it is told to resynchronize.
+QUEUE_SIZE = 100
+# Notification ids remembered to drop duplicates from the poller.
+RECENT_IDS = 1000
+POLL_BATCH = 500
+
+
+def format_event(event, data, event_id=None):
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append("data: " + json.dumps(data, cls=DjangoJSONEncoder))
+    return "\n".join(lines) + "\n\n"
+
+
+class Subscription:
+    def __init__(self, user, loop):
+        self.user_id = user.pk
+        self.is_superuser = user.is_superuser
+        self.loop = loop
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+        # Set when events were dropped because the client fell behind.
+        self.overflowed = False
+
+    def wants(self, event):
+        return self.is_superuser or event["user_id"] in (None, self.user_id)
+
+    def put(self, event):
+        # Runs in the subscriber's event loop.
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class Hub:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._recent = collections.OrderedDict()
+        self._pollers = {}
+
+    def publish(self, event):
+        """Send ``event`` (a dict of EVENT_FIELDS) to its subscribers; thread-safe."""
+        with self._lock:
+            if event["id"] in self._recent:
+                return
+            self._recent[event["id"]] = None
+            if len(self._recent) > RECENT_IDS:
+                self._recent.popitem(last=False)
+            subscriptions = [s for s in self._subscriptions if s.wants(event)]
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:
+                # The subscriber's loop is closed; it unsubscribes on its way out.
+                pass
+
+    async def subscribe(self, user):
+        loop = asyncio.get_running_loop()
+        subscription = Subscription(user, loop)
+        with self._lock:
+            self._subscriptions.add(subscription)
+            if loop not in self._pollers:
+                ready = asyncio.Event()
+                self._pollers[loop] = (loop.create_task(self._poll(ready)), ready)
+            ready = self._pollers[loop][1]
+        # Once the poller has its starting point, every row committed
+        # from now on reaches this subscription one way or the other.
+        await ready.wait()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+            if not any(s.loop is subscription.loop for s in self._subscriptions):
+                poller = self._pollers.pop(subscription.loop, None)
+                if poller is not None:
+                    poller[0].cancel()
+
+    async def _poll(self, ready):
+        interval = getattr(settings, "NOTIFICATION_STREAM_POLL_INTERVAL", 5)
+        try:
+            last_id = await sync_to_async(_last_id)()
+        finally:
+            ready.set()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                new = await sync_to_async(_events_after)(last_id)
+            except Exception:
+                logger.exception("Notification stream poll failed")
+                continue
+            for event in new:
+                last_id = event["id"]
+                self.publish(event)
+
+
+def _last_id():
+    return Notification.objects.aggregate(last=Max("pk"))["last"] or 0
+
+
+def _events_after(last_id, user=None):
+    """New notifications (only those unread by ``user``, if given) as events."""
+    if user is None:
+        qs = Notification.objects.all()
+    else:
+        qs = Notification.objects.unread_for(user)
+    qs = qs.filter(pk__gt=last_id).order_by("pk")
+    return list(qs.values(*EVENT_FIELDS)[:POLL_BATCH])
+
+
+hub = Hub()
+
+
+def as_event(notification):
+    return {field: getattr(notification, field) for field in EVENT_FIELDS}
+
+
+@receiver(post_save, sender=Notification)
+def publish_notification(sender, instance, created, **kwargs):
+    if created:
+        event = as_event(instance)
+        transaction.on_commit(lambda: hub.publish(event))
+
+
+def snapshot(user, last_event_id=None):
+    """
+    The finite SSE response for servers that cannot hold a stream open:
+    the unread notifications after ``last_event_id``, then the unread
+    count, whose event id is where the next request picks up.
+    """
+    retry = getattr(settings, "NOTIFICATION_STREAM_RETRY", 30)
+    messages = [f"retry: {int(retry * 1000)}\n\n"]
+    new = _events_after(last_event_id, user) if last_event_id is not None else []
+    for event in new:
+        messages.append(format_event("notification", event, event["id"]))
+    # Stop after the last event sent if a full batch left some behind.
+    last_id = new[-1]["id"] if len(new) == POLL_BATCH else _last_id()
+    count = unread_summary(user)["count"]
+    messages.append(format_event("unread", {"count": count}, last_id))
+    return messages
+
+
+async def events(user, last_event_id=None):
+    """
+    Async iterator of SSE messages for ``user``: the unread count, any
+    unread notifications missed since ``last_event_id`` (on reconnect),
+    then new notifications as they arrive, with heartbeats in between.
+    """
+    heartbeat = getattr(settings, "NOTIFICATION_STREAM_HEARTBEAT", 15)
+    subscription = await hub.subscribe(user)
+    try:
+        summary = await sync_to_async(unread_summary)(user)
+        yield format_event("unread", {"count": summary["count"]})
+        if last_event_id is not None:
+            for event in await sync_to_async(_events_after)(last_event_id, user):
+                yield format_event("notification", event, event["id"])
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            yield format_event("notification", event, event["id"])
+            if subscription.overflowed:
+                # Some events were dropped; send the real count instead.
+                subscription.overflowed = False
+                summary = await sync_to_async(unread_summary)(user)
+                yield format_event("unread", {"count": summary["count"]})
+    finally:
+        hub.unsubscribe(subscription)
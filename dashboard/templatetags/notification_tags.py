@@ -1,17 +1,21 @@
 from django import template
 
-from dashboard.models import Notification
+from dashboard import notifications
 
 register = template.Library()
 
 
 @register.simple_tag
-def get_user_notifications(user, limit=10):
+def get_user_notifications(user, limit=notifications.DROPDOWN_LIMIT):
     if user.is_authenticated:
-        return (
-            Notification.objects.for_user(user)
-            .filter(is_read=False)
-            .order_by("-created_at")[:limit]
-        )
+        return notifications.unread_summary(user)["latest"][:limit]
 
     return []
+
+
+@register.simple_tag
+def get_unread_notification_count(user):
+    if user.is_authenticated:
+        return notifications.unread_summary(user)["count"]
+
+    return 0
@@ -12,6 +12,31 @@ urlpatterns = [
         views.notification_redirect_view,
         name="notification_redirect_view",
     ),
+    path(
+        "notification/stream/",
+        views.notification_stream,
+        name="notification_stream",
+    ),
+    path(
+        "notification/mark-all-read/",
+        views.mark_all_notifications_read,
+        name="mark_all_notifications_read",
+    ),
+    path(
+        "notification/mark-all-read/everyone/",
+        views.mark_everyone_notifications_read,
+        name="mark_everyone_notifications_read",
+    ),
+    path(
+        "notification/mark-read/<str:category>/",
+        views.mark_category_notifications_read,
+        name="mark_category_notifications_read",
+    ),
+    path(
+        "notification/archive/",
+        views.archive_old_notifications,
+        name="archive_old_notifications",
+    ),
     ### Notification Section End ###
     # Roles & Permissions URLs Section Start
     path(
@@ -1,17 +1,22 @@
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
 from django.contrib import messages
 from django.contrib.auth import authenticate
 from django.contrib.auth import login as user_login
 from django.contrib.auth import logout as user_logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import Group, User
+from django.core.handlers.asgi import ASGIRequest
 from django.db import transaction
-from django.db.models import Count, Q
+from django.db.models import Count
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
+from django.utils import timezone
 from django.utils.html import format_html
 from django_datatables_view.base_datatable_view import BaseDatatableView
 from django.views.decorators.csrf import csrf_exempt
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from dashboard.forms import (
     EditGroupForm,
     EditUserForm,
@@ -19,8 +24,11 @@ from dashboard.forms import (
     LoginForm,
     RegisterForm,
 )
+from dashboard import notifications, stream
 from dashboard.models import Notification
 from inventory_management.decorators import permission_required_message
+from inventory import search
+from inventory.datatables import KeysetPaginationMixin
 
 
 @login_required
@@ -82,14 +90,94 @@ def notification_redirect_view(request, pk):
     print(f"notification: {pk}")
     try:
         notification = get_object_or_404(Notification, pk=pk)
-        notification.is_read = True
-        notification.save()
+        # Broadcasts are only marked read for this user.
+        notifications.mark_read(request.user, [notification.pk])
         return redirect(notification.related_object.get_absolute_url())
     except Exception as e:
         messages.error(request, f"Error: {e}")
         return redirect("admin_dashboard")
 
 
+@login_required
+async def notification_stream(request):
+    """Server-Sent Events feed of the user's new notifications (see dashboard.stream)."""
+    user = await request.auser()
+    try:
+        last_event_id = int(request.headers.get("Last-Event-ID", ""))
+    except ValueError:
+        last_event_id = None
+    if isinstance(request, ASGIRequest):
+        response = StreamingHttpResponse(
+            stream.events(user, last_event_id), content_type="text/event-stream"
+        )
+    else:
+        # WSGI would read the endless stream to its end before sending
+        # anything; answer with what is new and let the browser reconnect.
+        body = await sync_to_async(stream.snapshot)(user, last_event_id)
+        response = HttpResponse("".join(body), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Keep nginx from buffering the stream.
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _mark_all_notifications_read(request, mark):
+    if request.method == "POST":
+        try:
+            through = request.POST.get("through")
+            through = None if through is None else int(through)
+        except ValueError:
+            return JsonResponse({"status": "error - invalid through"}, status=400)
+        updated = mark(request.user, through)
+        unread = notifications.unread_summary(request.user)["count"]
+        return JsonResponse({"status": "success", "updated": updated, "unread": unread})
+
+    return JsonResponse({"status": "error"}, status=400)
+
+
+@login_required
+def mark_all_notifications_read(request):
+    """Mark read the user's notifications up to ``through``, the newest id the page showed (POST)."""
+    return _mark_all_notifications_read(request, notifications.mark_all_read)
+
+
+@login_required
+def mark_everyone_notifications_read(request):
+    """Superusers only: like ``mark_all_notifications_read``, for every user's notifications."""
+    if not request.user.is_superuser:
+        return JsonResponse({"status": "error - forbidden"}, status=403)
+    return _mark_all_notifications_read(request, notifications.mark_everyone_read)
+
+
+@login_required
+def mark_category_notifications_read(request, category):
+    if request.method == "POST":
+        if category not in dict(Notification.CATEGORY_CHOICES):
+            return JsonResponse({"status": "error - unknown category"}, status=400)
+        updated = notifications.mark_category_read(request.user, category)
+        return JsonResponse({"status": "success", "updated": updated})
+
+    return JsonResponse({"status": "error"}, status=400)
+
+
+@login_required
+def archive_old_notifications(request):
+    """Archive the user's own notifications older than ``days`` (POST, default 30)."""
+    if request.method == "POST":
+        try:
+            days = int(request.POST.get("days", 30))
+        except ValueError:
+            days = -1
+        if days < 0:
+            return JsonResponse({"status": "error - invalid days"}, status=400)
+        archived = notifications.archive(
+            timezone.now() - timedelta(days=days), user=request.user
+        )
+        return JsonResponse({"status": "success", "archived": archived})
+
+    return JsonResponse({"status": "error"}, status=400)
+
+
 ### Notification Section End ###
 
 
@@ -277,12 +365,11 @@ def user_detail(request, id):
     return render(request, "dashboard/user_management/user_detail.html", context)
 
 
-class UserListJson(BaseDatatableView):
+class UserListJson(KeysetPaginationMixin, BaseDatatableView):
     model = User
     columns = ["id", "username", "first_name", "email", "role"]
     order_columns = ["id", "username", "first_name", "email", "role"]
     max_display_length = 10
-    search_fields = ["username", "first_name", "email", "groups__name"]
 
     def filter_queryset(self, qs):
         # exclude superusers
@@ -290,10 +377,7 @@ class UserListJson(BaseDatatableView):
 
         search_value = self.request.GET.get("search[value]", None)
         if search_value:
-            q = Q()
-            for field in self.search_fields:
-                q |= Q(**{f"{field}__icontains": search_value})
-            qs = qs.filter(q)
+            qs = search.search(qs, search_value)
         return qs
 
     def prepare_results(self, qs):
@@ -0,0 +1,202 @@
+import datetime
+import threading
+
+from django.db import connection, transaction
+
+from .commit_hooks import PendingCommit
+from .models import InventoryAudit, InventoryAuditDaily, month_bucket
+
+_local = threading.local()
+
+
+class _AuditBuffer:
+    """
+    Audit rows recorded under one stack of open savepoints. Its flush is
+    tied to the commit of that same stack, so the rows are dropped when
+    any of those savepoints rolls back.
+    """
+
+    def __init__(self, savepoints):
+        self.savepoints = savepoints
+        self.rows = []
+        self.commit = PendingCommit(on_commit=self.flush, on_rollback=self.drop)
+
+    def _forget(self):
+        buffers = _local.__dict__.get("buffers", [])
+        if self in buffers:
+            buffers.remove(self)
+
+    def flush(self):
+        self._forget()
+        if self.rows:
+            InventoryAudit.objects.bulk_create(self.rows, batch_size=500)
+
+    def drop(self):
+        self._forget()
+        self.rows = []
+
+
+def _current_buffer():
+    """
+    The buffer for the savepoints open on this thread's connection. Once a
+    savepoint is released, its buffer only depends on the savepoints still
+    open, so buffers that end up under the same ones are merged: a loop of
+    savepoint-wrapped writes still flushes in one or two INSERTs.
+    """
+    open_ids = tuple(connection.savepoint_ids)
+    buffers = []
+    by_savepoints = {}
+    for buffer in getattr(_local, "buffers", []):
+        if not buffer.commit.pending:
+            continue
+        # A savepoint closed since was released, or the rollback would have
+        # dropped the buffer.
+        buffer.savepoints = tuple(sid for sid in buffer.savepoints if sid in open_ids)
+        kept = by_savepoints.get(buffer.savepoints)
+        if kept is None:
+            by_savepoints[buffer.savepoints] = buffer
+            buffers.append(buffer)
+        else:
+            kept.rows.extend(buffer.rows)
+            buffer.rows = []
+    _local.buffers = buffers
+    buffer = by_savepoints.get(open_ids)
+    if buffer is None:
+        buffer = _AuditBuffer(open_ids)
+        buffers.append(buffer)
+    return buffer
+
+
+def record(rows):
+    """
+    Queue InventoryAudit instances to be written with one bulk_create when
+    the surrounding transaction commits (dropped if it, or the savepoint
+    they were recorded in, rolls back). Outside a transaction they are
+    written right away.
+    """
+    rows = list(rows)
+    if not rows:
+        return
+    for row in rows:
+        row.assign_bucket()
+    if not connection.in_atomic_block:
+        InventoryAudit.objects.bulk_create(rows, batch_size=500)
+        return
+    _current_buffer().rows.extend(rows)
+
+
+def record_change(product_id, old_quantity, new_quantity, user=None, note=""):
+    record(
+        [
+            InventoryAudit(
+                product_id=product_id,
+                user_id=getattr(user, "pk", None),
+                old_quantity=old_quantity,
+                new_quantity=new_quantity,
+                note=note,
+            )
+        ]
+    )
+
+
+def _day_start(day):
+    return datetime.datetime.combine(day, datetime.time.min, tzinfo=datetime.timezone.utc)
+
+
+def history(product_id, day_from=None, day_to=None):
+    """
+    Audit history of one product for ``[day_from, day_to]`` (dates, both
+    optional). Returns ``(daily, changes)``: the compacted per-day summaries
+    and the raw per-change rows still kept, each oldest first. The month
+    bucket bounds keep the raw lookup to the buckets in range.
+    """
+    changes = InventoryAudit.objects.filter(product_id=product_id)
+    daily = InventoryAuditDaily.objects.filter(product_id=product_id)
+    if day_from:
+        changes = changes.filter(
+            bucket__gte=month_bucket(day_from), updated_at__gte=_day_start(day_from)
+        )
+        daily = daily.filter(day__gte=day_from)
+    if day_to:
+        end = _day_start(day_to + datetime.timedelta(days=1))
+        changes = changes.filter(
+            bucket__lte=month_bucket(day_to), updated_at__lt=end
+        )
+        daily = daily.filter(day__lte=day_to)
+    return daily.order_by("day"), changes.order_by("updated_at", "id")
+
+
+def _fold(rows):
+    """Fold (product_id, updated_at, old, new) rows into per product/day summaries."""
+    days = {}
+    for product_id, updated_at, old_quantity, new_quantity in rows:
+        key = (product_id, updated_at.date())
+        summary = days.get(key)
+        if summary is None:
+            summary = days[key] = InventoryAuditDaily(
+                product_id=product_id,
+                day=key[1],
+                opening_quantity=old_quantity,
+                net_change=0,
+                changes=0,
+            )
+        summary.closing_quantity = new_quantity
+        summary.net_change += new_quantity - old_quantity
+        summary.changes += 1
+    return days
+
+
+def _merge_days(days):
+    existing = {
+        (row.product_id, row.day): row
+        for row in InventoryAuditDaily.objects.select_for_update().filter(
+            product_id__in={key[0] for key in days},
+            day__in={key[1] for key in days},
+        )
+    }
+    to_update, to_create = [], []
+    for key, summary in days.items():
+        row = existing.get(key)
+        if row is None:
+            to_create.append(summary)
+            continue
+        # Rows already compacted for this day come first.
+        row.closing_quantity = summary.closing_quantity
+        row.net_change += summary.net_change
+        row.changes += summary.changes
+        to_update.append(row)
+    if to_update:
+        InventoryAuditDaily.objects.bulk_update(
+            to_update, ["closing_quantity", "net_change", "changes"]
+        )
+    InventoryAuditDaily.objects.bulk_create(to_create, batch_size=500)
+
+
+def compact(before, batch_size=1000):
+    """
+    Fold every InventoryAudit row older than the day ``before`` into
+    InventoryAuditDaily and delete it. Works one month bucket at a time,
+    each in its own transaction. Returns ``(rows_folded, days_written)``.
+    """
+    cutoff = _day_start(before)
+    buckets = (
+        InventoryAudit.objects.filter(bucket__lte=month_bucket(before))
+        .values_list("bucket", flat=True)
+        .distinct()
+        .order_by("bucket")
+    )
+    folded = written = 0
+    for bucket in list(buckets):
+        with transaction.atomic():
+            rows = InventoryAudit.objects.filter(bucket=bucket, updated_at__lt=cutoff)
+            days = _fold(
+                rows.order_by("product_id", "updated_at", "id")
+                .values_list("product_id", "updated_at", "old_quantity", "new_quantity")
+                .iterator(chunk_size=batch_size)
+            )
+            if not days:
+                continue
+            _merge_days(days)
+            folded += rows.delete()[0]
+            written += len(days)
+    return folded, written
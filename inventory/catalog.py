@@ -0,0 +1,64 @@
+"""
+Set-based maintenance of catalog master data (suppliers, categories).
+"""
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from . import category_tree, search
+from .datatables import invalidate_counts
+from .models import Category, Product, Supplier
+from .sql import delete_rows
+
+
+def delete_unused_suppliers(ids):
+    """
+    Delete the suppliers in ``ids`` that no product references. Returns the
+    names of the ones kept. Runs three queries regardless of ``len(ids)``.
+    """
+    with transaction.atomic():
+        rows = list(
+            Supplier.objects.filter(pk__in=ids)
+            .annotate(linked=Exists(Product.objects.filter(supplier=OuterRef("pk"))))
+            .values_list("pk", "supplier_name", "linked")
+        )
+        undeletable = [name for _, name, linked in rows if linked]
+        unused = [pk for pk, _, linked in rows if not linked]
+        if unused:
+            # Nothing references them (products were checked above), so one
+            # DELETE without the per-row fetch and signals; their receivers'
+            # work is done here instead.
+            delete_rows(Supplier.objects.filter(pk__in=unused))
+            search.unindex(Supplier, unused)
+            transaction.on_commit(lambda: invalidate_counts(Supplier))
+    return undeletable
+
+
+def delete_unused_categories(ids):
+    """
+    Delete the categories in ``ids`` whose subtree (at any depth) holds no
+    products, together with that subtree. Returns the names of the ones
+    kept. Runs four queries regardless of ``len(ids)`` or tree depth.
+    """
+    with transaction.atomic():
+        rows = list(
+            Category.objects.filter(pk__in=ids)
+            .with_subtree_has_products()
+            .values_list("pk", "category_name", "has_products")
+        )
+        undeletable = [name for _, name, linked in rows if linked]
+        unused = [pk for pk, _, linked in rows if not linked]
+        if unused:
+            doomed = list(
+                Category.objects.filter(pk__in=unused)
+                .subtrees()
+                .values_list("pk", flat=True)
+            )
+            # As for suppliers; the whole subtree goes, so no child is left
+            # for the parent_category cascade.
+            delete_rows(Category.objects.filter(pk__in=doomed))
+            search.unindex(Category, doomed)
+            category_tree.invalidate()
+            transaction.on_commit(category_tree.invalidate)
+            transaction.on_commit(lambda: invalidate_counts(Category))
+    return undeletable
@@ -0,0 +1,107 @@
+"""
+Process-local, versioned cache of the category hierarchy.
+
+The whole tree is loaded with one query into ``CategoryNode`` objects
+linked by parent/children pointers and kept per process. A version
+number in the Django cache is bumped when a category is saved or deleted
+(see inventory.signals); each process rebuilds its copy the next time it
+sees a newer version. Use a shared cache backend when running several
+processes so they all see the bump.
+"""
+
+import threading
+
+from django.core.cache import cache
+
+VERSION_KEY = "category_tree:version"
+
+_lock = threading.Lock()
+_state = {"version": None, "tree": None}
+
+
+class CategoryNode:
+    __slots__ = ("id", "category_name", "is_active", "path", "parent", "children")
+
+    def __init__(self, id, category_name, is_active, path):
+        self.id = id
+        self.category_name = category_name
+        self.is_active = is_active
+        self.path = path
+        self.parent = None
+        self.children = []
+
+    def __repr__(self):
+        return f"<CategoryNode {self.id}: {self.category_name}>"
+
+
+class CategoryTree:
+    def __init__(self, rows):
+        self.nodes = {
+            pk: CategoryNode(pk, name, is_active, path)
+            for pk, name, _, is_active, path in rows
+        }
+        self.roots = []
+        for pk, _, parent_id, _, _ in rows:
+            node = self.nodes[pk]
+            parent = self.nodes.get(parent_id)
+            if parent is None:
+                self.roots.append(node)
+            else:
+                node.parent = parent
+                parent.children.append(node)
+
+    def get(self, pk):
+        return self.nodes.get(pk)
+
+    def label(self, pk):
+        """``"Parent -> Child"`` label, as Category.__str__ renders it."""
+        names = []
+        node = self.nodes.get(pk)
+        while node is not None:
+            names.append(node.category_name)
+            node = node.parent
+        return " -> ".join(reversed(names))
+
+    def child_of(self, pk, ancestor_pk):
+        """The child of ``ancestor_pk`` on the way down to ``pk`` (or None)."""
+        node = self.nodes.get(pk)
+        while node is not None and node.parent is not None:
+            if node.parent.id == ancestor_pk:
+                return node
+            node = node.parent
+        return None
+
+    def choices(self, nodes):
+        return sorted(((node.id, self.label(node.id)) for node in nodes), key=lambda c: c[1])
+
+
+def _load():
+    from .models import Category
+
+    rows = list(
+        Category.objects.order_by("category_name").values_list(
+            "pk", "category_name", "parent_category_id", "is_active", "path"
+        )
+    )
+    return CategoryTree(rows)
+
+
+def get_tree():
+    """The current category tree (one cache read; one query after a change)."""
+    version = cache.get_or_set(VERSION_KEY, 0, None)
+    tree = _state["tree"]
+    if tree is not None and _state["version"] == version:
+        return tree
+    with _lock:
+        if _state["tree"] is None or _state["version"] != version:
+            _state["tree"] = _load()
+            _state["version"] = version
+        return _state["tree"]
+
+
+def invalidate():
+    _state["tree"] = None
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
@@ -0,0 +1,52 @@
+import weakref
+
+from django.db import transaction
+
+
+class _Hook:
+    # The object queued with on_commit. Django drops it when the transaction
+    # (or the savepoint it was queued in) rolls back; its finalizer is the
+    # rollback hook.
+    __slots__ = ("pending", "__weakref__")
+
+    def __init__(self, pending):
+        self.pending = pending
+
+    def __call__(self):
+        self.pending._committed()
+
+
+class PendingCommit:
+    """
+    Work tied to the commit of the current transaction: ``on_commit`` runs
+    when it commits, ``on_rollback`` when it (or the savepoint open at
+    creation) rolls back instead. ``pending`` is True in between, and
+    ``committed`` tells the two outcomes apart. Outside a transaction it
+    commits right away.
+
+    The state is kept here rather than read back from Django's queue of
+    on_commit callbacks: the queued hook only holds on to this object, and
+    Django letting go of the hook without running it means a rollback.
+    """
+
+    def __init__(self, on_commit=None, on_rollback=None, using=None):
+        self.connection = transaction.get_connection(using)
+        self.pending = True
+        self.committed = False
+        self._on_commit = on_commit
+        self._on_rollback = on_rollback
+        hook = _Hook(self)
+        weakref.finalize(hook, self._dropped)
+        transaction.on_commit(hook, using=using)
+
+    def _committed(self):
+        self.pending = False
+        self.committed = True
+        if self._on_commit is not None:
+            self._on_commit()
+
+    def _dropped(self):
+        if self.pending:
+            self.pending = False
+            if self._on_rollback is not None:
+                self._on_rollback()
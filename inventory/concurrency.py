@@ -0,0 +1,90 @@
+from django.db import models, transaction
+from django.db.models import F
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class StaleWrite(Exception):
+    """Raised when a row changed since it was read (version mismatch)."""
+
+
+class VersionedModel(models.Model):
+    """
+    Optimistic concurrency for stock-bearing rows.
+
+    Every UPDATE first claims the row with
+    ``UPDATE ... SET version = version + 1 WHERE pk = %s AND version = %s``;
+    if another writer got there first nothing matches and StaleWrite is
+    raised instead of silently overwriting their change. Queryset-level
+    ``update()`` calls that touch stock must bump ``version`` themselves.
+    """
+
+    version = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if self._state.adding or kwargs.get("force_insert"):
+            return super().save(*args, **kwargs)
+        manager = type(self)._base_manager.db_manager(kwargs.get("using"))
+        with transaction.atomic(using=manager.db):
+            claimed = manager.filter(pk=self.pk, version=self.version).update(
+                version=F("version") + 1
+            )
+            if not claimed:
+                raise StaleWrite(
+                    f"{self._meta.verbose_name} {self.pk} was modified by another request."
+                )
+            self.version += 1
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "version"}
+            super().save(*args, **kwargs)
+
+
+class OptimisticUpdateMixin:
+    """
+    ViewSet mixin for VersionedModel: retries a PUT/PATCH against a fresh
+    copy of the row up to ``max_write_attempts`` times when a concurrent
+    write wins, and answers 409 when it keeps losing. Clients that send the
+    version they edited (``If-Match`` header or ``version`` field) get a
+    single attempt and a 409 if that version is no longer current.
+    """
+
+    max_write_attempts = 3
+
+    def expected_version(self, request):
+        raw = request.headers.get("If-Match") or request.data.get("version")
+        if raw in (None, ""):
+            return None
+        try:
+            return int(str(raw).strip('"'))
+        except ValueError:
+            return None
+
+    def update(self, request, *args, **kwargs):
+        partial = kwargs.pop("partial", False)
+        expected = self.expected_version(request)
+        attempts = 1 if expected is not None else self.max_write_attempts
+        for _ in range(attempts):
+            instance = self.get_object()
+            if expected is not None and instance.version != expected:
+                break
+            serializer = self.get_serializer(instance, data=request.data, partial=partial)
+            serializer.is_valid(raise_exception=True)
+            try:
+                with transaction.atomic():
+                    self.perform_update(serializer)
+            except StaleWrite:
+                continue
+            return Response(serializer.data)
+        return Response(
+            {
+                "error": "This record was modified by another request. Reload and try again.",
+                "version": type(instance)._base_manager.filter(pk=instance.pk)
+                .values_list("version", flat=True)
+                .first(),
+            },
+            status=status.HTTP_409_CONFLICT,
+        )
@@ -0,0 +1,247 @@
+"""
+Shared helpers for the BaseDatatableView JSON endpoints.
+
+Row HTML (status badges, action menus) is built from templates compiled
+once per process instead of running ``reverse`` and ``format_html`` for
+every cell of every row.
+"""
+
+import base64
+import functools
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.urls import reverse
+
+# Stand-in object id used to turn a reversed URL into a template.
+_ID_PLACEHOLDER = 987654321
+
+
+class _KeepMissing(dict):
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+
+@functools.lru_cache(maxsize=None)
+def url_template(name):
+    """``reverse(name, args=[pk])`` as a ``str.format`` template with an ``{id}`` field."""
+    return reverse(name, args=[_ID_PLACEHOLDER]).replace(str(_ID_PLACEHOLDER), "{id}")
+
+
+def compile_fragment(html, **url_names):
+    """
+    Fill the ``{<key>}`` URL slots of ``html`` with ``url_template(name)``
+    for every ``key=name`` given. The result is a template whose remaining
+    fields (``{id}`` and any row values) are filled per row with
+    ``str.format``; row values must be escaped by the caller.
+    """
+    return html.format_map(
+        _KeepMissing({key: url_template(name) for key, name in url_names.items()})
+    )
+
+
+# Seconds a page boundary stays usable for the next page of the same view.
+BOUNDARY_TTL = 300
+
+
+def _digest(*parts):
+    return hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, cls=DjangoJSONEncoder)
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """The key values of an ``encode_cursor`` token, or None when malformed."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        return None
+    return values if isinstance(values, list) else None
+
+
+def _column(model, path):
+    """The non-null column ``path`` names through forward FKs, or None."""
+    parts = path.split("__")
+    for name in parts[:-1]:
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        if not (field.many_to_one or field.one_to_one) or field.null or field.auto_created:
+            return None
+        model = field.related_model
+    try:
+        field = model._meta.get_field("id" if parts[-1] == "pk" else parts[-1])
+    except FieldDoesNotExist:
+        return None
+    if field.concrete and not field.is_relation and not field.null:
+        return field
+    return None
+
+
+def _seekable(model, path):
+    """True if ``path`` names a non-null column reached through forward FKs."""
+    return _column(model, path) is not None
+
+
+def _boundary(model, fields, values):
+    """
+    ``values`` converted to the types of the ``fields`` columns, or None
+    when they do not fit (a cursor is client input).
+    """
+    if not isinstance(values, list) or len(values) != len(fields):
+        return None
+    try:
+        values = [
+            _column(model, field).to_python(value)
+            for field, value in zip(fields, values)
+        ]
+    except (ValidationError, TypeError, ValueError):
+        return None
+    return None if None in values else values
+
+
+def _value_at(obj, path):
+    for name in path.split("__"):
+        obj = getattr(obj, name)
+    return obj
+
+
+def _after(order, values):
+    """Q for rows positioned after ``values`` in ``order`` (lexicographic seek)."""
+    condition = Q()
+    equal = Q()
+    for field, value in zip(order, values):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        condition |= equal & Q(**{f"{name}__{lookup}": value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+def _count_generation_key(model):
+    return f"datatable:count-generation:{model._meta.label_lower}"
+
+
+def cached_count(qs, search=""):
+    """
+    ``qs.count()``, cached per model, normalized search string and query
+    until ``invalidate_counts(qs.model)`` (wired to the model's save and
+    delete signals in inventory.signals) or ``DATATABLE_COUNT_TTL`` seconds
+    (default 300, a backstop for queryset-level writes). Use a shared cache
+    backend when running several processes.
+    """
+    generation = cache.get_or_set(_count_generation_key(qs.model), 0, None)
+    key = "datatable:count:" + _digest(
+        qs.model._meta.label_lower,
+        generation,
+        " ".join(str(search).lower().split()),
+        str(qs.query),
+    )
+    count = cache.get(key)
+    if count is None:
+        count = qs.count()
+        cache.set(key, count, getattr(settings, "DATATABLE_COUNT_TTL", 300))
+    return count
+
+
+def invalidate_counts(model):
+    """Drop every cached count of ``model`` by moving to a new generation."""
+    key = _count_generation_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+class KeysetPaginationMixin:
+    """
+    Seek pagination for BaseDatatableView subclasses.
+
+    Pages are read with ``WHERE (order columns, id) > last row`` instead of
+    OFFSET whenever the position of the previous page's last row is known:
+    either the client sends back the ``cursor`` of the previous response,
+    or the page boundary was cached when the previous page was served (so
+    plain DataTables "next" clicks seek too). Other jumps, and orderings on
+    nullable or to-many columns, fall back to OFFSET. The total and filtered
+    counts come from ``cached_count`` instead of ``COUNT(*)`` on every draw.
+    """
+
+    def get_context_data(self, *args, **kwargs):
+        self._keyset = None
+        self._page = None
+        ret = super().get_context_data(*args, **kwargs)
+        rows = self._page._result_cache if self._page is not None else None
+        if self._keyset and rows and len(rows) == self._keyset["limit"]:
+            boundary = [_value_at(rows[-1], field) for field in self._keyset["fields"]]
+            if None not in boundary:
+                cache.set(
+                    self._boundary_key(self._keyset["end"]), boundary, BOUNDARY_TTL
+                )
+                ret["cursor"] = encode_cursor(boundary)
+        return ret
+
+    # ------------------- Counting -------------------
+    def count_records(self, qs):
+        return cached_count(qs, self.request.GET.get("search[value]", ""))
+
+    # ------------------- Ordering -------------------
+    def ordering(self, qs):
+        qs = super().ordering(qs)
+        order = list(qs.query.order_by) or list(qs.model._meta.ordering)
+        if not all(isinstance(field, str) and field != "?" for field in order):
+            self._order = None
+            return qs
+        if not any(field.lstrip("-") in ("id", "pk") for field in order):
+            # Tie-breaker so every row has a unique position.
+            last = order[-1] if order else ""
+            order.append("-id" if last.startswith("-") else "id")
+        self._order = order
+        return qs.order_by(*order)
+
+    # ------------------- Paging -------------------
+    def paging(self, qs):
+        if self.pre_camel_case_notation:
+            self._page = super().paging(qs)
+            return self._page
+        limit = min(int(self._querydict.get("length", 10)), self.max_display_length)
+        start = int(self._querydict.get("start", 0))
+        if (
+            limit == -1
+            or self._order is None
+            or not all(_seekable(qs.model, f.lstrip("-")) for f in self._order)
+        ):
+            self._page = super().paging(qs)
+            return self._page
+
+        fields = [f.lstrip("-") for f in self._order]
+        self._keyset = {"fields": fields, "limit": limit, "end": start + limit}
+        cursor = self._querydict.get("cursor")
+        boundary = decode_cursor(cursor) if cursor else None
+        if boundary is None and start:
+            boundary = cache.get(self._boundary_key(start))
+        boundary = _boundary(qs.model, fields, boundary)
+        if boundary is None:
+            # No usable position (or a tampered cursor): read by OFFSET.
+            self._page = qs[start:start + limit]
+        else:
+            self._page = qs.filter(_after(self._order, boundary))[:limit]
+        return self._page
+
+    def _boundary_key(self, position):
+        params = sorted(
+            (key, value)
+            for key, value in self._querydict.items()
+            if key not in ("draw", "start", "cursor", "_")
+        )
+        return "datatable:boundary:" + _digest(
+            type(self).__name__, repr(params), position
+        )
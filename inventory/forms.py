@@ -1,5 +1,6 @@
 from django import forms
 from inventory.models import Supplier, Category, Warehouse, Product
+from inventory.category_tree import get_tree
 from decimal import Decimal, ROUND_HALF_UP
 
 
@@ -104,6 +105,7 @@ class CategoryForm(forms.ModelForm):
             "category_name",
             "parent_category",
             "is_active",
+            "reorder_level",
         ]
         widgets = {
             "category_name": forms.TextInput(
@@ -114,13 +116,16 @@ class CategoryForm(forms.ModelForm):
                 attrs={"class": "form-select"},
                 choices=[(True, "Active"), (False, "Inactive")],
             ),
+            "reorder_level": forms.NumberInput(
+                attrs={"class": "form-control", "placeholder": "Reorder Level"}
+            ),
         }
 
     def __init__(self, *args, **kwargs):
         self.request = kwargs.pop("request", None)
         super().__init__(*args, **kwargs)
         # Only top-level categories (parent_category is None) can be chosen
-        top_categories = Category.objects.filter(parent_category__isnull=True)
+        top_categories = get_tree().roots
         CATEGORY_CHOICES = [(c.id, c.category_name) for c in top_categories]
         self.fields["parent_category"].choices = [
             ("", "-- Select Parent Category --")
@@ -224,6 +229,7 @@ class ProductForm(forms.ModelForm):
             "tax_rate",
             "measure",
             "stock",
+            "reorder_level",
             "is_active",
             "notes",
         ]
@@ -250,6 +256,9 @@ class ProductForm(forms.ModelForm):
             "stock": forms.NumberInput(
                 attrs={"class": "form-control", "placeholder": "Stock"}
             ),
+            "reorder_level": forms.NumberInput(
+                attrs={"class": "form-control", "placeholder": "Reorder Level"}
+            ),
             "is_active": forms.Select(
                 attrs={"class": "form-select"},
                 choices=[(True, "Active"), (False, "Inactive")],
@@ -267,6 +276,11 @@ class ProductForm(forms.ModelForm):
         self.fields["category"].queryset = Category.objects.filter(
             is_active=True, parent_category__isnull=False
         )
+        # Labels come from the cached tree, not a parent query per option.
+        tree = get_tree()
+        self.fields["category"].choices = [("", "---------")] + tree.choices(
+            node for node in tree.nodes.values() if node.is_active and node.parent
+        )
 
     def clean(self):
         cleaned_data = super().clean()
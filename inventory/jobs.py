@@ -0,0 +1,175 @@
+"""
+Database-backed background jobs.
+
+``enqueue`` stores a Job row and ``python manage.py run_workers`` runs
+it with the task registered under its name (see inventory.tasks). Tasks
+are called as ``func(progress, **payload)``, where ``progress(done,
+total=None)`` records progress and doubles as the worker's heartbeat,
+and return a JSON-serializable result.
+
+A job is claimed with a conditional UPDATE on its status, so any number
+of worker processes can poll the same table without a broker or row
+locks. Failed attempts are retried after an exponential backoff until
+``max_attempts``; a running job whose worker sent no heartbeat for
+``JOB_LOCK_TIMEOUT`` seconds counts as a failed attempt.
+"""
+
+import logging
+import os
+import socket
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# task name -> (function, default max_attempts or None)
+_tasks = {}
+
+
+def task(name, max_attempts=None):
+    """Register the decorated function as the task ``name``."""
+
+    def decorator(func):
+        _tasks[name] = (func, max_attempts)
+        return func
+
+    return decorator
+
+
+def enqueue(name, payload=None, user=None, max_attempts=None):
+    """
+    Queue the task ``name`` with ``payload`` (a JSON-serializable dict of
+    keyword arguments) and return the Job. Inside a transaction the job
+    only becomes visible to workers once it commits.
+    """
+    if name not in _tasks:
+        raise KeyError(f"Unknown job task {name!r}")
+    return Job.objects.create(
+        task=name,
+        payload=payload or {},
+        created_by=user,
+        max_attempts=max_attempts
+        or _tasks[name][1]
+        or getattr(settings, "JOB_MAX_ATTEMPTS", 3),
+    )
+
+
+def backoff(attempts):
+    """Delay before retrying a job that has failed ``attempts`` times."""
+    base = getattr(settings, "JOB_RETRY_BACKOFF", 30)
+    cap = getattr(settings, "JOB_RETRY_BACKOFF_MAX", 3600)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), cap))
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _current(job):
+    # The claim a worker holds: attempts is bumped on every claim, so a
+    # worker whose job was taken over after a timeout cannot overwrite it.
+    return Job.objects.filter(pk=job.pk, status=Job.RUNNING, attempts=job.attempts)
+
+
+def claim(worker, candidates=10):
+    """Mark the oldest due job as running for ``worker`` and return it (or None)."""
+    now = timezone.now()
+    due = (
+        Job.objects.filter(status=Job.QUEUED, run_at__lte=now)
+        .order_by("run_at", "id")
+        .values_list("pk", flat=True)[:candidates]
+    )
+    for pk in list(due):
+        claimed = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+            status=Job.RUNNING,
+            locked_by=worker,
+            locked_at=now,
+            attempts=F("attempts") + 1,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def _fail(job, error):
+    now = timezone.now()
+    if job.attempts < job.max_attempts:
+        changes = {"status": Job.QUEUED, "run_at": now + backoff(job.attempts)}
+    else:
+        changes = {"status": Job.FAILED, "finished_at": now}
+    return _current(job).update(error=error, locked_by="", locked_at=None, **changes)
+
+
+def requeue_stale():
+    """Fail the current attempt of jobs whose worker went silent. Returns the count."""
+    timeout = getattr(settings, "JOB_LOCK_TIMEOUT", 600)
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff).only(
+        "pk", "status", "attempts", "max_attempts", "locked_by"
+    )
+    return sum(
+        _fail(job, f"Worker {job.locked_by} sent no heartbeat for {timeout}s.")
+        for job in stale
+    )
+
+
+def _reporter(job):
+    def progress(done, total=None):
+        changes = {"progress": done, "locked_at": timezone.now()}
+        if total is not None:
+            changes["total"] = total
+        _current(job).update(**changes)
+
+    return progress
+
+
+def run(job):
+    """Run a claimed job and record its result or failure. Returns True on success."""
+    func = _tasks.get(job.task, (None, None))[0]
+    try:
+        if func is None:
+            raise LookupError(f"Unknown job task {job.task!r}")
+        result = func(_reporter(job), **job.payload)
+    except Exception:
+        logger.exception("Job %s (%s) failed", job.pk, job.task)
+        _fail(job, traceback.format_exc())
+        return False
+    _current(job).update(
+        status=Job.SUCCEEDED,
+        result=result,
+        error="",
+        finished_at=timezone.now(),
+        locked_by="",
+        locked_at=None,
+    )
+    return True
+
+
+def work(worker=None, burst=False, poll_interval=1.0, stop=None):
+    """
+    Claim and run jobs until ``stop`` (an Event) is set or, with ``burst``,
+    until no job is due. Returns the number of jobs run.
+    """
+    worker = worker or worker_name()
+    stop = stop or threading.Event()
+    ran = 0
+    while not stop.is_set():
+        close_old_connections()
+        requeue_stale()
+        job = claim(worker)
+        if job is None:
+            if burst:
+                break
+            stop.wait(poll_interval)
+            continue
+        run(job)
+        ran += 1
+    return ran
@@ -0,0 +1,270 @@
+from django.db import connection, transaction
+from django.db.models import (
+    BigIntegerField,
+    BooleanField,
+    Case,
+    F,
+    Max,
+    PositiveIntegerField,
+    Q,
+    Sum,
+    When,
+)
+from django.utils import timezone
+
+from . import audit, stock_alerts
+from .concurrency import StaleWrite
+from .models import (
+    Inventory,
+    InventoryAudit,
+    Product,
+    StockCheckpoint,
+    StockMovement,
+    StockSnapshot,
+)
+
+
+class NegativeBalance(Exception):
+    """Raised when a movement would take a product's balance below zero."""
+
+    def __init__(self, product_ids):
+        super().__init__("Insufficient stock for some products.")
+        self.product_ids = product_ids
+
+
+def balance(product_id):
+    """Current balance of a product: a single primary-key style lookup."""
+    return (
+        Inventory.objects.filter(product_id=product_id)
+        .values_list("quantity", flat=True)
+        .first()
+        or 0
+    )
+
+
+def _case(deltas, lookup, then, output_field):
+    return Case(
+        *[When(**{lookup: pk}, then=then(delta)) for pk, delta in deltas.items()],
+        default=None,
+        output_field=output_field,
+    )
+
+
+def post(
+    deltas,
+    reason,
+    reference="",
+    user=None,
+    note="",
+    expected_versions=None,
+    mirror_product=True,
+):
+    """
+    Append one StockMovement per product in ``deltas`` ({product_id: delta})
+    and apply them to the Inventory projection (and the Product.stock
+    mirror) in the same transaction, with a fixed number of queries.
+
+    Raises NegativeBalance if any balance would drop below zero, and
+    StaleWrite if ``expected_versions`` ({product_id: Inventory.version})
+    no longer match. Nothing is written on error. InventoryAudit rows are
+    queued and bulk-written when the transaction commits, and products whose
+    stock went down are checked for low/out-of-stock alerts then.
+    """
+    deltas = {pk: delta for pk, delta in deltas.items() if delta}
+    if not deltas:
+        return []
+    product_ids = sorted(deltas)
+    expected_versions = expected_versions or {}
+    user_id = getattr(user, "pk", None)
+    if user is not None and not getattr(user, "is_authenticated", True):
+        user_id = None
+
+    with transaction.atomic():
+        # Lock the rows in product order (as confirm_order does) so the
+        # audit's old quantities are the ones the UPDATE below changes.
+        locked = (
+            Inventory.objects.select_for_update()
+            .filter(product_id__in=product_ids)
+            .order_by("product_id")
+            .values_list("product_id", "quantity")
+        )
+        existing = dict(locked)
+        missing = [pk for pk in product_ids if pk not in existing]
+        if missing:
+            Inventory.objects.bulk_create(
+                [Inventory(product_id=pk, quantity=0) for pk in missing],
+                ignore_conflicts=True,
+            )
+            # A concurrent posting may have created some of them first.
+            existing.update(locked.filter(product_id__in=missing))
+
+        movements = StockMovement.objects.bulk_create(
+            [
+                StockMovement(
+                    product_id=pk,
+                    delta=deltas[pk],
+                    reason=reason,
+                    reference=reference,
+                    user_id=user_id,
+                )
+                for pk in product_ids
+            ]
+        )
+        positions = {movement.product_id: movement.pk for movement in movements}
+
+        guard = Q()
+        for pk, delta in deltas.items():
+            condition = Q(product_id=pk)
+            if delta < 0:
+                condition &= Q(quantity__gte=-delta)
+            if pk in expected_versions:
+                condition &= Q(version=expected_versions[pk])
+            guard |= condition
+        updated = Inventory.objects.filter(guard).update(
+            quantity=_case(
+                deltas, "product_id", lambda d: F("quantity") + d, PositiveIntegerField()
+            ),
+            last_movement_id=_case(
+                positions, "product_id", lambda position: position, BigIntegerField()
+            ),
+            version=F("version") + 1,
+            last_updated=timezone.now(),
+        )
+        if updated != len(deltas):
+            current = dict(
+                Inventory.objects.filter(product_id__in=product_ids).values_list(
+                    "product_id", "version"
+                )
+            )
+            if any(current.get(pk) != v for pk, v in expected_versions.items()):
+                raise StaleWrite("Inventory was modified by another request.")
+            raise NegativeBalance(product_ids)
+
+        if mirror_product:
+            # SET expressions all see the old row, so stock <= -delta means
+            # the new stock is zero or less; mirror Product.save's rule.
+            Product.objects.filter(pk__in=product_ids).update(
+                stock=_case(deltas, "pk", lambda d: F("stock") + d, PositiveIntegerField()),
+                is_active=Case(
+                    *[
+                        When(pk=pk, stock__lte=-delta, then=False)
+                        for pk, delta in deltas.items()
+                    ],
+                    default=F("is_active"),
+                    output_field=BooleanField(),
+                ),
+                version=F("version") + 1,
+            )
+        audit.record(
+            InventoryAudit(
+                product_id=pk,
+                user_id=user_id,
+                old_quantity=existing.get(pk, 0),
+                new_quantity=existing.get(pk, 0) + deltas[pk],
+                note=(note or reference or reason)[:255],
+            )
+            for pk in product_ids
+        )
+        decreased = [pk for pk in product_ids if deltas[pk] < 0]
+        if decreased:
+            # One batched evaluation per posting; an alert failure is
+            # logged and never undoes the committed stock change.
+            transaction.on_commit(
+                lambda: stock_alerts.evaluate(decreased), robust=True
+            )
+    return movements
+
+
+def _balances(checkpoint=None, upto=None):
+    """Snapshot of ``checkpoint`` plus the ledger tail after it (up to ``upto``)."""
+    balances = {}
+    start = 0
+    if checkpoint is not None:
+        balances = dict(checkpoint.snapshots.values_list("product_id", "quantity"))
+        start = checkpoint.last_movement_id
+    tail = StockMovement.objects.filter(pk__gt=start)
+    if upto is not None:
+        tail = tail.filter(pk__lte=upto)
+    for product_id, delta in (
+        tail.values("product_id")
+        .annotate(total=Sum("delta"))
+        .order_by()
+        .values_list("product_id", "total")
+    ):
+        balances[product_id] = balances.get(product_id, 0) + delta
+    return balances
+
+
+def _hold_postings():
+    # Movement ids are handed out on insert but become visible on commit,
+    # so a posting still in flight can commit an id below the cut, which
+    # would then never be replayed. SHARE mode waits for the postings in
+    # flight and holds new ones until the checkpoint commits. SQLite runs
+    # one write transaction at a time, so its ids already commit in order.
+    if connection.vendor == "postgresql":
+        table = connection.ops.quote_name(StockMovement._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {table} IN SHARE MODE")
+
+
+def take_checkpoint(batch_size=1000):
+    """
+    Fold the ledger into a new StockCheckpoint so later rebuilds only replay
+    the movements after it. Derived from the ledger alone, and cut while
+    postings are held off, so it is consistent even while stock keeps
+    moving (postings wait for the one aggregate query and the snapshot).
+    """
+    with transaction.atomic():
+        _hold_postings()
+        previous = StockCheckpoint.objects.first()
+        last = StockMovement.objects.aggregate(last=Max("pk"))["last"] or 0
+        balances = _balances(previous, upto=last)
+        checkpoint = StockCheckpoint.objects.create(last_movement_id=last)
+        StockSnapshot.objects.bulk_create(
+            [
+                StockSnapshot(checkpoint=checkpoint, product_id=pk, quantity=quantity)
+                for pk, quantity in balances.items()
+            ],
+            batch_size=batch_size,
+        )
+    return checkpoint
+
+
+def rebuild_projection(dry_run=False, batch_size=1000):
+    """
+    Recompute every balance from the latest checkpoint plus the ledger tail
+    and repair Inventory.quantity / Product.stock rows that drifted.
+    Returns {product_id: ledger balance} for the drifted products.
+    """
+    with transaction.atomic():
+        balances = _balances(StockCheckpoint.objects.first())
+        drifted = {}
+        products = Product.objects.values_list("pk", "stock", "inventory__quantity")
+        for pk, stock, quantity in products.iterator(chunk_size=batch_size):
+            expected = balances.get(pk, 0)
+            if stock != expected or quantity != expected:
+                drifted[pk] = expected
+        if dry_run or not drifted:
+            return drifted
+
+        ids = sorted(drifted)
+        for start in range(0, len(ids), batch_size):
+            chunk = {pk: drifted[pk] for pk in ids[start:start + batch_size]}
+            missing = set(chunk) - set(
+                Inventory.objects.filter(product_id__in=chunk).values_list(
+                    "product_id", flat=True
+                )
+            )
+            Inventory.objects.bulk_create(
+                [Inventory(product_id=pk, quantity=0) for pk in missing],
+                ignore_conflicts=True,
+            )
+            Inventory.objects.filter(product_id__in=chunk).update(
+                quantity=_case(chunk, "product_id", lambda q: q, PositiveIntegerField()),
+                version=F("version") + 1,
+            )
+            Product.objects.filter(pk__in=chunk).update(
+                stock=_case(chunk, "pk", lambda q: q, PositiveIntegerField()),
+                version=F("version") + 1,
+            )
+    return drifted
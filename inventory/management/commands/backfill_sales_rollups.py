@@ -0,0 +1,45 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory import rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily sales rollup table from orders and order items."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from",
+            dest="day_from",
+            help="First day to rebuild (YYYY-MM-DD); defaults to the beginning",
+        )
+        parser.add_argument(
+            "--to",
+            dest="day_to",
+            help="Last day to rebuild (YYYY-MM-DD); defaults to the end",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rollup rows inserted per batch",
+        )
+
+    def parse_day(self, value):
+        if not value:
+            return None
+        try:
+            return datetime.date.fromisoformat(value)
+        except ValueError:
+            raise CommandError(f"Invalid date: {value}")
+
+    def handle(self, *args, **options):
+        day_from = self.parse_day(options["day_from"])
+        day_to = self.parse_day(options["day_to"])
+
+        self.stdout.write(self.style.NOTICE("🚀 Rebuilding sales rollups..."))
+        created = rollups.rebuild(day_from, day_to, batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"🎉 Wrote {created} sales rollup rows.")
+        )
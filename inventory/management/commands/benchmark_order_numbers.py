@@ -0,0 +1,76 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from inventory.models import Dealer, Order
+from inventory.order_numbers import BlockOrderNumberAllocator
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Benchmark the order number allocator by creating many orders in one day."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--total",
+            type=int,
+            default=100_000,
+            help="Number of orders to create",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Orders per bulk_create batch",
+        )
+        parser.add_argument(
+            "--block-size",
+            type=int,
+            default=None,
+            help="Order numbers reserved per sequence round-trip",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the generated orders instead of rolling back",
+        )
+
+    def handle(self, *args, **options):
+        total = options["total"]
+        batch_size = options["batch_size"]
+        allocator = BlockOrderNumberAllocator(block_size=options["block_size"])
+
+        self.stdout.write(self.style.NOTICE(f"🚀 Creating {total} orders..."))
+        numbers = set()
+        started = time.perf_counter()
+        try:
+            with transaction.atomic(), CaptureQueriesContext(connection) as queries:
+                dealer, _ = Dealer.objects.get_or_create(
+                    name="Benchmark Dealer", defaults={"phone_number": "0000000000"}
+                )
+                for offset in range(0, total, batch_size):
+                    batch = [
+                        Order(dealer=dealer, order_number=allocator.allocate())
+                        for _ in range(min(batch_size, total - offset))
+                    ]
+                    numbers.update(order.order_number for order in batch)
+                    Order.objects.bulk_create(batch)
+                elapsed = time.perf_counter() - started
+                query_count = len(queries)
+                if not options["keep"]:
+                    raise _Rollback()
+        except _Rollback:
+            pass
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"🎉 {total} orders in {elapsed:.2f}s "
+                f"({total / elapsed:,.0f} orders/s), {query_count} queries, "
+                f"{total - len(numbers)} duplicate numbers"
+            )
+        )
@@ -0,0 +1,138 @@
+import statistics
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from inventory import search
+from inventory.datatables import encode_cursor
+from inventory.models import Category, Product, Supplier, Warehouse
+from inventory.views import ProductListJson
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the product datatable endpoint (ProductListJson): queries "
+        "and latency per draw over a large generated catalog."
+    )
+
+    # name -> extra datatables parameters for the draw
+    DRAWS = {
+        "first page": {},
+        "sorted by warehouse": {"order[0][column]": 3, "order[0][dir]": "asc"},
+        "search": {"search[value]": "Product 4242"},
+        "typeahead": {"search[value]": "Prod"},
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--total",
+            type=int,
+            default=100_000,
+            help="Number of products to generate",
+        )
+        parser.add_argument(
+            "--warehouses",
+            type=int,
+            default=50,
+            help="Number of warehouses the products are spread over",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Products per bulk_create batch",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Timed runs per draw",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the generated products instead of rolling back",
+        )
+
+    def seed(self, total, warehouses, batch_size):
+        category = Category.objects.create(category_name="Benchmark Category")
+        supplier = Supplier.objects.create(
+            supplier_name="Benchmark Supplier", phone_number="0000000000"
+        )
+        warehouse_ids = [
+            w.pk
+            for w in Warehouse.objects.bulk_create(
+                [Warehouse(warehouse_name=f"Warehouse {n}") for n in range(warehouses)]
+            )
+        ]
+        # bulk_create skips Product.save and its signals: no ledger rows are
+        # booked and the search index is rebuilt once at the end.
+        for offset in range(0, total, batch_size):
+            Product.objects.bulk_create(
+                [
+                    Product(
+                        product_name=f"Product {n}",
+                        category=category,
+                        supplier=supplier,
+                        warehouse_id=warehouse_ids[n % warehouses],
+                        purchase_price=400,
+                        selling_price=500,
+                        tax_rate=18,
+                        measure="pcs",
+                        stock=n % 100,
+                        is_active=bool(n % 100),
+                    )
+                    for n in range(offset, min(offset + batch_size, total))
+                ]
+            )
+        search.rebuild(batch_size=batch_size)
+
+    def run_draw(self, params, repeat):
+        view = ProductListJson.as_view()
+        request = RequestFactory().get(
+            "/", {"draw": 1, "start": 0, "length": 10, **params}
+        )
+        timings = []
+        for _ in range(repeat):
+            # Measure cold draws: no cached counts or page boundaries.
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                view(request)
+                timings.append(time.perf_counter() - started)
+        return len(queries), statistics.median(timings) * 1000
+
+    def handle(self, *args, **options):
+        total = options["total"]
+        self.stdout.write(self.style.NOTICE(f"🚀 Generating {total} products..."))
+        try:
+            with transaction.atomic():
+                self.seed(total, options["warehouses"], options["batch_size"])
+                last = Product.objects.order_by("-created_at", "-id")[total - 11]
+                draws = {
+                    **self.DRAWS,
+                    "deep page (offset)": {"start": total - 10},
+                    "deep page (cursor)": {
+                        "start": total - 10,
+                        "cursor": encode_cursor([last.created_at, last.id]),
+                    },
+                }
+                for name, params in draws.items():
+                    query_count, latency = self.run_draw(params, options["repeat"])
+                    self.stdout.write(
+                        self.style.SUCCESS(
+                            f"🎉 {name}: {query_count} queries, {latency:.1f} ms (median)"
+                        )
+                    )
+                if not options["keep"]:
+                    raise _Rollback()
+        except _Rollback:
+            pass
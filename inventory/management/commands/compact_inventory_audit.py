@@ -0,0 +1,53 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from inventory import audit
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold old per-change InventoryAudit rows into daily net-change "
+        "summaries (InventoryAuditDaily) and delete them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            default=90,
+            help="Compact rows from days before this many days ago",
+        )
+        parser.add_argument(
+            "--before",
+            help="Compact rows from days before this date (YYYY-MM-DD); "
+            "overrides --older-than-days",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Audit rows read per batch",
+        )
+
+    def handle(self, *args, **options):
+        if options["before"]:
+            try:
+                before = datetime.date.fromisoformat(options["before"])
+            except ValueError:
+                raise CommandError(f"Invalid date: {options['before']}")
+        else:
+            before = timezone.now().date() - datetime.timedelta(
+                days=options["older_than_days"]
+            )
+
+        self.stdout.write(
+            self.style.NOTICE(f"🚀 Compacting inventory audit rows before {before}...")
+        )
+        folded, written = audit.compact(before, batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"🎉 Folded {folded} audit rows into {written} daily summaries."
+            )
+        )
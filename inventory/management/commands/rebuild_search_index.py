@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from inventory import search
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the datatable search index from products, suppliers, "
+        "categories and users (run after bulk imports)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Documents inserted per batch",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE("🚀 Rebuilding search index..."))
+        with transaction.atomic():
+            created = search.rebuild(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"🎉 Indexed {created} objects."))
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+
+from inventory import ledger
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild Inventory.quantity and Product.stock from the stock ledger "
+        "(latest checkpoint + replay of later movements)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--checkpoint",
+            action="store_true",
+            help="Take a new ledger checkpoint after rebuilding",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report drifted products, do not fix them",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Products updated per batch",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE("🚀 Replaying stock ledger..."))
+        drifted = ledger.rebuild_projection(
+            dry_run=options["dry_run"], batch_size=options["batch_size"]
+        )
+        if options["dry_run"]:
+            self.stdout.write(
+                self.style.WARNING(f"⚠️ {len(drifted)} products drifted from the ledger.")
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"🎉 Repaired {len(drifted)} drifted products.")
+            )
+
+        if options["checkpoint"] and not options["dry_run"]:
+            checkpoint = ledger.take_checkpoint(batch_size=options["batch_size"])
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"📌 Checkpoint taken at movement {checkpoint.last_movement_id}."
+                )
+            )
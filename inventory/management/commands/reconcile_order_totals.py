@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+
+from inventory import jobs
+from inventory.order_services import reconcile_order_totals
+
+
+class Command(BaseCommand):
+    help = "Find and fix Order.total_amount values that drifted from their line totals."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="Number of order ids scanned per batch",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report drifted orders, do not fix them",
+        )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help="Queue the scan for run_workers instead of running it here",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        dry_run = options["dry_run"]
+
+        if options["background"]:
+            job = jobs.enqueue(
+                "reconcile_order_totals",
+                {"batch_size": batch_size, "dry_run": dry_run},
+            )
+            self.stdout.write(self.style.SUCCESS(f"📬 Queued job {job.pk}."))
+            return
+
+        self.stdout.write(self.style.NOTICE("🚀 Scanning orders..."))
+        drifted, fixed = reconcile_order_totals(batch_size, dry_run)
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f"⚠️ {drifted} orders drifted."))
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"🎉 {drifted} drifted orders found, {fixed} fixed.")
+            )
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from inventory import reservations
+
+
+class Command(BaseCommand):
+    help = "Release expired draft-order stock reservations in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Reservations deleted per batch",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Keep running and sweep every N seconds (0 = run once)",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            released = reservations.release_expired(batch_size=options["batch_size"])
+            self.stdout.write(
+                self.style.SUCCESS(f"🧹 Released {released} expired reservations.")
+            )
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,75 @@
+import multiprocessing
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from inventory import jobs
+
+
+def _work(stop, burst, poll_interval):
+    # Entry point of a worker process; also valid under the spawn start method.
+    import django
+
+    django.setup()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    jobs.work(burst=burst, poll_interval=poll_interval, stop=stop)
+
+
+class Command(BaseCommand):
+    help = "Run background jobs from the database queue in a pool of worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=getattr(settings, "JOB_WORKER_PROCESSES", 1),
+            help="Number of worker processes",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds an idle worker waits before polling again",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once no job is due instead of waiting for new ones",
+        )
+
+    def handle(self, *args, **options):
+        processes = max(options["processes"], 1)
+        stop = multiprocessing.Event()
+        # Ctrl-C / SIGTERM let every worker finish its current job first.
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+
+        self.stdout.write(
+            self.style.NOTICE(f"🚀 Starting {processes} job worker process(es)...")
+        )
+        if processes == 1:
+            ran = jobs.work(
+                burst=options["burst"],
+                poll_interval=options["poll_interval"],
+                stop=stop,
+            )
+            self.stdout.write(self.style.SUCCESS(f"🎉 Worker stopped after {ran} jobs."))
+            return
+
+        # Forked children must not share the parent's database connection.
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(
+                target=_work,
+                args=(stop, options["burst"], options["poll_interval"]),
+                daemon=True,
+            )
+            for _ in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.stdout.write(self.style.SUCCESS(f"🎉 {processes} workers stopped."))
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from django.core.exceptions import ImproperlyConfigured
+from inventory import jobs
 from inventory.factories import ProductFactory  # adjust path accordingly
 
 
@@ -13,11 +14,21 @@ class Command(BaseCommand):
             default=10,
             help="Number of fake products to create",
         )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help="Queue the seeding for run_workers instead of running it here",
+        )
 
     def handle(self, *args, **options):
         total = options["total"]
         created = 0
 
+        if options["background"]:
+            job = jobs.enqueue("seed_products", {"total": total})
+            self.stdout.write(self.style.SUCCESS(f"📬 Queued job {job.pk}."))
+            return
+
         self.stdout.write(self.style.NOTICE(f"🚀 Creating {total} fake products..."))
 
         try:
@@ -23,8 +23,8 @@ class Command(BaseCommand):
             warehouse=warehouse,
             supplier=supplier
         )
-        # Create inventory record
-        Inventory.objects.get_or_create(product=product, quantity=100)
+        # Inventory record (booked from the product's opening stock)
+        Inventory.objects.get_or_create(product=product, defaults={'quantity': product.stock})
         # Create dealer
         dealer, _ = Dealer.objects.get_or_create(
             name='ABC Motors',
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-17 14:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_ordernumbersequence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['created_at', 'id'], name='inventory_o_created_9f0ff5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'created_at'], name='inventory_o_status_64129c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['dealer', 'created_at'], name='inventory_o_dealer__b2b9f4_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-17 14:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0010_order_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('draft', 'Draft'), ('confirmed', 'Confirmed'), ('delivered', 'Delivered')], max_length=10)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('quantity', models.PositiveBigIntegerField(default=0)),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('dealer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_rollups', to='inventory.dealer')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_rollups', to='inventory.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'status'], name='inventory_d_day_d7f75d_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'dealer', 'product', 'status'), name='unique_sales_rollup_bucket')],
+            },
+        ),
+    ]
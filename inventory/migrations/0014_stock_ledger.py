@@ -0,0 +1,95 @@
+# Generated by Django 5.2.6 on 2026-10-17 15:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def book_opening_balances(apps, schema_editor):
+    """
+    Start the ledger from the current Inventory.quantity (or Product.stock
+    when a product has no Inventory row) and make both fields agree.
+    """
+    Product = apps.get_model("inventory", "Product")
+    Inventory = apps.get_model("inventory", "Inventory")
+    StockMovement = apps.get_model("inventory", "StockMovement")
+
+    inventory = dict(Inventory.objects.values_list("product_id", "quantity"))
+    products = list(Product.objects.values_list("pk", "stock"))
+    Inventory.objects.bulk_create(
+        [
+            Inventory(product_id=pk, quantity=stock)
+            for pk, stock in products
+            if pk not in inventory
+        ],
+        batch_size=1000,
+    )
+    for pk, stock in products:
+        quantity = inventory.get(pk, stock)
+        if quantity != stock:
+            Product.objects.filter(pk=pk).update(stock=quantity)
+        if quantity:
+            movement = StockMovement.objects.create(
+                product_id=pk, delta=quantity, reason="opening", reference="migration"
+            )
+            Inventory.objects.filter(product_id=pk).update(
+                quantity=quantity, last_movement_id=movement.pk
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0013_stock_versions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_movement_id', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'stock_checkpoints',
+                'ordering': ['-last_movement_id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='inventory',
+            name='last_movement_id',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('delta', models.BigIntegerField()),
+                ('reason', models.CharField(choices=[('opening', 'Opening Balance'), ('adjustment', 'Manual Adjustment'), ('order_confirmed', 'Order Confirmed'), ('correction', 'Ledger Correction')], max_length=20)),
+                ('reference', models.CharField(blank=True, default='', max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='inventory.product')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'stock_movements',
+                'indexes': [models.Index(fields=['product', 'id'], name='stock_movem_product_78af25_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.BigIntegerField()),
+                ('checkpoint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='inventory.stockcheckpoint')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='inventory.product')),
+            ],
+            options={
+                'db_table': 'stock_snapshots',
+                'constraints': [models.UniqueConstraint(fields=('checkpoint', 'product'), name='unique_snapshot_per_product')],
+            },
+        ),
+        migrations.RunPython(book_opening_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.6 on 2026-10-17 15:12
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def assign_buckets(apps, schema_editor):
+    """Give existing audit rows the month bucket of their updated_at."""
+    InventoryAudit = apps.get_model("inventory", "InventoryAudit")
+    months = InventoryAudit.objects.dates("updated_at", "month")
+    for month in months:
+        InventoryAudit.objects.filter(
+            updated_at__year=month.year, updated_at__month=month.month
+        ).update(bucket=month.year * 100 + month.month)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0014_stock_ledger'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryAuditDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('opening_quantity', models.PositiveIntegerField()),
+                ('closing_quantity', models.PositiveIntegerField()),
+                ('net_change', models.BigIntegerField()),
+                ('changes', models.PositiveIntegerField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='inventoryaudit',
+            name='bucket',
+            field=models.PositiveIntegerField(default=0, editable=False),
+            preserve_default=False,
+        ),
+        migrations.RunPython(assign_buckets, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='inventoryaudit',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='inventoryaudit',
+            index=models.Index(fields=['product', 'updated_at'], name='inventory_i_product_b83b1b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventoryaudit',
+            index=models.Index(fields=['bucket', 'product', 'updated_at'], name='inventory_i_bucket_b4e06e_idx'),
+        ),
+        migrations.AddField(
+            model_name='inventoryauditdaily',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='audit_days', to='inventory.product'),
+        ),
+        migrations.AddConstraint(
+            model_name='inventoryauditdaily',
+            constraint=models.UniqueConstraint(fields=('product', 'day'), name='unique_audit_day_per_product'),
+        ),
+    ]
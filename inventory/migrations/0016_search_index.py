@@ -0,0 +1,115 @@
+# Generated by Django 5.2.6 on 2026-10-17 15:15
+
+import re
+
+from django.db import migrations, models
+
+FTS_TABLE = "inventory_searchdocument_fts"
+
+SQLITE_FORWARD = [
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        content, content='inventory_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON inventory_searchdocument BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.id, new.content);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON inventory_searchdocument BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content) VALUES ('delete', old.id, old.content);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON inventory_searchdocument BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content) VALUES ('delete', old.id, old.content);
+        INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.id, new.content);
+    END""",
+]
+SQLITE_BACKWARD = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}" for suffix in ("ai", "ad", "au")
+] + [f"DROP TABLE IF EXISTS {FTS_TABLE}"]
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX inventory_searchdocument_trgm ON inventory_searchdocument "
+    "USING gin (content gin_trgm_ops)",
+]
+POSTGRES_BACKWARD = ["DROP INDEX IF EXISTS inventory_searchdocument_trgm"]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        for sql in statements.get(vendor, []):
+            schema_editor.execute(sql)
+
+    return run
+
+
+# Frozen copy of the document format of inventory.search at the time of
+# this migration, so later edits to that module cannot change what it does.
+INDEXED_FIELDS = {
+    "inventory.product": ["product_name", "measure"],
+    "inventory.supplier": ["supplier_name", "contact_person", "phone_number", "email"],
+    "inventory.category": ["category_name"],
+    "auth.user": ["username", "first_name", "email", "groups__name"],
+}
+WORD = re.compile(r"\w+")
+
+
+def _content(parts):
+    words = dict.fromkeys(
+        word for part in parts for word in WORD.findall(str(part).lower())
+    )
+    return " " + " ".join(words)
+
+
+def _documents(model, fields):
+    current, parts = None, []
+    rows = model._base_manager.order_by("pk").values_list("pk", *fields)
+    for pk, *values in rows.iterator(chunk_size=1000):
+        if pk != current:
+            if current is not None:
+                yield current, _content(parts)
+            current, parts = pk, []
+        parts.extend(value for value in values if value not in (None, ""))
+    if current is not None:
+        yield current, _content(parts)
+
+
+def build_documents(apps, schema_editor):
+    SearchDocument = apps.get_model("inventory", "SearchDocument")
+    for label, fields in INDEXED_FIELDS.items():
+        batch = []
+        for pk, content in _documents(apps.get_model(label), fields):
+            batch.append(SearchDocument(label=label, object_id=pk, content=content))
+            if len(batch) >= 1000:
+                SearchDocument.objects.bulk_create(batch)
+                batch = []
+        SearchDocument.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0015_audit_buckets'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=50)),
+                ('object_id', models.BigIntegerField()),
+                ('content', models.TextField()),
+            ],
+            options={
+                'db_table': 'inventory_searchdocument',
+                'constraints': [models.UniqueConstraint(fields=('label', 'object_id'), name='unique_search_document')],
+            },
+        ),
+        migrations.RunPython(
+            _run({"sqlite": SQLITE_FORWARD, "postgresql": POSTGRES_FORWARD}),
+            _run({"sqlite": SQLITE_BACKWARD, "postgresql": POSTGRES_BACKWARD}),
+        ),
+        migrations.RunPython(build_documents, migrations.RunPython.noop),
+    ]
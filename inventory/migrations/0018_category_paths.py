@@ -0,0 +1,46 @@
+# Generated by Django 5.2.6 on 2026-10-17 15:23
+
+from django.db import migrations, models
+
+
+def build_paths(apps, schema_editor):
+    """Fill path/depth level by level, starting from the root categories."""
+    Category = apps.get_model("inventory", "Category")
+    level = list(
+        Category.objects.filter(parent_category__isnull=True).values_list("pk", flat=True)
+    )
+    paths = {pk: f"/{pk}/" for pk in level}
+    depth = 0
+    while level:
+        for pk in level:
+            Category.objects.filter(pk=pk).update(path=paths[pk], depth=depth)
+        children = list(
+            Category.objects.filter(parent_category__in=level).values_list(
+                "pk", "parent_category_id"
+            )
+        )
+        for pk, parent_id in children:
+            paths[pk] = f"{paths[parent_id]}{pk}/"
+        level = [pk for pk, _ in children]
+        depth += 1
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0017_datatable_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(build_paths, migrations.RunPython.noop),
+    ]
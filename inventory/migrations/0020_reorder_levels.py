@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-17 15:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0019_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='reorder_level',
+            field=models.PositiveIntegerField(blank=True, help_text='Default low-stock level for products in this category (and its sub-categories without their own)', null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='reorder_level',
+            field=models.PositiveIntegerField(blank=True, help_text="Alert when stock falls to this level; empty uses the category's", null=True),
+        ),
+    ]
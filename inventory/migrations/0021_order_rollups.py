@@ -0,0 +1,46 @@
+# Generated by Django 5.2.6 on 2026-10-17 16:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill(apps, schema_editor):
+    Order = apps.get_model("inventory", "Order")
+    DailyOrderRollup = apps.get_model("inventory", "DailyOrderRollup")
+    buckets = (
+        Order.objects.filter(status__in=["confirmed", "delivered"])
+        .annotate(day=TruncDate("created_at"))
+        .values("day", "dealer_id", "status")
+        .annotate(order_count=Count("id"))
+        .order_by()
+    )
+    DailyOrderRollup.objects.bulk_create(
+        (DailyOrderRollup(**bucket) for bucket in buckets.iterator()), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0020_reorder_levels'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyOrderRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('draft', 'Draft'), ('confirmed', 'Confirmed'), ('delivered', 'Delivered')], max_length=10)),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('dealer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_rollups', to='inventory.dealer')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'status'], name='inventory_d_day_a7c509_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'dealer', 'status'), name='unique_order_rollup_bucket')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
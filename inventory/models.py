@@ -1,10 +1,24 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Exists, F, Func, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Concat, Substr
+from django.db.models.lookups import StartsWith
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.urls import reverse
 from django.utils import timezone
 import uuid
-from .order_models import Dealer, Inventory, Order, OrderItem
+from .order_models import (  # noqa: F401 (re-exported models)
+    DailyOrderRollup,
+    DailySalesRollup,
+    Dealer,
+    Inventory,
+    Order,
+    OrderItem,
+    OrderNumberSequence,
+    StockReservation,
+)
 from django.contrib.auth.models import User
+from .concurrency import VersionedModel
 
 # Create your models here.
 
@@ -48,6 +62,9 @@ class Supplier(models.Model):
     class Meta:
         db_table = "suppliers"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["created_at", "id"]),
+        ]
         verbose_name = "Supplier"
         verbose_name_plural = "Suppliers"
         permissions = [
@@ -58,6 +75,39 @@ class Supplier(models.Model):
         return self.supplier_name
 
 
+# Subtrees are matched by path prefix (LIKE 'p%'), which holds under any
+# collation; on Postgres the CharField's db_index also gets a pattern_ops
+# index that serves it.
+class CategoryQuerySet(models.QuerySet):
+    def subtrees(self):
+        """The categories of this queryset and all their descendants (one query)."""
+        roots = self.model.objects.filter(pk__in=self.values("pk"))
+        return self.model.objects.filter(
+            Exists(roots.filter(StartsWith(OuterRef("path"), F("path"))))
+        )
+
+    @staticmethod
+    def _subtree_products():
+        """Products in the subtree of the outer query's category."""
+        return Product.objects.filter(category__path__startswith=OuterRef("path"))
+
+    def with_subtree_product_counts(self):
+        """Annotate ``subtree_products``: products in each category's subtree."""
+        products = (
+            self._subtree_products()
+            .order_by()
+            .annotate(n=Func("pk", function="COUNT", output_field=models.IntegerField()))
+            .values("n")
+        )
+        return self.annotate(
+            subtree_products=Coalesce(Subquery(products), 0)
+        )
+
+    def with_subtree_has_products(self):
+        """Annotate ``has_products``: any product in the category's subtree."""
+        return self.annotate(has_products=Exists(self._subtree_products()))
+
+
 class Category(models.Model):
     category_name = models.CharField(
         max_length=100,
@@ -76,6 +126,17 @@ class Category(models.Model):
     is_active = models.BooleanField(
         default=True, help_text="Active categories are visible"
     )
+    reorder_level = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Default low-stock level for products in this category "
+        "(and its sub-categories without their own)",
+    )
+    # Materialized path of ids from the root, e.g. "/1/5/12/"; kept by save().
+    path = models.CharField(
+        max_length=255, blank=True, default="", editable=False, db_index=True
+    )
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
 
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -101,6 +162,7 @@ class Category(models.Model):
         verbose_name_plural = "Categories"
         indexes = [
             models.Index(fields=["category_name"]),
+            models.Index(fields=["created_at", "id"]),
         ]
         constraints = [
             models.UniqueConstraint(
@@ -110,17 +172,66 @@ class Category(models.Model):
         ]
 
     def __str__(self):
-        if self.parent_category:
-            return f"{self.parent_category} -> {self.category_name}"
+        if self.parent_category_id:
+            from .category_tree import get_tree
+
+            # Parent chain from the cached tree instead of a query per level.
+            parent = get_tree().label(self.parent_category_id) or str(
+                self.parent_category
+            )
+            return f"{parent} -> {self.category_name}"
         return self.category_name
 
+    objects = CategoryQuerySet.as_manager()
+
     def clean(self):
         if self.parent_category and self.parent_category == self:
             raise ValidationError("Category cannot be its own parent.")
+        if (
+            self.parent_category
+            and self.path
+            and self.parent_category.path.startswith(self.path)
+        ):
+            raise ValidationError("Category cannot be moved under its own sub-category.")
 
     def save(self, *args, **kwargs):
         self.full_clean()  # runs clean() and field validations
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self._update_path()
+
+    def _update_path(self):
+        parent_path = "/"
+        if self.parent_category_id:
+            parent_path = (
+                Category.objects.filter(pk=self.parent_category_id)
+                .values_list("path", flat=True)
+                .get()
+            )
+        old_path, new_path = self.path, f"{parent_path}{self.pk}/"
+        if old_path == new_path:
+            return
+        depth = new_path.count("/") - 2
+        Category.objects.filter(pk=self.pk).update(path=new_path, depth=depth)
+        if old_path:
+            # Re-root the whole subtree with one UPDATE.
+            self.descendants().update(
+                path=Concat(Value(new_path), Substr("path", len(old_path) + 1)),
+                depth=F("depth") + (depth - self.depth),
+            )
+        self.path, self.depth = new_path, depth
+
+    def subtree_q(self, prefix=""):
+        """Q matching this category and its descendants (``prefix`` e.g. "category__")."""
+        return Q(**{f"{prefix}path__startswith": self.path})
+
+    def descendants(self):
+        return Category.objects.filter(self.subtree_q()).exclude(pk=self.pk)
+
+    def ancestors(self):
+        """Ancestors from the root down, in one query."""
+        ids = [int(pk) for pk in self.path.strip("/").split("/")[:-1]]
+        return Category.objects.filter(pk__in=ids).order_by("depth")
 
 
 class Warehouse(models.Model):
@@ -154,7 +265,7 @@ def product_image_upload(instance, filename):
     return f"products/images/{filename}"
 
 
-class Product(models.Model):
+class Product(VersionedModel):
     image = models.ImageField(upload_to=product_image_upload, null=True, blank=True)
     product_name = models.CharField(max_length=100)
     category = models.ForeignKey(
@@ -171,6 +282,11 @@ class Product(models.Model):
     tax_rate = models.DecimalField(max_digits=5, decimal_places=2)
     measure = models.CharField(max_length=100)
     stock = models.PositiveIntegerField()
+    reorder_level = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Alert when stock falls to this level; empty uses the category's",
+    )
     is_active = models.BooleanField(default=True)
     notes = models.TextField(blank=True, null=True)
     manufacture_date = models.DateField(blank=True, null=True)
@@ -196,10 +312,17 @@ class Product(models.Model):
     class Meta:
         db_table = "products"
         ordering = ["-created_at"]
+        # Default datatable order; the id makes it a unique keyset.
+        indexes = [
+            models.Index(fields=["created_at", "id"]),
+        ]
 
     def __str__(self):
         return self.product_name
 
+    def get_absolute_url(self):
+        return reverse("view_product", args=[self.pk])
+
     @property
     def is_expired(self):
         return self.expiry_date and self.expiry_date < timezone.now().date()
@@ -224,9 +347,34 @@ class Product(models.Model):
             )
 
     def save(self, *args, **kwargs):
+        from . import ledger
+
         if self.stock <= 0:
             self.is_active = False
-        super().save(*args, **kwargs)
+        adding = self._state.adding
+        update_fields = kwargs.get("update_fields")
+        with transaction.atomic():
+            if adding or (update_fields is not None and "stock" not in update_fields):
+                posted = 0 if adding else self.stock
+            else:
+                posted = (
+                    Product.objects.filter(pk=self.pk)
+                    .values_list("stock", flat=True)
+                    .first()
+                )
+            super().save(*args, **kwargs)
+            # Stock edits are booked on the ledger so Inventory follows them.
+            ledger.post(
+                {self.pk: self.stock - (posted or 0)},
+                "opening" if adding else "adjustment",
+                reference="product form",
+                mirror_product=False,
+            )
+
+
+def month_bucket(value):
+    """Monthly partition key for time-bucketed tables, e.g. 202603."""
+    return value.year * 100 + value.month
 
 
 class InventoryAudit(models.Model):
@@ -234,8 +382,190 @@ class InventoryAudit(models.Model):
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     old_quantity = models.PositiveIntegerField()
     new_quantity = models.PositiveIntegerField()
-    updated_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(default=timezone.now, editable=False)
+    # Month of updated_at; lets history and compaction touch one bucket.
+    bucket = models.PositiveIntegerField(editable=False)
     note = models.CharField(max_length=255, blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["product", "updated_at"]),
+            models.Index(fields=["bucket", "product", "updated_at"]),
+        ]
+
+    def assign_bucket(self):
+        self.bucket = month_bucket(self.updated_at)
+
+    def save(self, *args, **kwargs):
+        self.assign_bucket()
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        # Only use related objects that are already loaded; never query here.
+        product = (
+            self.product.product_name
+            if InventoryAudit.product.is_cached(self)
+            else f"Product #{self.product_id}"
+        )
+        user = self.user if InventoryAudit.user.is_cached(self) else self.user_id
+        return f"{product} changed from {self.old_quantity} to {self.new_quantity} by {user}"
+
+
+class InventoryAuditDaily(models.Model):
+    """Net stock change per product and day, folded from old InventoryAudit rows."""
+
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="audit_days"
+    )
+    day = models.DateField()
+    opening_quantity = models.PositiveIntegerField()
+    closing_quantity = models.PositiveIntegerField()
+    net_change = models.BigIntegerField()
+    changes = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product", "day"], name="unique_audit_day_per_product"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} {self.day}: {self.net_change:+d} ({self.changes} changes)"
+
+
+class StockMovement(models.Model):
+    """
+    Append-only stock ledger. ``Inventory.quantity`` and ``Product.stock``
+    are projections of the sum of these rows, maintained by inventory.ledger.
+    """
+
+    REASON_CHOICES = [
+        ("opening", "Opening Balance"),
+        ("adjustment", "Manual Adjustment"),
+        ("order_confirmed", "Order Confirmed"),
+        ("correction", "Ledger Correction"),
+    ]
+
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="stock_movements"
+    )
+    delta = models.BigIntegerField()
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    reference = models.CharField(max_length=100, blank=True, default="")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "stock_movements"
+        indexes = [
+            models.Index(fields=["product", "id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} {self.delta:+d} ({self.reason})"
+
+
+class StockCheckpoint(models.Model):
+    """Ledger position at which a full set of StockSnapshot rows was taken."""
+
+    last_movement_id = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "stock_checkpoints"
+        ordering = ["-last_movement_id"]
+
+    def __str__(self):
+        return f"Checkpoint @ {self.last_movement_id}"
+
+
+class StockSnapshot(models.Model):
+    checkpoint = models.ForeignKey(
+        StockCheckpoint, on_delete=models.CASCADE, related_name="snapshots"
+    )
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    quantity = models.BigIntegerField()
+
+    class Meta:
+        db_table = "stock_snapshots"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["checkpoint", "product"], name="unique_snapshot_per_product"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} = {self.quantity} @ {self.checkpoint_id}"
+
+
+class SearchDocument(models.Model):
+    """
+    Normalized searchable words of one object, maintained by inventory.search.
+    ``label`` is the model label (e.g. "inventory.product").
+    """
+
+    label = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    content = models.TextField()
+
+    class Meta:
+        db_table = "inventory_searchdocument"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["label", "object_id"], name="unique_search_document"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.label} #{self.object_id}"
+
+
+class Job(models.Model):
+    """
+    A unit of background work, queued by inventory.jobs.enqueue and run by
+    ``python manage.py run_workers``. The table is the whole broker.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (SUCCEEDED, "Succeeded"),
+        (FAILED, "Failed"),
+    ]
+
+    task = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    # Earliest time the job may (re)start; pushed out by retry backoff.
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    # Worker holding the job, and its last heartbeat.
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "jobs"
+        indexes = [
+            models.Index(fields=["status", "run_at"]),
+            models.Index(fields=["status", "locked_at"]),
+        ]
+
     def __str__(self):
-        return f"{self.product.product_name} changed from {self.old_quantity} to {self.new_quantity} by {self.user}"
+        return f"{self.task} #{self.pk} ({self.status})"
@@ -1,7 +1,7 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.contrib.auth.models import User
-from django.utils import timezone
-import uuid
+from .concurrency import VersionedModel
 
 class Dealer(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -14,9 +14,10 @@ class Dealer(models.Model):
     def __str__(self):
         return self.name
 
-class Inventory(models.Model):
+class Inventory(VersionedModel):
     product = models.OneToOneField('Product', on_delete=models.CASCADE, related_name='inventory')
     quantity = models.PositiveIntegerField(default=0)
+    last_movement_id = models.BigIntegerField(default=0, editable=False)
     last_updated = models.DateTimeField(auto_now=True)
     def __str__(self):
         return f"{self.product.product_name} - {self.quantity}"
@@ -33,23 +34,129 @@ class Order(models.Model):
     total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['dealer', 'created_at']),
+        ]
     def save(self, *args, **kwargs):
         if not self.order_number:
-            today = timezone.now().strftime('%Y%m%d')
-            unique_id = str(uuid.uuid4())[:4]
-            self.order_number = f"ORD-{today}-{unique_id}"
+            from .order_numbers import next_order_number
+            self.order_number = next_order_number()
         super().save(*args, **kwargs)
     def __str__(self):
         return self.order_number
 
+class OrderNumberSequence(models.Model):
+    """Per-day counter that order number blocks are reserved from."""
+    day = models.DateField(unique=True)
+    last_value = models.PositiveBigIntegerField(default=0)
+    def __str__(self):
+        return f"{self.day:%Y%m%d} @ {self.last_value}"
+
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
     product = models.ForeignKey('Product', on_delete=models.PROTECT)
     quantity = models.PositiveIntegerField()
     unit_price = models.DecimalField(max_digits=10, decimal_places=2)
     line_total = models.DecimalField(max_digits=10, decimal_places=2, editable=False)
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what this row contributed to Order.total_amount when loaded.
+        if 'order_id' in field_names and 'line_total' in field_names:
+            instance._counted = (instance.order_id, instance.line_total)
+        return instance
+    def _adjust_order_total(self, order_id, delta):
+        if order_id and delta:
+            Order.objects.filter(pk=order_id).update(total_amount=F('total_amount') + delta)
     def save(self, *args, **kwargs):
         self.line_total = self.quantity * self.unit_price
-        super().save(*args, **kwargs)
+        previous = getattr(self, '_counted', None)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if previous is None:
+                self._adjust_order_total(self.order_id, self.line_total)
+            elif previous[0] != self.order_id:
+                self._adjust_order_total(previous[0], -previous[1])
+                self._adjust_order_total(self.order_id, self.line_total)
+            else:
+                self._adjust_order_total(self.order_id, self.line_total - previous[1])
+        self._counted = (self.order_id, self.line_total)
+    def delete(self, *args, **kwargs):
+        previous = getattr(self, '_counted', (self.order_id, self.line_total))
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            self._adjust_order_total(previous[0], -previous[1])
+        self._counted = None
+        return result
     def __str__(self):
         return f"{self.product.product_name} x {self.quantity}"
+
+class StockReservation(models.Model):
+    """
+    Soft hold of Inventory stock for a draft order line until ``expires_at``.
+    Managed by inventory.reservations.
+    """
+    order_item = models.OneToOneField(OrderItem, on_delete=models.CASCADE, related_name='reservation')
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='reservations')
+    product = models.ForeignKey('Product', on_delete=models.CASCADE, related_name='reservations')
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    class Meta:
+        indexes = [
+            models.Index(fields=['product', 'expires_at']),
+            models.Index(fields=['expires_at']),
+        ]
+    def __str__(self):
+        return f"{self.quantity} x product={self.product_id} until {self.expires_at:%Y-%m-%d %H:%M}"
+
+class DailySalesRollup(models.Model):
+    """
+    Pre-aggregated confirmed/delivered sales per day, dealer, product and
+    order status. Maintained by inventory.rollups; drafts are not counted.
+    """
+    day = models.DateField()
+    dealer = models.ForeignKey(Dealer, on_delete=models.CASCADE, related_name='sales_rollups')
+    product = models.ForeignKey('Product', on_delete=models.CASCADE, related_name='sales_rollups')
+    status = models.CharField(max_length=10, choices=Order.STATUS_CHOICES)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    quantity = models.PositiveBigIntegerField(default=0)
+    order_count = models.PositiveIntegerField(default=0)
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'dealer', 'product', 'status'],
+                name='unique_sales_rollup_bucket',
+            )
+        ]
+        indexes = [
+            models.Index(fields=['day', 'status']),
+        ]
+    def __str__(self):
+        return f"{self.day} {self.status} dealer={self.dealer_id} product={self.product_id}"
+
+class DailyOrderRollup(models.Model):
+    """
+    Confirmed/delivered order counts per day, dealer and order status.
+    Kept apart from DailySalesRollup, whose per-product order counts count
+    an order once for each product on it.
+    """
+    day = models.DateField()
+    dealer = models.ForeignKey(Dealer, on_delete=models.CASCADE, related_name='order_rollups')
+    status = models.CharField(max_length=10, choices=Order.STATUS_CHOICES)
+    order_count = models.PositiveIntegerField(default=0)
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'dealer', 'status'],
+                name='unique_order_rollup_bucket',
+            )
+        ]
+        indexes = [
+            models.Index(fields=['day', 'status']),
+        ]
+    def __str__(self):
+        return f"{self.day} {self.status} dealer={self.dealer_id}"
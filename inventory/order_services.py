@@ -0,0 +1,256 @@
+from django.db import transaction
+from django.db.models import DecimalField, F, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Dealer, Inventory, Order, OrderItem, Product
+from .order_numbers import next_order_number
+from . import ledger, reservations, rollups
+
+
+class OrderStateError(Exception):
+    """Raised when an order is not in the status an action expects."""
+
+
+class InsufficientStock(Exception):
+    """Raised when one or more order lines cannot be covered by inventory."""
+
+    def __init__(self, details):
+        super().__init__("Insufficient stock for some products.")
+        self.details = details
+
+
+class _StockMoved(Exception):
+    """The guarded ledger post failed although the locked snapshot allowed it."""
+
+
+def _requested_quantities(order_id):
+    """
+    Total requested quantity per product for an order, in one grouped query.
+    Ordered by product id so rows are always locked in the same order.
+    """
+    return list(
+        OrderItem.objects.filter(order_id=order_id)
+        .values("product_id", "product__product_name")
+        .annotate(requested=Sum("quantity"))
+        .order_by("product_id")
+    )
+
+
+def _available_quantities(product_ids, lock=False):
+    qs = Inventory.objects.filter(product_id__in=product_ids).order_by("product_id")
+    if lock:
+        qs = qs.select_for_update()
+    return dict(qs.values_list("product_id", "quantity"))
+
+
+def _shortages(lines, available):
+    return [
+        {
+            "product": line["product__product_name"],
+            "available": available.get(line["product_id"], 0),
+            "requested": line["requested"],
+        }
+        for line in lines
+        if line["requested"] > available.get(line["product_id"], 0)
+    ]
+
+
+def confirm_order(order_id):
+    """
+    Confirm a draft order and deduct its stock.
+
+    Runs in a single transaction with a constant number of queries regardless
+    of the number of lines:
+      1. lock the order row and check it is still a draft
+      2. aggregate requested quantities per product
+      3. lock every affected Inventory row in product-id order and subtract
+         the stock other orders hold
+      4. book the deduction on the stock ledger (one guarded UPDATE of the
+         Inventory projection) and drop this order's holds
+      5. flip the order status
+    Raises OrderStateError or InsufficientStock; nothing is written on error.
+    """
+    try:
+        with transaction.atomic():
+            order = Order.objects.select_for_update().get(pk=order_id)
+            if order.status != "draft":
+                raise OrderStateError("Only draft orders can be confirmed.")
+
+            lines = _requested_quantities(order.pk)
+            product_ids = [line["product_id"] for line in lines]
+            available = _available_quantities(product_ids, lock=True)
+            # This order's own holds are converted, everyone else's still
+            # count against the stock.
+            held = reservations.reserved_quantities(
+                product_ids, exclude={"order_id": order.pk}
+            )
+            available = {
+                product_id: quantity - held.get(product_id, 0)
+                for product_id, quantity in available.items()
+            }
+
+            insufficient = _shortages(lines, available)
+            if insufficient:
+                raise InsufficientStock(insufficient)
+
+            try:
+                ledger.post(
+                    {line["product_id"]: -line["requested"] for line in lines},
+                    "order_confirmed",
+                    reference=order.order_number,
+                )
+            except ledger.NegativeBalance:
+                raise _StockMoved()
+            reservations.release_order(order.pk)
+
+            order.status = "confirmed"
+            order.save(update_fields=["status", "updated_at"])
+            rollups.record_transition([order.pk], "draft", "confirmed")
+    except _StockMoved:
+        # Rolled back; report against the stock as it is now.
+        raise InsufficientStock(_shortages(lines, _available_quantities(product_ids)))
+    return order
+
+
+def deliver_order(order_id):
+    """Mark a confirmed order as delivered. Raises OrderStateError otherwise."""
+    with transaction.atomic():
+        order = Order.objects.select_for_update().get(pk=order_id)
+        if order.status != "confirmed":
+            raise OrderStateError("Only confirmed orders can be delivered.")
+        order.status = "delivered"
+        order.save(update_fields=["status", "updated_at"])
+        rollups.record_transition([order.pk], "confirmed", "delivered")
+    return order
+
+
+def create_orders(orders):
+    """
+    Create many draft orders with their lines using bulk_create.
+
+    ``orders`` is a list of dicts shaped like ``BulkOrderSerializer`` data:
+    ``{"dealer": id, "items": [{"product": id, "quantity": n, "unit_price": p}]}``
+    (``unit_price`` defaults to the product's selling price). Dealers and
+    products are resolved with one query each, ``line_total`` and
+    ``total_amount`` are computed before insert, and orders referencing
+    unknown dealers/products are skipped. Returns one result dict per input
+    order, in input order.
+    """
+    dealer_ids = {order["dealer"] for order in orders}
+    product_ids = {item["product"] for order in orders for item in order["items"]}
+    known_dealers = set(
+        Dealer.objects.filter(pk__in=dealer_ids).values_list("pk", flat=True)
+    )
+    prices = dict(
+        Product.objects.filter(pk__in=product_ids).values_list("pk", "selling_price")
+    )
+
+    results = []
+    to_create = []
+    for index, data in enumerate(orders):
+        errors = {}
+        if data["dealer"] not in known_dealers:
+            errors["dealer"] = [f"Invalid pk \"{data['dealer']}\" - object does not exist."]
+        missing = sorted(
+            {item["product"] for item in data["items"]} - prices.keys()
+        )
+        if missing:
+            errors["items"] = [f"Invalid product pk(s): {', '.join(map(str, missing))}."]
+        if errors:
+            results.append({"index": index, "status": "error", "errors": errors})
+            continue
+
+        items = []
+        for item in data["items"]:
+            unit_price = item.get("unit_price")
+            if unit_price is None:
+                unit_price = prices[item["product"]]
+            items.append(
+                OrderItem(
+                    product_id=item["product"],
+                    quantity=item["quantity"],
+                    unit_price=unit_price,
+                    line_total=item["quantity"] * unit_price,
+                )
+            )
+        order = Order(
+            dealer_id=data["dealer"],
+            order_number=next_order_number(),
+            total_amount=sum(item.line_total for item in items),
+        )
+        result = {"index": index, "status": "created"}
+        results.append(result)
+        to_create.append((order, items, result))
+
+    with transaction.atomic():
+        Order.objects.bulk_create([order for order, _, _ in to_create])
+        lines = []
+        for order, items, _ in to_create:
+            for item in items:
+                item.order = order
+                lines.append(item)
+        OrderItem.objects.bulk_create(lines, batch_size=1000)
+        reservations.hold_items(lines)
+
+    for order, items, result in to_create:
+        result.update(
+            {
+                "id": order.pk,
+                "order_number": order.order_number,
+                "total_amount": order.total_amount,
+                "items": len(items),
+            }
+        )
+    return results
+
+
+def order_total_expression():
+    """Sum of an order's line totals as a correlated subquery (0 when empty)."""
+    totals = (
+        OrderItem.objects.filter(order=OuterRef("pk"))
+        .order_by()
+        .values("order")
+        .annotate(total=Sum("line_total"))
+        .values("total")
+    )
+    return Coalesce(
+        Subquery(totals),
+        Value(0),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+
+
+def recalculate_order_totals(order_ids):
+    """
+    Recompute ``total_amount`` for ``order_ids`` with one grouped UPDATE.
+    Use after queryset-level writes to OrderItem (bulk_create, update,
+    delete), which bypass the per-row delta maintained by OrderItem.save.
+    """
+    return Order.objects.filter(pk__in=order_ids).update(
+        total_amount=order_total_expression()
+    )
+
+
+def reconcile_order_totals(batch_size=10000, dry_run=False, progress=None):
+    """
+    Find orders whose ``total_amount`` drifted from their line totals and,
+    unless ``dry_run``, fix them. Scans pk ranges of ``batch_size`` (no
+    OFFSET) and calls ``progress(scanned_up_to, last_id)`` after each.
+    Returns ``(drifted, fixed)``.
+    """
+    last_id = Order.objects.aggregate(last=Max("pk"))["last"] or 0
+    drifted = fixed = 0
+    for start in range(0, last_id, batch_size):
+        batch = Order.objects.filter(pk__gt=start, pk__lte=start + batch_size)
+        ids = list(
+            batch.annotate(computed=order_total_expression())
+            .exclude(total_amount=F("computed"))
+            .values_list("pk", flat=True)
+        )
+        drifted += len(ids)
+        if ids and not dry_run:
+            with transaction.atomic():
+                fixed += recalculate_order_totals(ids)
+        if progress:
+            progress(min(start + batch_size, last_id), last_id)
+    return drifted, fixed
@@ -0,0 +1,163 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Inventory, StockReservation
+
+
+def reservation_ttl():
+    return timedelta(seconds=getattr(settings, "STOCK_RESERVATION_TTL", 30 * 60))
+
+
+def active_reservations(now=None):
+    return StockReservation.objects.filter(expires_at__gt=now or timezone.now())
+
+
+def reserved_quantities(product_ids, exclude=None):
+    """
+    Actively held quantity per product, from one grouped query on the
+    (product, expires_at) index. ``exclude`` is an optional dict of lookups
+    for holds to leave out (e.g. ``{"order_id": 5}``).
+    """
+    qs = active_reservations().filter(product_id__in=product_ids)
+    if exclude:
+        qs = qs.exclude(**exclude)
+    return dict(
+        qs.values("product_id")
+        .annotate(held=Sum("quantity"))
+        .order_by()
+        .values_list("product_id", "held")
+    )
+
+
+def available_quantity_expression():
+    """``Inventory.quantity`` minus active holds, for annotating Inventory querysets."""
+    held = (
+        active_reservations()
+        .filter(product_id=OuterRef("product_id"))
+        .values("product_id")
+        .annotate(held=Sum("quantity"))
+        .order_by()
+        .values("held")
+    )
+    return F("quantity") - Coalesce(
+        Subquery(held), 0, output_field=IntegerField()
+    )
+
+
+def available_quantities(product_ids):
+    """Sellable quantity (stock minus active holds) per product, in one query."""
+    return dict(
+        Inventory.objects.filter(product_id__in=product_ids)
+        .annotate(available=available_quantity_expression())
+        .values_list("product_id", "available")
+    )
+
+
+def hold_items(items):
+    """
+    (Re)place holds for saved draft-order ``items`` and push their expiry out
+    by the TTL. A line is held only if the stock not held by anyone else
+    covers it in full; otherwise any previous hold on it is released and the
+    line will be validated at confirmation as before.
+    Returns the set of OrderItem ids that are now held.
+    """
+    items = [item for item in items if item.pk]
+    if not items:
+        return set()
+    item_ids = [item.pk for item in items]
+    product_ids = sorted({item.product_id for item in items})
+    expires_at = timezone.now() + reservation_ttl()
+
+    with transaction.atomic():
+        stock = dict(
+            Inventory.objects.select_for_update()
+            .filter(product_id__in=product_ids)
+            .order_by("product_id")
+            .values_list("product_id", "quantity")
+        )
+        held = reserved_quantities(product_ids, exclude={"order_item_id__in": item_ids})
+        StockReservation.objects.filter(order_item_id__in=item_ids).delete()
+
+        reservations = []
+        for item in items:
+            free = stock.get(item.product_id, 0) - held.get(item.product_id, 0)
+            if item.quantity <= free:
+                held[item.product_id] = held.get(item.product_id, 0) + item.quantity
+                reservations.append(
+                    StockReservation(
+                        order_item_id=item.pk,
+                        order_id=item.order_id,
+                        product_id=item.product_id,
+                        quantity=item.quantity,
+                        expires_at=expires_at,
+                    )
+                )
+        StockReservation.objects.bulk_create(reservations)
+    return {reservation.order_item_id for reservation in reservations}
+
+
+def resize_hold(item):
+    """
+    Fit the hold of a saved draft-order ``item`` to its current quantity and
+    push its expiry out by the TTL. Only the change is checked against stock:
+    a smaller line shrinks its hold in place, and a bigger one keeps its
+    previous hold when the extra quantity is not free. A line without a hold
+    (or whose product changed) is held afresh via ``hold_items``.
+    Returns True if the whole line is now held.
+    """
+    with transaction.atomic():
+        stock = (
+            Inventory.objects.select_for_update()
+            .filter(product_id=item.product_id)
+            .values_list("quantity", flat=True)
+            .first()
+        ) or 0
+        hold = StockReservation.objects.filter(order_item_id=item.pk).first()
+        if hold is None or hold.product_id != item.product_id:
+            return item.pk in hold_items([item])
+        quantity = item.quantity
+        if quantity > hold.quantity:
+            held = reserved_quantities(
+                [item.product_id], exclude={"order_item_id": item.pk}
+            ).get(item.product_id, 0)
+            if quantity > stock - held:
+                quantity = hold.quantity
+        StockReservation.objects.filter(pk=hold.pk).update(
+            order_id=item.order_id,
+            quantity=quantity,
+            expires_at=timezone.now() + reservation_ttl(),
+        )
+    return quantity == item.quantity
+
+
+def release_items(item_ids):
+    """Drop the holds of the given OrderItem ids (lines removed or no longer drafts)."""
+    return StockReservation.objects.filter(order_item_id__in=item_ids).delete()[0]
+
+
+def release_order(order_id):
+    """Drop every hold of an order (after confirmation or cancellation)."""
+    return StockReservation.objects.filter(order_id=order_id).delete()[0]
+
+
+def release_expired(batch_size=1000, now=None):
+    """
+    Delete expired holds in primary-key batches so the sweeper never holds
+    long locks. Returns the number of holds released.
+    """
+    now = now or timezone.now()
+    released = 0
+    while True:
+        ids = list(
+            StockReservation.objects.filter(expires_at__lte=now)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            return released
+        released += StockReservation.objects.filter(pk__in=ids).delete()[0]
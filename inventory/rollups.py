@@ -0,0 +1,142 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+
+from .models import DailyOrderRollup, DailySalesRollup, Order, OrderItem
+
+# Only orders that left the draft state are rolled up.
+TRACKED_STATUSES = ("confirmed", "delivered")
+
+# rollup model -> (bucket key fields, summed fields)
+ROLLUP_FIELDS = {
+    DailySalesRollup: (("day", "dealer_id", "product_id"), ("revenue", "quantity", "order_count")),
+    DailyOrderRollup: (("day", "dealer_id"), ("order_count",)),
+}
+
+
+def order_line_buckets(order_filter):
+    """
+    Group the lines of the orders matching ``order_filter`` (a dict of
+    ``order__`` lookups) into rollup buckets with one aggregate query.
+    """
+    return (
+        OrderItem.objects.filter(**order_filter)
+        .annotate(day=TruncDate("order__created_at"))
+        .values("day", "product_id", dealer_id=F("order__dealer_id"))
+        .annotate(
+            revenue=Sum("line_total"),
+            quantity=Sum("quantity"),
+            order_count=Count("order_id", distinct=True),
+        )
+        .order_by()
+    )
+
+
+def order_buckets(order_filter):
+    """Count the orders matching ``order_filter`` per day and dealer with one query."""
+    return (
+        Order.objects.filter(**order_filter)
+        .annotate(day=TruncDate("created_at"))
+        .values("day", "dealer_id")
+        .annotate(order_count=Count("id"))
+        .order_by()
+    )
+
+
+def _merge(model, buckets, status, sign):
+    """Add (sign=1) or subtract (sign=-1) ``buckets`` into ``status`` rollups."""
+    if not buckets:
+        return
+    key_fields, sum_fields = ROLLUP_FIELDS[model]
+    existing = {
+        tuple(getattr(r, f) for f in key_fields): r
+        for r in model.objects.select_for_update().filter(
+            status=status,
+            **{f"{f}__in": {b[f] for b in buckets} for f in key_fields},
+        )
+    }
+    to_update, to_create = [], []
+    for b in buckets:
+        key = tuple(b[f] for f in key_fields)
+        row = existing.get(key)
+        if row is None:
+            row = model(status=status, **dict(zip(key_fields, key)))
+            to_create.append(row)
+        else:
+            to_update.append(row)
+        for field in sum_fields:
+            setattr(row, field, getattr(row, field) + sign * b[field])
+    if to_update:
+        model.objects.bulk_update(to_update, sum_fields)
+    if to_create:
+        model.objects.bulk_create(to_create)
+
+
+def record_transition(order_ids, from_status, to_status):
+    """
+    Move the lines of ``order_ids`` from their ``from_status`` buckets to
+    their ``to_status`` buckets. Call inside the transaction that changes the
+    order status so the rollups commit (or roll back) with it.
+    """
+    buckets = {
+        DailySalesRollup: list(order_line_buckets({"order_id__in": order_ids})),
+        DailyOrderRollup: list(order_buckets({"id__in": order_ids})),
+    }
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                for model, model_buckets in buckets.items():
+                    if from_status in TRACKED_STATUSES:
+                        _merge(model, model_buckets, from_status, -1)
+                    if to_status in TRACKED_STATUSES:
+                        _merge(model, model_buckets, to_status, 1)
+            return
+        except IntegrityError:
+            # A concurrent writer created one of our buckets first; the
+            # retry will find and lock it.
+            if attempt:
+                raise
+
+
+def _rebuild(model, buckets, batch_size):
+    key_fields, sum_fields = ROLLUP_FIELDS[model]
+    created = 0
+    for status in TRACKED_STATUSES:
+        batch = []
+        for b in buckets(status).iterator(chunk_size=batch_size):
+            batch.append(
+                model(status=status, **{f: b[f] for f in key_fields + sum_fields})
+            )
+            if len(batch) >= batch_size:
+                created += len(model.objects.bulk_create(batch))
+                batch = []
+        created += len(model.objects.bulk_create(batch))
+    return created
+
+
+def rebuild(day_from=None, day_to=None, batch_size=1000):
+    """
+    Replace the rollups for ``[day_from, day_to]`` (all days when omitted)
+    with fresh aggregates of the raw order tables. Returns the number of
+    sales (per-product) rollup rows written.
+    """
+    days = {}
+    if day_from:
+        days["day__gte"] = day_from
+    if day_to:
+        days["day__lte"] = day_to
+
+    with transaction.atomic():
+        DailySalesRollup.objects.filter(**days).delete()
+        DailyOrderRollup.objects.filter(**days).delete()
+        created = _rebuild(
+            DailySalesRollup,
+            lambda status: order_line_buckets({"order__status": status}).filter(**days),
+            batch_size,
+        )
+        _rebuild(
+            DailyOrderRollup,
+            lambda status: order_buckets({"status": status}).filter(**days),
+            batch_size,
+        )
+    return created
@@ -0,0 +1,137 @@
+"""
+Search index for the datatable endpoints.
+
+Every indexed object has one SearchDocument row holding the normalized
+words of its searchable fields. On SQLite the documents are mirrored
+into an FTS5 table (kept in sync by triggers, see migration 0016) and
+searched with prefix queries; elsewhere the content column is matched
+with word-prefix LIKEs, which Postgres serves from a pg_trgm GIN index.
+Documents are updated by the signal handlers in inventory.signals;
+``python manage.py rebuild_search_index`` rebuilds them after bulk writes.
+"""
+
+import re
+
+from django.apps import apps as global_apps
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = "inventory_searchdocument_fts"
+
+# model label -> values() lookups whose text makes up the document
+INDEXED_FIELDS = {
+    "inventory.product": ["product_name", "measure"],
+    "inventory.supplier": ["supplier_name", "contact_person", "phone_number", "email"],
+    "inventory.category": ["category_name"],
+    "auth.user": ["username", "first_name", "email", "groups__name"],
+}
+
+_WORD = re.compile(r"\w+")
+
+
+def words(text):
+    return _WORD.findall(str(text).lower())
+
+
+def covers(model, update_fields):
+    """True if a save of ``update_fields`` on ``model`` can change its documents."""
+    if update_fields is None:
+        return True
+    fields = {lookup.split("__")[0] for lookup in INDEXED_FIELDS[model._meta.label_lower]}
+    return not fields.isdisjoint(update_fields)
+
+
+def _document_model():
+    return global_apps.get_model("inventory", "SearchDocument")
+
+
+def documents(model, pks=None, batch_size=1000):
+    """Yield ``(pk, content)`` for objects of ``model`` (all, or only ``pks``)."""
+    fields = INDEXED_FIELDS[model._meta.label_lower]
+    qs = model._base_manager.order_by("pk")
+    if pks is not None:
+        qs = qs.filter(pk__in=pks)
+    current, parts = None, []
+    # Multi-valued lookups (groups__name) give one row per value; rows of
+    # the same object are adjacent because of the ordering.
+    for pk, *values in qs.values_list("pk", *fields).iterator(chunk_size=batch_size):
+        if pk != current:
+            if current is not None:
+                yield current, _content(parts)
+            current, parts = pk, []
+        parts.extend(value for value in values if value not in (None, ""))
+    if current is not None:
+        yield current, _content(parts)
+
+
+def _content(parts):
+    seen = dict.fromkeys(word for part in parts for word in words(part))
+    # Leading space so " word" LIKE patterns match at word starts only.
+    return " " + " ".join(seen)
+
+
+def index(model, pks):
+    """(Re)build the documents of ``pks``; missing objects are unindexed."""
+    SearchDocument = _document_model()
+    label = model._meta.label_lower
+    SearchDocument.objects.filter(label=label, object_id__in=pks).delete()
+    SearchDocument.objects.bulk_create(
+        [
+            SearchDocument(label=label, object_id=pk, content=content)
+            for pk, content in documents(model, pks)
+        ]
+    )
+
+
+def unindex(model, pks):
+    _document_model().objects.filter(
+        label=model._meta.label_lower, object_id__in=pks
+    ).delete()
+
+
+def rebuild(batch_size=1000):
+    """Replace every document from the indexed tables. Returns the count."""
+    SearchDocument = _document_model()
+    SearchDocument.objects.all().delete()
+    created = 0
+    for label in INDEXED_FIELDS:
+        model = global_apps.get_model(label)
+        batch = []
+        for pk, content in documents(model, batch_size=batch_size):
+            batch.append(SearchDocument(label=label, object_id=pk, content=content))
+            if len(batch) >= batch_size:
+                created += len(SearchDocument.objects.bulk_create(batch))
+                batch = []
+        created += len(SearchDocument.objects.bulk_create(batch))
+    return created
+
+
+def matching_ids(model, query):
+    """
+    Subquery of the pks of ``model`` objects having a word starting with
+    each word of ``query``, or None when ``query`` has no words.
+    """
+    terms = words(query)
+    if not terms:
+        return None
+    SearchDocument = _document_model()
+    docs = SearchDocument.objects.filter(label=model._meta.label_lower)
+    if connection.vendor == "sqlite":
+        match = " ".join(f'"{term}"*' for term in terms)
+        docs = docs.filter(
+            pk__in=RawSQL(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]
+            )
+        )
+    else:
+        for term in terms:
+            docs = docs.filter(content__contains=f" {term}")
+    return docs.values("object_id")
+
+
+def search(qs, query):
+    """Filter ``qs`` down to the objects matching ``query`` (unchanged when empty)."""
+    ids = matching_ids(qs.model, query)
+    if ids is None:
+        return qs
+    return qs.filter(pk__in=ids)
@@ -1,4 +1,6 @@
-from .models import Product, Dealer, Inventory, Order, OrderItem
+from .models import (
+    Product, Dealer, Inventory, Order, OrderItem, InventoryAudit, InventoryAuditDaily, Job,
+)
 
 from rest_framework import serializers
 
@@ -13,6 +15,7 @@ class DealerSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 class InventorySerializer(serializers.ModelSerializer):
+    available = serializers.IntegerField(source='available_quantity', read_only=True, default=None)
     class Meta:
         model = Inventory
         fields = '__all__'
@@ -22,8 +25,81 @@ class OrderItemSerializer(serializers.ModelSerializer):
         model = OrderItem
         fields = '__all__'
 
+    def validate(self, attrs):
+        # Confirmed lines are already counted in stock and the sales rollups.
+        orders = [attrs.get('order')]
+        if self.instance is not None:
+            orders.append(self.instance.order)
+        if any(order is not None and order.status != 'draft' for order in orders):
+            raise serializers.ValidationError({'order': 'Only lines of draft orders can be changed.'})
+        return attrs
+
 class OrderSerializer(serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
     class Meta:
         model = Order
         fields = '__all__'
+        read_only_fields = ['total_amount']
+
+class BulkOrderItemSerializer(serializers.Serializer):
+    product = serializers.IntegerField(min_value=1)
+    quantity = serializers.IntegerField(min_value=1)
+    unit_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+
+class BulkOrderSerializer(serializers.Serializer):
+    dealer = serializers.IntegerField(min_value=1)
+    items = BulkOrderItemSerializer(many=True, allow_empty=False)
+
+class BulkOrderIntakeSerializer(serializers.Serializer):
+    orders = serializers.ListField(child=serializers.DictField(), allow_empty=False, max_length=1000)
+
+class OrderSummaryFilterSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES, required=False)
+    dealer = serializers.IntegerField(min_value=1, required=False)
+    created_from = serializers.DateField(required=False)
+    created_to = serializers.DateField(required=False)
+    cursor = serializers.CharField(required=False)
+    page_size = serializers.IntegerField(min_value=1, max_value=1000, default=100)
+    stream = serializers.ChoiceField(choices=['ndjson'], required=False)
+    background = serializers.BooleanField(default=False)
+
+class SalesReportFilterSerializer(serializers.Serializer):
+    GROUP_BY_FIELDS = ['day', 'dealer', 'product', 'status']
+
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    status = serializers.ChoiceField(choices=['confirmed', 'delivered'], required=False)
+    dealer = serializers.IntegerField(min_value=1, required=False)
+    product = serializers.IntegerField(min_value=1, required=False)
+    group_by = serializers.CharField(required=False, default='day')
+
+    def validate_group_by(self, value):
+        fields = [field.strip() for field in value.split(',') if field.strip()]
+        unknown = sorted(set(fields) - set(self.GROUP_BY_FIELDS))
+        if unknown or not fields:
+            raise serializers.ValidationError(
+                f"Choose from {', '.join(self.GROUP_BY_FIELDS)} (comma separated)."
+            )
+        return fields
+
+class InventoryAuditSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = InventoryAudit
+        fields = ['id', 'user', 'old_quantity', 'new_quantity', 'updated_at', 'note']
+
+class InventoryAuditDailySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = InventoryAuditDaily
+        fields = ['day', 'opening_quantity', 'closing_quantity', 'net_change', 'changes']
+
+class InventoryHistoryFilterSerializer(serializers.Serializer):
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'task', 'status', 'progress', 'total', 'attempts', 'max_attempts',
+            'result', 'error', 'run_at', 'created_at', 'finished_at',
+        ]
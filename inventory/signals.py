@@ -0,0 +1,103 @@
+from django.contrib.auth.models import Group, User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from inventory import category_tree, search
+from inventory.datatables import invalidate_counts
+from inventory.models import Category, Product, Supplier
+
+INDEXED_MODELS = (Product, Supplier, Category, User)
+
+
+# ------------------- Datatable Counts -------------------
+def _drop_counts_on_commit(model):
+    # After commit, so a concurrent draw cannot re-cache the old count.
+    transaction.on_commit(lambda: invalidate_counts(model))
+
+
+def drop_counts(sender, **kwargs):
+    _drop_counts_on_commit(sender)
+
+
+for model in INDEXED_MODELS:
+    post_save.connect(drop_counts, sender=model, dispatch_uid=f"counts_save_{model.__name__}")
+    post_delete.connect(
+        drop_counts, sender=model, dispatch_uid=f"counts_delete_{model.__name__}"
+    )
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def drop_user_counts(sender, action, **kwargs):
+    # User searches match group names.
+    if action in ("post_add", "post_remove", "post_clear"):
+        _drop_counts_on_commit(User)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def drop_group_user_counts(sender, **kwargs):
+    _drop_counts_on_commit(User)
+
+
+# ------------------- Category Tree -------------------
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def drop_category_tree(sender, **kwargs):
+    # Now for this process, and again after commit so no other process
+    # keeps a tree it loaded before the change was visible.
+    category_tree.invalidate()
+    transaction.on_commit(category_tree.invalidate)
+
+
+# ------------------- Search Index -------------------
+def reindex(sender, instance, update_fields=None, **kwargs):
+    # Saves of other columns only (a login's last_login) keep the document.
+    if search.covers(sender, update_fields):
+        search.index(sender, [instance.pk])
+
+
+def unindex(sender, instance, **kwargs):
+    search.unindex(sender, [instance.pk])
+
+
+for model in INDEXED_MODELS:
+    post_save.connect(reindex, sender=model, dispatch_uid=f"search_index_{model.__name__}")
+    post_delete.connect(
+        unindex, sender=model, dispatch_uid=f"search_unindex_{model.__name__}"
+    )
+
+
+def _group_user_ids(group):
+    return list(group.user_set.values_list("pk", flat=True))
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def reindex_user_groups(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            search.index(User, [instance.pk])
+        return
+    # group.user_set changes: instance is the group.
+    if action == "pre_clear":
+        instance._search_user_ids = _group_user_ids(instance)
+    elif action == "post_clear":
+        search.index(User, instance.__dict__.pop("_search_user_ids", []))
+    elif action in ("post_add", "post_remove"):
+        search.index(User, list(pk_set))
+
+
+@receiver(post_save, sender=Group)
+def reindex_group_users(sender, instance, created, **kwargs):
+    if not created:
+        search.index(User, _group_user_ids(instance))
+
+
+@receiver(pre_delete, sender=Group)
+def remember_group_users(sender, instance, **kwargs):
+    instance._search_user_ids = _group_user_ids(instance)
+
+
+@receiver(post_delete, sender=Group)
+def reindex_former_group_users(sender, instance, **kwargs):
+    search.index(User, instance.__dict__.pop("_search_user_ids", []))
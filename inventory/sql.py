@@ -0,0 +1,23 @@
+"""
+Set-based SQL the ORM has no public API for.
+"""
+
+from django.db import connections
+
+
+def delete_rows(qs):
+    """
+    Delete the rows of ``qs`` with one ``DELETE ... WHERE pk IN (SELECT ...)``
+    and return how many went. Unlike ``qs.delete()`` nothing is fetched,
+    cascaded or signalled: callers must have handled the rows referencing
+    these and do the signal receivers' work (caches, search index)
+    themselves.
+    """
+    model = qs.model
+    connection = connections[qs.db]
+    sql, params = qs.order_by().values("pk").query.sql_with_params()
+    table = connection.ops.quote_name(model._meta.db_table)
+    pk = connection.ops.quote_name(model._meta.pk.column)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE {pk} IN ({sql})", params)
+        return cursor.rowcount
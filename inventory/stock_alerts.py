@@ -0,0 +1,96 @@
+"""
+Low-stock and out-of-stock notifications.
+
+After a stock decrease, inventory.ledger schedules ``evaluate`` for the
+products it touched to run when the transaction commits, so confirming
+an order of any size is one evaluation. That evaluation costs:
+
+- one query for the products at or below their reorder level (the
+  product's own, else the one set on the nearest category up its tree)
+  or out of stock;
+- one query for the alerts already raised for them within
+  ``STOCK_ALERT_WINDOW`` seconds (default one day), which are not
+  repeated;
+- one ``bulk_create`` of the new broadcast notifications.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import StartsWith
+from django.utils import timezone
+from django.utils.html import format_html
+
+from dashboard import notifications
+from dashboard.models import Notification
+
+from .models import Category, Inventory, Product
+
+LOW_STOCK = "low_stock"
+OUT_OF_STOCK = "out_of_stock"
+
+
+def alert_window():
+    return timedelta(seconds=getattr(settings, "STOCK_ALERT_WINDOW", 24 * 60 * 60))
+
+
+def reorder_level_expression():
+    """Effective reorder level, for annotating Inventory querysets."""
+    path = OuterRef("product__category__path")
+    # The category and its ancestors are the paths that prefix its path.
+    inherited = (
+        Category.objects.filter(StartsWith(path, F("path")), reorder_level__isnull=False)
+        .order_by("-depth")
+        .values("reorder_level")[:1]
+    )
+    return Coalesce("product__reorder_level", Subquery(inherited))
+
+
+def _message(kind, name, quantity, level, product_id):
+    link = format_html(
+        "<a href='{}'>View Product</a>", Product(pk=product_id).get_absolute_url()
+    )
+    if kind == OUT_OF_STOCK:
+        return format_html("{} is out of stock. {}", name, link)
+    return format_html(
+        "{} is low on stock: {} left (reorder level {}). {}", name, quantity, level, link
+    )
+
+
+def evaluate(product_ids):
+    """Raise the stock alerts due for ``product_ids``. Returns the new notifications."""
+    rows = list(
+        Inventory.objects.filter(product_id__in=product_ids)
+        .annotate(level=reorder_level_expression())
+        .filter(Q(quantity=0) | Q(quantity__lte=F("level")))
+        .values_list("product_id", "quantity", "level", "product__product_name")
+    )
+    if not rows:
+        return []
+    content_type = ContentType.objects.get_for_model(Product)
+    recent = set(
+        Notification.objects.filter(
+            notification_type__in=[LOW_STOCK, OUT_OF_STOCK],
+            content_type=content_type,
+            object_id__in=[row[0] for row in rows],
+            created_at__gte=timezone.now() - alert_window(),
+        ).values_list("object_id", "notification_type")
+    )
+    alerts = []
+    for product_id, quantity, level, name in rows:
+        kind = OUT_OF_STOCK if quantity == 0 else LOW_STOCK
+        if (product_id, kind) in recent:
+            continue
+        alerts.append(
+            Notification(
+                category="product",
+                notification_type=kind,
+                message=_message(kind, name, quantity, level, product_id),
+                content_type=content_type,
+                object_id=product_id,
+            )
+        )
+    return notifications.create_many(alerts)
@@ -0,0 +1,85 @@
+"""
+Background tasks for inventory.jobs, registered when the app is ready.
+"""
+
+import tempfile
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from . import catalog
+from .jobs import task
+from .order_services import reconcile_order_totals as _reconcile_order_totals
+
+# Ids handled per set-based delete; progress is reported after each chunk.
+DELETE_CHUNK_SIZE = 1000
+
+
+def _delete_in_chunks(progress, ids, delete, noun):
+    undeletable = []
+    for start in range(0, len(ids), DELETE_CHUNK_SIZE):
+        undeletable += delete(ids[start:start + DELETE_CHUNK_SIZE])
+        progress(min(start + DELETE_CHUNK_SIZE, len(ids)), len(ids))
+    if undeletable:
+        return {
+            "status": "partial",
+            "message": f"Some {noun} not deleted (linked with products): {', '.join(undeletable)}",
+        }
+    return {"status": "success"}
+
+
+@task("delete_suppliers")
+def delete_suppliers(progress, ids):
+    return _delete_in_chunks(progress, ids, catalog.delete_unused_suppliers, "suppliers")
+
+
+@task("delete_categories")
+def delete_categories(progress, ids):
+    return _delete_in_chunks(
+        progress, ids, catalog.delete_unused_categories, "categories"
+    )
+
+
+@task("seed_products", max_attempts=1)
+def seed_products(progress, total):
+    # Not retried: a failed run has already created part of the products.
+    from .factories import ProductFactory
+
+    for created in range(1, total + 1):
+        ProductFactory.create()
+        if created % 100 == 0 or created == total:
+            progress(created, total)
+    return {"created": total}
+
+
+@task("reconcile_order_totals")
+def reconcile_order_totals(progress, batch_size=10000, dry_run=False):
+    drifted, fixed = _reconcile_order_totals(batch_size, dry_run, progress)
+    return {"drifted": drifted, "fixed": fixed}
+
+
+@task("export_order_summary")
+def export_order_summary(progress, filters):
+    """Write the order summary NDJSON export to the default storage."""
+    from .serializers import OrderSummaryFilterSerializer
+    from .views import OrderSummaryView
+
+    params = OrderSummaryFilterSerializer(data=filters)
+    params.is_valid(raise_exception=True)
+    view = OrderSummaryView()
+    qs = view.get_queryset(params.validated_data)
+    total = qs.count()
+    written = 0
+    with tempfile.TemporaryFile() as tmp:
+        for line in view.stream(qs):
+            tmp.write(line.encode())
+            written += 1
+            if written % view.chunk_size == 0:
+                progress(written, total)
+        tmp.seek(0)
+        name = default_storage.save(
+            f"exports/order-summary-{timezone.now():%Y%m%d-%H%M%S}.ndjson", File(tmp)
+        )
+    progress(written, total)
+    return {"orders": written, "file": name, "url": default_storage.url(name)}
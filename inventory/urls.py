@@ -2,7 +2,16 @@ from django.urls import path
 
 from . import views
 from rest_framework.routers import DefaultRouter
-from .views import ProductViewSet, DealerViewSet, InventoryViewSet, OrderViewSet, OrderItemViewSet, OrderSummaryView
+from .views import (
+    ProductViewSet,
+    DealerViewSet,
+    InventoryViewSet,
+    OrderViewSet,
+    OrderItemViewSet,
+    OrderSummaryView,
+    SalesReportView,
+    JobViewSet,
+)
 
 router = DefaultRouter()
 router.register(r'products', ProductViewSet, basename='product')
@@ -10,6 +19,7 @@ router.register(r'dealers', DealerViewSet, basename='dealer')
 router.register(r'inventory', InventoryViewSet, basename='inventory')
 router.register(r'orders', OrderViewSet, basename='order')
 router.register(r'order-items', OrderItemViewSet, basename='orderitem')
+router.register(r'jobs', JobViewSet, basename='job')
 
 urlpatterns = [
     # Supplier Management URLs CRUD Section Start
@@ -98,4 +108,5 @@ urlpatterns = [
     # Product Management URLs CRUD Section End
     # Order Summary/Report Endpoint
     path('order-summary/', OrderSummaryView.as_view(), name='order-summary'),
+    path('reports/sales/', SalesReportView.as_view(), name='sales-report'),
 ] + router.urls
@@ -8,7 +8,9 @@ from inventory.models import (
     Inventory,
     Order,
     OrderItem,
-    InventoryAudit,
+    DailyOrderRollup,
+    DailySalesRollup,
+    Job,
 )
 from inventory.forms import (
     SupplierForm,
@@ -18,27 +20,69 @@ from inventory.forms import (
 )
 from django.shortcuts import redirect
 from django.db import transaction
+from django.db.models import Sum
 from django.contrib import messages
 from django_datatables_view.base_datatable_view import BaseDatatableView
-from django.db.models import Q
-from django.urls import reverse_lazy, reverse
+from django.db.models import Prefetch, Q
+from django.urls import reverse
 from django.utils.html import format_html, mark_safe
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.decorators import login_required
 from inventory_management.decorators import permission_required_message
 from django.views.decorators.csrf import csrf_exempt
+import json
 import logging
-from django.http import JsonResponse
+from datetime import datetime, time, timedelta
+from itertools import islice
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
 from django.utils.html import escape
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
-from .models import Product, Dealer, Inventory, Order, OrderItem
-from .serializers import ProductSerializer, DealerSerializer, InventorySerializer, OrderSerializer, OrderItemSerializer
+from rest_framework.views import APIView
+from .serializers import (
+    ProductSerializer,
+    DealerSerializer,
+    InventorySerializer,
+    OrderSerializer,
+    OrderItemSerializer,
+    BulkOrderSerializer,
+    BulkOrderIntakeSerializer,
+    OrderSummaryFilterSerializer,
+    SalesReportFilterSerializer,
+    InventoryAuditSerializer,
+    InventoryAuditDailySerializer,
+    InventoryHistoryFilterSerializer,
+    JobSerializer,
+)
+from .order_services import (
+    InsufficientStock,
+    OrderStateError,
+    confirm_order,
+    create_orders,
+    deliver_order,
+)
+from .reservations import available_quantity_expression, hold_items, release_items, resize_hold
+from .concurrency import OptimisticUpdateMixin
+from . import audit, jobs, ledger, search
+from .datatables import KeysetPaginationMixin, compile_fragment
+from .category_tree import get_tree
 
 logger = logging.getLogger(__name__)
 
 
+def _queued(job):
+    """Response body for a request whose work was handed to a background job."""
+    return {"status": "queued", "job": job.pk, "url": reverse("job-detail", args=[job.pk])}
+
+
 # Supplier Management VIEWS CRUD Section Start
 @login_required
 @permission_required_message("inventory.view_supplier", redirect_to="dashboard")
@@ -66,7 +110,7 @@ def add_supplier(request):
     return render(request, "inventory/add_supplier.html", context)
 
 
-class SupplierListJson(BaseDatatableView):
+class SupplierListJson(KeysetPaginationMixin, BaseDatatableView):
     model = Supplier
     columns = [
         "id",
@@ -80,14 +124,6 @@ class SupplierListJson(BaseDatatableView):
     order_columns = columns
     max_display_length = 10
 
-    # Fields to search
-    search_fields = [
-        "supplier_name",
-        "contact_person",
-        "phone_number",
-        "email",
-    ]
-
     def get_initial_queryset(self):
         logger.info("✅ AJAX request received for SupplierListJson")
         return Supplier.objects.all()
@@ -100,10 +136,7 @@ class SupplierListJson(BaseDatatableView):
                 is_active = search_value.lower() == "active"
                 qs = qs.filter(is_active=is_active)
             else:
-                q = Q()
-                for field in self.search_fields:
-                    q |= Q(**{f"{field}__icontains": search_value})
-                qs = qs.filter(q)
+                qs = search.search(qs, search_value)
         return qs
 
     def prepare_results(self, qs):
@@ -237,27 +270,11 @@ def supplier_ledger(request, id):
 def bulk_delete_suppliers(request):
     if request.method == "POST":
         try:
-            with transaction.atomic():
-                ids = request.POST.getlist("ids[]")
-                undeletable = []
-
-                for supplier_id in ids:
-                    supplier = Supplier.objects.get(id=supplier_id)
-                    # check if supplier linked with any product
-                    if Product.objects.filter(supplier=supplier).exists():
-                        undeletable.append(supplier.supplier_name)
-                    else:
-                        supplier.delete()
-
-                if undeletable:
-                    return JsonResponse(
-                        {
-                            "status": "partial",
-                            "message": f"Some suppliers not deleted (linked with products): {', '.join(undeletable)}",
-                        }
-                    )
-
-                return JsonResponse({"status": "success"})
+            ids = [int(pk) for pk in request.POST.getlist("ids[]")]
+            # Suppliers linked with any product are kept; the job result
+            # carries the usual success/partial response.
+            job = jobs.enqueue("delete_suppliers", {"ids": ids}, user=request.user)
+            return JsonResponse(_queued(job), status=202)
         except Exception as e:
             return JsonResponse({"status": f"error - {str(e)}"}, status=400)
 
@@ -348,77 +365,41 @@ def category_list(request):
     return render(request, "inventory/category/category_list.html")
 
 
-class CategoryListJson(BaseDatatableView):
-    print("✅ JSON page Category hit hua hai.")
-    model = Category
-    columns = ["Sno", "Category", "Sub-Category", "Status", "Action"]
-    order_columns = [
-        "id",
-        "category_name",
-        "sub_categories__category_name",
-        "is_active",
-    ]
-    max_display_length = 10
-    search_fields = ["category_name", "sub_categories__category_name", "is_active"]
+STATUS_BADGES = {
+    True: mark_safe(
+        '<span class="badge bg-success-subtle text-success border border-success-subtle px-2 py-1">'
+        '<i class="bi bi-check-circle-fill me-1"></i>Active</span>'
+    ),
+    False: mark_safe(
+        '<span class="badge bg-danger-subtle text-danger border border-danger-subtle px-2 py-1">'
+        '<i class="bi bi-x-circle-fill me-1"></i>Inactive</span>'
+    ),
+}
 
-    # ------------------- Query Optimization -------------------
-    def get_initial_queryset(self):
-        return Category.objects.filter(parent_category__isnull=True).prefetch_related(
-            "sub_categories"
-        )
-
-    # ------------------- Search Filter -------------------
-    def filter_queryset(self, qs):
-        search_value = self.request.GET.get("search[value]", None)
-        if search_value:
-            q = Q()
-            for field in self.search_fields:
-                q |= Q(**{f"{field}__icontains": search_value})
-            qs = qs.filter(q)
-        return qs.distinct()
+CATEGORY_NAME_HTML = (
+    "{name} <span class='badge bg-secondary-subtle text-secondary ms-1'>{count}</span>"
+)
 
-    # ------------------- Data Preparation -------------------
-    def prepare_results(self, qs):
-        data = []
-        for index, item in enumerate(qs, start=1):
-            sub_cats = item.sub_categories.all()
-            collapse_id = f"subcat-{item.id}"
-
-            # Sub-category list
-            if sub_cats.exists():
-                subcat_list = ""
-                for sub in sub_cats:
-                    sub_name = escape(sub.category_name)
-                    badge_class = (
-                        "bg-success-subtle text-success border border-success-subtle"
-                        if sub.is_active
-                        else "bg-danger-subtle text-danger border border-danger-subtle"
-                    )
-                    icon = (
-                        "bi-check-circle-fill" if sub.is_active else "bi-x-circle-fill"
-                    )
-                    subcat_list += format_html(
-                        """
-                        <li class="list-group-item py-1">
-                            <span class="badge {} px-3 py-2 fs-8">
-                                <i class="bi {} me-1"></i>{}
-                            </span>
-                        </li>
-                        """,
-                        badge_class,
-                        icon,
-                        sub_name,
-                    )
-            else:
-                subcat_list = """
+SUBCATEGORY_ITEM_HTML = {
+    True: (
+        '<li class="list-group-item py-1">'
+        '<span class="badge bg-success-subtle text-success border border-success-subtle px-3 py-2 fs-8">'
+        '<i class="bi bi-check-circle-fill me-1"></i>{name}</span></li>'
+    ),
+    False: (
+        '<li class="list-group-item py-1">'
+        '<span class="badge bg-danger-subtle text-danger border border-danger-subtle px-3 py-2 fs-8">'
+        '<i class="bi bi-x-circle-fill me-1"></i>{name}</span></li>'
+    ),
+}
+
+NO_SUBCATEGORIES_HTML = """
                     <li class="list-group-item py-1 text-muted">
                         No Sub-Categories
                     </li>
                 """
 
-            # Collapse button + sub-list
-            sub_category_html = format_html(
-                """
+SUBCATEGORY_TOGGLE_HTML = """
                 <button class="btn btn-outline-primary btn-sm w-20 text-start"
                         data-bs-toggle="collapse"
                         data-bs-target="#{id}"
@@ -429,89 +410,132 @@ class CategoryListJson(BaseDatatableView):
                 <ul class="collapse list-group list-group-flush mt-2" id="{id}">
                     {list}
                 </ul>
-                """,
-                id=collapse_id,
-                list=mark_safe(subcat_list),
-            )
-
-            # ✅ Added "id" here (important for checkbox)
-            data.append(
-                {
-                    "id": item.id,  # <-- REQUIRED for checkbox value
-                    "Sno": index,
-                    "Category": format_html(
-                        "{} <span class='badge bg-secondary-subtle text-secondary ms-1'>{}</span>",
-                        escape(item.category_name),
-                        sub_cats.count(),
-                    ),
-                    "Sub-Category": sub_category_html,
-                    "Status": self.render_column(item, "Status"),
-                    "Action": self.render_column(item, "Action"),
-                }
-            )
-        return data
-
-    # ------------------- Column Renderer -------------------
-    def render_column(self, row, column):
-        if column == "Status":
-            if row.is_active:
-                return format_html(
-                    '<span class="badge bg-success-subtle text-success border border-success-subtle px-2 py-1">'
-                    '<i class="bi bi-check-circle-fill me-1"></i>Active</span>'
-                )
-            return format_html(
-                '<span class="badge bg-danger-subtle text-danger border border-danger-subtle px-2 py-1">'
-                '<i class="bi bi-x-circle-fill me-1"></i>Inactive</span>'
-            )
-
-        if column == "Action":
-            return format_html(
                 """
+
+CATEGORY_ACTION_HTML = """
                 <div class="dropdown">
                     <button class="btn btn-light btn-sm dropdown-toggle" data-bs-toggle="dropdown">
                         <i class="bi bi-three-dots"></i>
                     </button>
                     <ul class="dropdown-menu shadow">
                         <li>
-                            <a class="dropdown-item" href="{}">
+                            <a class="dropdown-item" href="{ledger}">
                                 <i class="bi bi-journal-text me-2"></i>Ledger
                             </a>
                         </li>
                         <li>
-                            <a class="dropdown-item" href="{}">
+                            <a class="dropdown-item" href="{edit}">
                                 <i class="bi bi-pencil me-2"></i>Edit
                             </a>
                         </li>
                         <li><hr class="dropdown-divider"></li>
                         <li>
-                            <a href="{}" class="dropdown-item text-danger delete_category"
-                            data-category-name="{}">
+                            <a href="{delete}" class="dropdown-item text-danger delete_category"
+                            data-category-name="{name}">
                                 <i class="bi bi-trash me-2"></i>Delete
                             </a>
                         </li>
                     </ul>
                 </div>
-                """,
-                reverse_lazy("category_ledger", args=[row.id]),
-                reverse_lazy("edit_category", args=[row.id]),
-                reverse_lazy("delete_category", args=[row.id]),
-                escape(row.category_name),
+                """
+
+
+class CategoryListJson(KeysetPaginationMixin, BaseDatatableView):
+    print("✅ JSON page Category hit hua hai.")
+    model = Category
+    columns = ["Sno", "Category", "Sub-Category", "Status", "Action"]
+    order_columns = [
+        "id",
+        "category_name",
+        "sub_categories__category_name",
+        "is_active",
+    ]
+    max_display_length = 10
+
+    # ------------------- Query Optimization -------------------
+    def get_initial_queryset(self):
+        # Everything a row shows comes from this prefetch: one query per page.
+        return Category.objects.filter(parent_category__isnull=True).prefetch_related(
+            Prefetch(
+                "sub_categories",
+                queryset=Category.objects.only(
+                    "id", "category_name", "is_active", "parent_category_id"
+                ),
             )
+        )
 
-        return super().render_column(row, column)
+    # ------------------- Search Filter -------------------
+    def filter_queryset(self, qs):
+        search_value = self.request.GET.get("search[value]", None)
+        ids = search.matching_ids(Category, search_value or "")
+        if ids is not None:
+            # Parents match on their own name or any sub-category's name.
+            qs = qs.filter(Q(pk__in=ids) | Q(sub_categories__in=ids)).distinct()
+        return qs
+
+    # ------------------- Data Preparation -------------------
+    def prepare_results(self, qs):
+        action_html = compile_fragment(
+            CATEGORY_ACTION_HTML,
+            ledger="category_ledger",
+            edit="edit_category",
+            delete="delete_category",
+        )
+        data = []
+        for index, item in enumerate(qs, start=1):
+            # Prefetched list; .exists()/.count() would query again.
+            sub_cats = item.sub_categories.all()
+            if sub_cats:
+                subcat_list = "".join(
+                    SUBCATEGORY_ITEM_HTML[sub.is_active].format(
+                        name=escape(sub.category_name)
+                    )
+                    for sub in sub_cats
+                )
+            else:
+                subcat_list = NO_SUBCATEGORIES_HTML
+
+            # ✅ Added "id" here (important for checkbox)
+            data.append(
+                {
+                    "id": item.id,  # <-- REQUIRED for checkbox value
+                    "Sno": index,
+                    "Category": CATEGORY_NAME_HTML.format(
+                        name=escape(item.category_name), count=len(sub_cats)
+                    ),
+                    "Sub-Category": SUBCATEGORY_TOGGLE_HTML.format(
+                        id=f"subcat-{item.id}", list=subcat_list
+                    ),
+                    "Status": STATUS_BADGES[item.is_active],
+                    "Action": action_html.format(
+                        id=item.id, name=escape(item.category_name)
+                    ),
+                }
+            )
+        return data
 
 
 def category_ledger(request, id):
     try:
         previous_url = request.META.get("HTTP_REFERER", reverse("all_category"))
         parent = get_object_or_404(Category, id=id)
-        sub_category = parent.sub_categories.all()
-        print(f"parent {parent.category_name} is active {parent.is_active}")
-        print(f"Total Sub-Category {sub_category.count()}")
-        for sub in sub_category:
-            print(f"Sub-Category {sub.category_name} is active {sub.is_active}")
-        products = Product.objects.filter(category__in=sub_category)
-        print(f"Products {products.count()}")
+        tree = get_tree()
+        # Products of every sub-category below the parent, at any depth,
+        # listed under the direct sub-category they belong to.
+        products = list(
+            Product.objects.filter(parent.subtree_q("category__")).exclude(
+                category=parent
+            )
+        )
+        sub_category = [
+            {"id": sub.id, "category_name": sub.category_name, "products": []}
+            for sub in getattr(tree.get(parent.pk), "children", [])
+        ]
+        by_id = {sub["id"]: sub for sub in sub_category}
+        for product in products:
+            sub = tree.child_of(product.category_id, parent.pk)
+            if sub is not None and sub.id in by_id:
+                by_id[sub.id]["products"].append(product)
         context = {
             "parent": parent,
             "sub_categories": sub_category,
@@ -529,38 +553,11 @@ def category_ledger(request, id):
 def bulk_delete_categories(request):
     if request.method == "POST":
         try:
-            with transaction.atomic():
-                ids = request.POST.getlist("ids[]")
-                undeletable = []
-
-                for category_id in ids:
-                    category = Category.objects.get(id=category_id)
+            ids = [int(pk) for pk in request.POST.getlist("ids[]")]
 
-                    # 🔹 Get all subcategories
-                    subcategories = category.sub_categories.all()
-
-                    # 🔹 Check agar parent ya uski koi subcategory kisi product se linked hai
-                    has_products = (
-                        Product.objects.filter(category=category).exists()
-                        or Product.objects.filter(category__in=subcategories).exists()
-                    )
-
-                    if has_products:
-                        undeletable.append(category.category_name)
-                    else:
-                        category.delete()
-
-                # 🔹 Partial delete response (agar kuch delete nahi hue)
-                if undeletable:
-                    return JsonResponse(
-                        {
-                            "status": "partial",
-                            "message": f"Some categories not deleted (linked with products): {', '.join(undeletable)}",
-                        }
-                    )
-
-                # 🔹 All deleted successfully
-                return JsonResponse({"status": "success"})
+            # 🔹 Parent ya uski koi subcategory (any depth) kisi product se linked hai to skip
+            job = jobs.enqueue("delete_categories", {"ids": ids}, user=request.user)
+            return JsonResponse(_queued(job), status=202)
 
         except Exception as e:
             return JsonResponse({"status": f"error - {str(e)}"}, status=400)
@@ -669,7 +666,37 @@ def product_list(request):
     return render(request, "inventory/product/product_list.html")
 
 
-class ProductListJson(BaseDatatableView):
+PRODUCT_IMAGE_HTML = '<img src="{url}" class="img-fluid rounded" alt="Product Image">'
+
+PRODUCT_ACTION_HTML = """
+                <div class="dropdown">
+                    <button class="btn btn-light btn-sm dropdown-toggle" data-bs-toggle="dropdown">
+                        <i class="bi bi-three-dots"></i>
+                    </button>
+                    <ul class="dropdown-menu shadow">
+                        <li>
+                            <a class="dropdown-item" href="{edit}">
+                                <i class="bi bi-pencil me-2"></i>Edit
+                            </a>
+                        </li>
+                        <li>
+                            <a class="dropdown-item" href="{view}">
+                                <i class="bi bi-eye me-2"></i>View
+                            </a>
+                        </li>
+                        <li><hr class="dropdown-divider"></li>
+                        <li>
+                            <a href="{delete}" class="dropdown-item text-danger delete_product"
+                            data-product-name="{name}">
+                                <i class="bi bi-trash me-2"></i>Delete
+                            </a>
+                        </li>
+                    </ul>
+                </div>
+                """
+
+
+class ProductListJson(KeysetPaginationMixin, BaseDatatableView):
     logger.info("AJAX request received")
     model = Product
     columns = [
@@ -686,103 +713,66 @@ class ProductListJson(BaseDatatableView):
         "id",  # Sno
         "image",  # Image
         "product_name",  # Name
-        "warehouse__name",  # Warehouse
+        "warehouse__warehouse_name",  # Warehouse
         "selling_price",  # Selling Price
         "measure",  # Measure
         "stock",  # Stock
         "is_active",  # Status
     ]
     max_display_length = 10
-    search_fields = [
+    # Only what the table shows (plus the default ordering column, read for
+    # the keyset boundary); the warehouse name comes in the same query.
+    list_fields = [
+        "id",
+        "created_at",
+        "image",
         "product_name",
+        "warehouse__warehouse_name",
         "selling_price",
         "measure",
         "stock",
         "is_active",
     ]
 
+    def get_initial_queryset(self):
+        return Product.objects.select_related("warehouse").only(*self.list_fields)
+
     def filter_queryset(self, qs):
         search_value = self.request.GET.get("search[value]", None)
         if search_value:
-            q = Q()
-            for field in self.search_fields:
-                q |= Q(**{f"{field}__icontains": search_value})
-            qs = qs.filter(q)
+            qs = search.search(qs, search_value)
         return qs
 
     def prepare_results(self, qs):
+        action_html = compile_fragment(
+            PRODUCT_ACTION_HTML,
+            edit="edit_product",
+            view="view_product",
+            delete="delete_product",
+        )
         data = []
         for index, item in enumerate(qs, start=1):
             data.append(
                 {
                     "Sno": index,
-                    "Image": self.render_column(item, "Image"),
-                    "Name": item.product_name,
-                    "Warehouse": (
-                        item.warehouse.warehouse_name if item.warehouse else ""
+                    "Image": (
+                        PRODUCT_IMAGE_HTML.format(url=escape(item.image.url))
+                        if item.image
+                        else ""
                     ),
+                    "Name": item.product_name,
+                    "Warehouse": item.warehouse.warehouse_name,
                     "Selling Price": item.selling_price,
                     "Measure": item.measure,
                     "Stock": item.stock,
-                    "Status": self.render_column(item, "Status"),
-                    "Action": self.render_column(item, "Action"),
+                    "Status": STATUS_BADGES[item.is_active],
+                    "Action": action_html.format(
+                        id=item.id, name=escape(item.product_name)
+                    ),
                 }
             )
         return data
 
-    def render_column(self, row, column):
-        if column == "Status":
-            if row.is_active:
-                return format_html(
-                    '<span class="badge bg-success-subtle text-success border border-success-subtle px-2 py-1"><i class="bi bi-check-circle-fill me-1"></i>Active</span>'
-                )
-            else:
-                return format_html(
-                    '<span class="badge bg-danger-subtle text-danger border border-danger-subtle px-2 py-1"><i class="bi bi-x-circle-fill me-1"></i>Inactive</span>'
-                )
-
-        if column == "Image":
-            if row.image:
-                return format_html(
-                    '<img src="{}" class="img-fluid rounded" alt="Product Image">',
-                    row.image.url,
-                )
-            return ""
-        if column == "Action":
-            return format_html(
-                """
-                <div class="dropdown">
-                    <button class="btn btn-light btn-sm dropdown-toggle" data-bs-toggle="dropdown">
-                        <i class="bi bi-three-dots"></i>
-                    </button>
-                    <ul class="dropdown-menu shadow">
-                        <li>
-                            <a class="dropdown-item" href="{}">
-                                <i class="bi bi-pencil me-2"></i>Edit
-                            </a>
-                        </li>
-                        <li>
-                            <a class="dropdown-item" href="{}">
-                                <i class="bi bi-eye me-2"></i>View
-                            </a>
-                        </li>
-                        <li><hr class="dropdown-divider"></li>
-                        <li>
-                            <a href="{}" class="dropdown-item text-danger delete_product"
-                            data-product-name="{}">
-                                <i class="bi bi-trash me-2"></i>Delete
-                            </a>
-                        </li>
-                    </ul>
-                </div>
-                """,
-                reverse_lazy("edit_product", args=[row.id]),  #  Edit
-                reverse_lazy("view_product", args=[row.id]),  #  View
-                reverse_lazy("delete_product", args=[row.id]),  #  Delete URL
-                row.product_name,  #  For SweetAlert
-            )
-        return super().render_column(row, column)
-
 
 @login_required
 @permission_required_message("inventory.add_product", redirect_to="product_list")
@@ -864,31 +854,83 @@ def view_product(request, id):
 
 # Product Management VIEWS CRUD Section End
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(OptimisticUpdateMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
 
+    def update(self, request, *args, **kwargs):
+        # Product.save books stock edits on the ledger.
+        try:
+            return super().update(request, *args, **kwargs)
+        except ledger.NegativeBalance as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
 class DealerViewSet(viewsets.ModelViewSet):
     queryset = Dealer.objects.all()
     serializer_class = DealerSerializer
 
-class InventoryViewSet(viewsets.ModelViewSet):
+class InventoryViewSet(OptimisticUpdateMixin, viewsets.ModelViewSet):
     queryset = Inventory.objects.all()
     serializer_class = InventorySerializer
 
+    def get_queryset(self):
+        return super().get_queryset().annotate(available_quantity=available_quantity_expression())
+
+    def perform_create(self, serializer):
+        quantity = serializer.validated_data.pop('quantity', 0)
+        instance = serializer.save(quantity=0)
+        ledger.post({instance.product_id: quantity}, 'opening', user=self.request.user)
+        instance.refresh_from_db()
+
     def update(self, request, *args, **kwargs):
-        instance = self.get_object()
+        try:
+            return super().update(request, *args, **kwargs)
+        except ledger.NegativeBalance as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    def perform_update(self, serializer):
+        # Stock changes are booked on the ledger, which moves both
+        # Inventory.quantity and Product.stock; the product link is fixed.
+        instance = serializer.instance
         old_quantity = instance.quantity
-        response = super().update(request, *args, **kwargs)
-        new_quantity = self.get_object().quantity
-        InventoryAudit.objects.create(
-            product=instance.product,
-            user=request.user if request.user.is_authenticated else None,
-            old_quantity=old_quantity,
-            new_quantity=new_quantity,
-            note=request.data.get('note', '')
+        new_quantity = serializer.validated_data.get('quantity', old_quantity)
+        # The ledger also queues the InventoryAudit row for this change.
+        ledger.post(
+            {instance.product_id: new_quantity - old_quantity},
+            'adjustment',
+            user=self.request.user,
+            note=str(self.request.data.get('note', '')),
+            expected_versions={instance.product_id: instance.version},
+        )
+        instance.refresh_from_db()
+
+    @action(detail=True, methods=['get'])
+    def history(self, request, pk=None):
+        """Stock history: compacted daily summaries plus the raw changes still kept."""
+        params = InventoryHistoryFilterSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        product_id = self.get_queryset().filter(pk=pk).values_list('product_id', flat=True).first()
+        if product_id is None:
+            return Response({'error': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+        daily, changes = audit.history(
+            product_id, params.validated_data.get('date_from'), params.validated_data.get('date_to')
         )
-        return response
+        return Response({
+            'product': product_id,
+            'daily': InventoryAuditDailySerializer(daily, many=True).data,
+            'changes': InventoryAuditSerializer(changes, many=True).data,
+        })
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Background jobs queued by the current user (all jobs for staff), for polling."""
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        qs = Job.objects.order_by('-id')
+        if not self.request.user.is_staff:
+            qs = qs.filter(created_by=self.request.user)
+        return qs
 
 class OrderViewSet(viewsets.ModelViewSet):
     queryset = Order.objects.all()
@@ -897,65 +939,264 @@ class OrderViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def confirm(self, request, pk=None):
         order = self.get_object()
-        if order.status != 'draft':
-            return Response({'error': 'Only draft orders can be confirmed.'}, status=status.HTTP_400_BAD_REQUEST)
-        insufficient = []
-        for item in order.items.all():
-            inventory = Inventory.objects.get(product=item.product)
-            if item.quantity > inventory.quantity:
-                insufficient.append({
-                    'product': item.product.product_name,
-                    'available': inventory.quantity,
-                    'requested': item.quantity
-                })
-        if insufficient:
-            return Response({'error': 'Insufficient stock for some products.', 'details': insufficient}, status=status.HTTP_400_BAD_REQUEST)
-        # Deduct stock atomically
-        from django.db import transaction
-        with transaction.atomic():
-            for item in order.items.all():
-                inventory = Inventory.objects.get(product=item.product)
-                inventory.quantity -= item.quantity
-                inventory.save()
-            order.status = 'confirmed'
-            order.save()
+        try:
+            confirm_order(order.pk)
+        except OrderStateError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except InsufficientStock as e:
+            return Response({'error': str(e), 'details': e.details}, status=status.HTTP_400_BAD_REQUEST)
         return Response({'status': 'order confirmed'})
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        intake = BulkOrderIntakeSerializer(data=request.data)
+        intake.is_valid(raise_exception=True)
+        valid, results = [], []
+        for index, data in enumerate(intake.validated_data['orders']):
+            serializer = BulkOrderSerializer(data=data)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                results.append({'index': index, 'status': 'error', 'errors': serializer.errors})
+        for (index, _), result in zip(valid, create_orders([data for _, data in valid])):
+            result['index'] = index
+            results.append(result)
+        results.sort(key=lambda result: result['index'])
+        created = sum(1 for result in results if result['status'] == 'created')
+        if created == len(results):
+            code = status.HTTP_201_CREATED
+        elif created:
+            code = status.HTTP_207_MULTI_STATUS
+        else:
+            code = status.HTTP_400_BAD_REQUEST
+        return Response({'created': created, 'failed': len(results) - created, 'results': results}, status=code)
+
     @action(detail=True, methods=['post'])
     def deliver(self, request, pk=None):
         order = self.get_object()
-        if order.status != 'confirmed':
-            return Response({'error': 'Only confirmed orders can be delivered.'}, status=status.HTTP_400_BAD_REQUEST)
-        order.status = 'delivered'
-        order.save()
+        try:
+            deliver_order(order.pk)
+        except OrderStateError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         return Response({'status': 'order delivered'})
 
 class OrderItemViewSet(viewsets.ModelViewSet):
     queryset = OrderItem.objects.all()
     serializer_class = OrderItemSerializer
 
-from rest_framework.views import APIView
-from rest_framework.permissions import IsAdminUser
-from rest_framework import status
+    def perform_create(self, serializer):
+        item = serializer.save()
+        if item.order.status == 'draft':
+            hold_items([item])
+
+    def perform_update(self, serializer):
+        item = serializer.save()
+        if item.order.status == 'draft':
+            resize_hold(item)
+        else:
+            release_items([item.pk])
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            release_items([instance.pk])
+            instance.delete()
+
+    def destroy(self, request, *args, **kwargs):
+        if self.get_object().order.status != 'draft':
+            return Response({'error': 'Only lines of draft orders can be changed.'}, status=status.HTTP_400_BAD_REQUEST)
+        return super().destroy(request, *args, **kwargs)
 
 class OrderSummaryView(APIView):
+    """
+    Order summary report.
+
+    Filters: ``status``, ``dealer``, ``created_from``/``created_to`` (dates).
+    JSON responses are keyset-paginated newest first (``page_size``, and the
+    ``next`` cursor); ``?stream=ndjson`` streams every matching order as one
+    JSON object per line with constant memory, under WSGI and ASGI alike,
+    and ``&background=true`` writes that export to storage from a background
+    job instead.
+    """
+    permission_classes = [IsAdminUser]
+    chunk_size = 500
+
+    def get_queryset(self, filters):
+        qs = (
+            Order.objects.select_related('dealer')
+            .only('id', 'order_number', 'status', 'total_amount', 'created_at', 'dealer__name')
+            .prefetch_related(
+                Prefetch(
+                    'items',
+                    queryset=OrderItem.objects.select_related('product').only(
+                        'order_id', 'quantity', 'line_total', 'product__product_name'
+                    ),
+                )
+            )
+            .order_by('-created_at', '-id')
+        )
+        if 'status' in filters:
+            qs = qs.filter(status=filters['status'])
+        if 'dealer' in filters:
+            qs = qs.filter(dealer_id=filters['dealer'])
+        # Compare against datetime bounds rather than __date so the
+        # created_at indexes stay usable.
+        tz = timezone.get_current_timezone()
+        if 'created_from' in filters:
+            qs = qs.filter(created_at__gte=datetime.combine(filters['created_from'], time.min, tzinfo=tz))
+        if 'created_to' in filters:
+            day_after = filters['created_to'] + timedelta(days=1)
+            qs = qs.filter(created_at__lt=datetime.combine(day_after, time.min, tzinfo=tz))
+        return qs
+
+    @staticmethod
+    def summary_row(order):
+        return {
+            'order_number': order.order_number,
+            'dealer': order.dealer.name,
+            'status': order.status,
+            'total_amount': order.total_amount,
+            'created_at': order.created_at,
+            'items': [
+                {
+                    'product': item.product.product_name,
+                    'quantity': item.quantity,
+                    'line_total': item.line_total
+                } for item in order.items.all()
+            ]
+        }
+
+    @staticmethod
+    def encode_cursor(order):
+        raw = f"{order.created_at.isoformat()}|{order.pk}"
+        return urlsafe_base64_encode(raw.encode())
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            created_at, pk = urlsafe_base64_decode(cursor).decode().rsplit('|', 1)
+            return datetime.fromisoformat(created_at), int(pk)
+        except (ValueError, TypeError):
+            raise ValidationError({'cursor': ['Invalid cursor.']})
+
+    def stream(self, qs):
+        for order in qs.iterator(chunk_size=self.chunk_size):
+            yield json.dumps(self.summary_row(order), cls=DjangoJSONEncoder) + '\n'
+
+    async def astream(self, qs):
+        # Under ASGI Django would read a sync iterator to its end before
+        # sending anything. Pull ``chunk_size`` lines at a time through the
+        # request's sync thread instead, which also keeps the database
+        # cursor on that thread.
+        lines = self.stream(qs)
+        next_chunk = sync_to_async(lambda: ''.join(islice(lines, self.chunk_size)))
+        while chunk := await next_chunk():
+            yield chunk
+
+    def get(self, request):
+        params = OrderSummaryFilterSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+        qs = self.get_queryset(filters)
+
+        if filters.get('stream') == 'ndjson' and filters['background']:
+            job = jobs.enqueue(
+                'export_order_summary',
+                {'filters': {
+                    key: request.query_params[key]
+                    for key in ('status', 'dealer', 'created_from', 'created_to')
+                    if key in request.query_params
+                }},
+                user=request.user,
+            )
+            return Response(_queued(job), status=status.HTTP_202_ACCEPTED)
+
+        if filters.get('stream') == 'ndjson':
+            rows = self.astream(qs) if isinstance(request._request, ASGIRequest) else self.stream(qs)
+            response = StreamingHttpResponse(rows, content_type='application/x-ndjson')
+            response['Content-Disposition'] = 'attachment; filename="order-summary.ndjson"'
+            return response
+
+        if 'cursor' in filters:
+            created_at, pk = self.decode_cursor(filters['cursor'])
+            qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+        page_size = filters['page_size']
+        orders = list(qs[:page_size + 1])
+        next_url = None
+        if len(orders) > page_size:
+            orders = orders[:page_size]
+            query = request.query_params.copy()
+            query['cursor'] = self.encode_cursor(orders[-1])
+            next_url = request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+        return Response({
+            'next': next_url,
+            'results': [self.summary_row(order) for order in orders],
+        })
+
+
+class SalesReportView(APIView):
+    """
+    Sales totals read only from the DailySalesRollup table.
+
+    Filters: ``date_from``/``date_to``, ``status``, ``dealer``, ``product``.
+    ``group_by`` is a comma separated subset of day, dealer, product, status.
+    """
     permission_classes = [IsAdminUser]
+    group_by_columns = {
+        'day': 'day',
+        'dealer': 'dealer_id',
+        'product': 'product_id',
+        'status': 'status',
+    }
+
+    def filter_rollups(self, qs, filters, fields):
+        if 'date_from' in filters:
+            qs = qs.filter(day__gte=filters['date_from'])
+        if 'date_to' in filters:
+            qs = qs.filter(day__lte=filters['date_to'])
+        for field in fields:
+            if field in filters:
+                qs = qs.filter(**{self.group_by_columns[field]: filters[field]})
+        return qs
+
+    def order_rollups(self, filters):
+        return self.filter_rollups(DailyOrderRollup.objects.all(), filters, ('status', 'dealer'))
+
     def get(self, request):
-        orders = Order.objects.all()
-        summary = []
-        for order in orders:
-            summary.append({
-                'order_number': order.order_number,
-                'dealer': order.dealer.name,
-                'status': order.status,
-                'total_amount': order.total_amount,
-                'created_at': order.created_at,
-                'items': [
-                    {
-                        'product': item.product.product_name,
-                        'quantity': item.quantity,
-                        'line_total': item.line_total
-                    } for item in order.items.all()
-                ]
-            })
-        return Response(summary)
+        params = SalesReportFilterSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+
+        qs = self.filter_rollups(DailySalesRollup.objects.all(), filters, ('status', 'dealer', 'product'))
+        columns = [self.group_by_columns[field] for field in filters['group_by']]
+        rows = (
+            qs.values(*columns)
+            .annotate(
+                revenue=Sum('revenue'),
+                quantity=Sum('quantity'),
+                order_count=Sum('order_count'),
+            )
+            .order_by(*columns)
+        )
+        if 'product' not in filters['group_by'] and 'product' not in filters:
+            # Per-product buckets count an order once per product on it;
+            # across products the counts come from the order-level rollups.
+            rows = list(rows)
+            order_rows = (
+                self.order_rollups(filters)
+                .values(*columns)
+                .annotate(order_count=Sum('order_count'))
+                .order_by()
+            )
+            order_counts = {tuple(row[c] for c in columns): row['order_count'] for row in order_rows}
+            for row in rows:
+                row['order_count'] = order_counts.get(tuple(row[c] for c in columns), 0)
+        results = [
+            {
+                **{field: row[self.group_by_columns[field]] for field in filters['group_by']},
+                'revenue': row['revenue'],
+                'quantity': row['quantity'],
+                'order_count': row['order_count'],
+            }
+            for row in rows
+        ]
+        return Response({'results': results})
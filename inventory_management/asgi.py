@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "inventory_management.settings")
 
 application = get_asgi_application()
+
+if settings.DEBUG:
+    # Serve static files in development, as runserver does.
+    application = ASGIStaticFilesHandler(application)
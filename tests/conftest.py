@@ -0,0 +1,65 @@
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from inventory import category_tree
+from inventory.models import Category, Dealer, Inventory, Product, Supplier, Warehouse
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Cached counts, page boundaries and trees must not leak between tests."""
+    cache.clear()
+    category_tree.invalidate()
+
+
+@pytest.fixture
+def make_product(db):
+    """Create a fully-linked Product (and its Inventory row) with minimal fields."""
+    counter = {"n": 0}
+
+    def _make(stock=100, selling_price=500, purchase_price=400, **kwargs):
+        counter["n"] += 1
+        n = counter["n"]
+        category = kwargs.pop("category", None) or Category.objects.create(
+            category_name=f"Category {n}"
+        )
+        supplier = kwargs.pop("supplier", None) or Supplier.objects.create(
+            supplier_name=f"Supplier {n}", phone_number="1234567890"
+        )
+        warehouse = kwargs.pop("warehouse", None) or Warehouse.objects.create(
+            warehouse_name=f"Warehouse {n}"
+        )
+        product = Product.objects.create(
+            product_name=kwargs.pop("product_name", f"Product {n}"),
+            category=category,
+            supplier=supplier,
+            warehouse=warehouse,
+            purchase_price=purchase_price,
+            selling_price=selling_price,
+            tax_rate=18.0,
+            measure="pcs",
+            stock=stock,
+            **kwargs,
+        )
+        # Product.save books the opening stock on the ledger, which creates
+        # the Inventory row; zero-stock products get an empty one.
+        Inventory.objects.get_or_create(product=product)
+        return product
+
+    return _make
+
+
+@pytest.fixture
+def dealer(db):
+    return Dealer.objects.create(name="Test Dealer", phone_number="1234567890")
+
+
+@pytest.fixture
+def staff_api_client(db):
+    """DRF client authenticated as a staff user, for the admin-only API views."""
+    client = APIClient()
+    client.force_authenticate(
+        User.objects.create_user("staff", password="x", is_staff=True)
+    )
+    return client
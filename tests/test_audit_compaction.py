@@ -0,0 +1,83 @@
+import datetime
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from inventory import audit
+from inventory.models import Inventory, InventoryAudit, InventoryAuditDaily
+
+UTC = datetime.timezone.utc
+
+
+def _change(product, when, old, new):
+    return InventoryAudit.objects.create(
+        product=product, old_quantity=old, new_quantity=new, updated_at=when
+    )
+
+
+@pytest.fixture
+def history(make_product):
+    product = make_product(stock=10)
+    InventoryAudit.objects.all().delete()
+    _change(product, datetime.datetime(2024, 1, 31, 9, tzinfo=UTC), 10, 7)
+    _change(product, datetime.datetime(2024, 1, 31, 17, tzinfo=UTC), 7, 12)
+    _change(product, datetime.datetime(2024, 2, 1, 8, tzinfo=UTC), 12, 11)
+    _change(product, datetime.datetime(2024, 3, 5, 8, tzinfo=UTC), 11, 4)
+    return product
+
+
+def test_rows_get_their_month_bucket(history):
+    assert sorted(set(InventoryAudit.objects.values_list("bucket", flat=True))) == [
+        202401,
+        202402,
+        202403,
+    ]
+
+
+def test_compaction_folds_old_rows_into_daily_summaries(history):
+    call_command("compact_inventory_audit", before="2024-03-01")
+
+    assert list(
+        InventoryAuditDaily.objects.order_by("day").values_list(
+            "day", "opening_quantity", "closing_quantity", "net_change", "changes"
+        )
+    ) == [
+        (datetime.date(2024, 1, 31), 10, 12, 2, 2),
+        (datetime.date(2024, 2, 1), 12, 11, -1, 1),
+    ]
+    # Only the change from after the cutoff is kept per row.
+    assert list(InventoryAudit.objects.values_list("new_quantity", flat=True)) == [4]
+
+    # Nothing left to fold on a second run.
+    assert audit.compact(datetime.date(2024, 3, 1)) == (0, 0)
+
+
+def test_compaction_merges_into_existing_days(history):
+    audit.compact(datetime.date(2024, 2, 1))
+    _change(history, datetime.datetime(2024, 1, 31, 23, tzinfo=UTC), 12, 15)
+    audit.compact(datetime.date(2024, 2, 1))
+
+    day = InventoryAuditDaily.objects.get(day=datetime.date(2024, 1, 31))
+    assert (day.opening_quantity, day.closing_quantity, day.net_change, day.changes) == (
+        10,
+        15,
+        5,
+        3,
+    )
+
+
+def test_history_endpoint_combines_summaries_and_changes(history):
+    audit.compact(datetime.date(2024, 2, 1))
+    inventory = Inventory.objects.get(product=history)
+    url = reverse("inventory-history", args=[inventory.pk])
+
+    data = APIClient().get(url, {"date_from": "2024-01-01", "date_to": "2024-02-29"}).json()
+
+    assert [row["day"] for row in data["daily"]] == ["2024-01-31"]
+    assert [row["new_quantity"] for row in data["changes"]] == [11]
+
+    data = APIClient().get(url, {"date_from": "2024-03-01"}).json()
+    assert data["daily"] == []
+    assert [row["new_quantity"] for row in data["changes"]] == [4]
@@ -0,0 +1,132 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from dashboard import notifications
+from dashboard.models import BroadcastReceipt, Notification, NotificationReadMark
+
+
+@pytest.fixture
+def users(db):
+    return User.objects.create_user("alice"), User.objects.create_user("bob")
+
+
+def broadcast(n, minutes_ago=10):
+    # Older than the commit window by default, so the read mark may cover them.
+    created_at = timezone.now() - timedelta(minutes=minutes_ago)
+    return [
+        Notification.objects.create(
+            notification_type="system_error", message=f"b{i}", created_at=created_at
+        )
+        for i in range(n)
+    ]
+
+
+def unread(user):
+    return sorted(n.message for n in Notification.objects.unread_for(user))
+
+
+def test_reading_a_broadcast_is_per_user(users):
+    alice, bob = users
+    (only,) = broadcast(1)
+
+    notifications.mark_read(alice, [only.pk])
+
+    assert unread(alice) == []
+    assert unread(bob) == ["b0"]
+    only.refresh_from_db()
+    assert not only.is_read
+
+
+def test_single_reads_do_not_save_rows(users, django_assert_max_num_queries):
+    alice, bob = users
+    (shared,) = broadcast(1)
+    own = Notification.objects.create(user=alice, notification_type="system_error", message="own")
+    theirs = Notification.objects.create(user=bob, notification_type="system_error", message="theirs")
+
+    # One UPDATE for the own rows and a receipt for the broadcast, plus
+    # the read mark bookkeeping; no per-row save.
+    with django_assert_max_num_queries(14):
+        assert notifications.mark_read(alice, [own.pk, shared.pk, theirs.pk]) == 2
+
+    assert unread(alice) == []
+    assert unread(bob) == ["b0", "theirs"]
+    with pytest.raises(ValueError):
+        shared.mark_as_read()
+
+
+def test_unread_state_is_one_query(users, django_assert_num_queries):
+    broadcast(3)
+    Notification.objects.create(user=users[0], notification_type="system_error", message="own")
+
+    with django_assert_num_queries(1):
+        assert unread(users[0]) == ["b0", "b1", "b2", "own"]
+
+
+def test_mark_moves_up_and_drops_covered_receipts(users):
+    alice = users[0]
+    first, second, third = broadcast(3)
+
+    notifications.mark_read(alice, [second.pk])
+    assert NotificationReadMark.objects.get(user=alice).last_broadcast_id == 0
+    assert list(BroadcastReceipt.objects.values_list("notification_id", flat=True)) == [second.pk]
+
+    notifications.mark_read(alice, [first.pk])
+    assert NotificationReadMark.objects.get(user=alice).last_broadcast_id == second.pk
+    assert not BroadcastReceipt.objects.exists()
+    assert unread(alice) == ["b2"]
+
+    notifications.mark_read(alice, [third.pk])
+    assert NotificationReadMark.objects.get(user=alice).last_broadcast_id == third.pk
+    assert unread(alice) == []
+
+
+def test_mark_all_read(users, django_capture_on_commit_callbacks):
+    alice, bob = users
+    broadcast(2)
+    own = Notification.objects.create(user=alice, notification_type="system_error", message="own")
+    assert notifications.unread_summary(alice)["count"] == 3
+
+    with django_capture_on_commit_callbacks(execute=True):
+        notifications.mark_all_read(alice)
+
+    assert notifications.unread_summary(alice)["count"] == 0
+    assert unread(bob) == ["b0", "b1"]
+    own.refresh_from_db()
+    assert own.is_read
+
+    broadcast(1)
+    assert unread(alice) == ["b0"]
+
+
+def test_mark_all_read_stops_at_what_the_client_showed(users):
+    alice = users[0]
+    first, second = broadcast(2)
+
+    notifications.mark_all_read(alice, through=first.pk)
+
+    assert unread(alice) == ["b1"]
+
+
+def test_late_committing_broadcast_is_not_skipped(users):
+    alice = users[0]
+    (old,) = broadcast(1)
+    # A broadcast whose transaction took its id first but commits after a
+    # newer one: the client shows only the newer one...
+    newer = Notification.objects.create(
+        pk=old.pk + 10, notification_type="system_error", message="newer"
+    )
+    notifications.mark_all_read(alice, through=newer.pk)
+    assert NotificationReadMark.objects.get(user=alice).last_broadcast_id == old.pk
+    assert list(BroadcastReceipt.objects.values_list("notification_id", flat=True)) == [newer.pk]
+
+    # ...and the late one, committing below it, is still unread.
+    Notification.objects.create(
+        pk=old.pk + 5, notification_type="system_error", message="late"
+    )
+    assert unread(alice) == ["late"]
+
+    notifications.mark_read(alice, [old.pk + 5])
+    assert unread(alice) == []
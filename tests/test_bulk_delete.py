@@ -0,0 +1,99 @@
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from inventory import catalog, jobs, search
+from inventory.models import Category, Job, SearchDocument, Supplier
+
+
+@pytest.fixture
+def staff_client(client, db):
+    client.force_login(User.objects.create_user("staff", password="x"))
+    return client
+
+
+def _post(client, name, ids):
+    """Queue a bulk delete, run it and return the polled job."""
+    response = client.post(reverse(name), {"ids[]": [str(pk) for pk in ids]})
+    assert response.status_code == 202
+    assert Job.objects.get(pk=response.json()["job"]).status == Job.QUEUED
+    jobs.work(burst=True)
+    return client.get(response.json()["url"]).json()
+
+
+def test_suppliers_are_deleted_in_constant_queries(make_product, django_assert_max_num_queries):
+    linked = make_product().supplier
+    unused = Supplier.objects.bulk_create(
+        [Supplier(supplier_name=f"Unused {n}", phone_number="1") for n in range(300)]
+    )
+    ids = [linked.pk] + [s.pk for s in unused]
+
+    # The annotated select, the delete and the unindex, in a savepoint.
+    with django_assert_max_num_queries(5):
+        undeletable = catalog.delete_unused_suppliers(ids)
+
+    assert undeletable == [linked.supplier_name]
+    assert list(Supplier.objects.filter(pk__in=ids)) == [linked]
+
+
+def test_bulk_delete_suppliers_runs_as_job(staff_client, make_product):
+    linked = make_product().supplier
+    supplier = Supplier.objects.create(supplier_name="Acme", phone_number="1")
+    assert search.search(Supplier.objects.all(), "acme").exists()
+
+    job = _post(staff_client, "bulk_delete_suppliers", [supplier.pk])
+    assert job["status"] == Job.SUCCEEDED
+    assert job["result"] == {"status": "success"}
+    assert not SearchDocument.objects.filter(label="inventory.supplier", object_id=supplier.pk).exists()
+
+    job = _post(staff_client, "bulk_delete_suppliers", [linked.pk])
+    assert job["result"]["status"] == "partial"
+    assert linked.supplier_name in job["result"]["message"]
+
+
+def test_categories_delete_whole_unused_subtrees(staff_client, make_product, django_assert_max_num_queries):
+    used_root = Category.objects.create(category_name="Brakes")
+    used_leaf = Category.objects.create(
+        category_name="Pads",
+        parent_category=Category.objects.create(category_name="Discs", parent_category=used_root),
+    )
+    make_product(category=used_leaf)
+    unused_root = Category.objects.create(category_name="Lights")
+    unused_mid = Category.objects.create(category_name="Bulbs", parent_category=unused_root)
+    Category.objects.create(category_name="LED", parent_category=unused_mid)
+
+    # As for suppliers, plus one query collecting the unused subtrees.
+    with django_assert_max_num_queries(6):
+        undeletable = catalog.delete_unused_categories([used_root.pk, unused_root.pk])
+
+    assert undeletable == ["Brakes"]
+    assert sorted(Category.objects.values_list("category_name", flat=True)) == sorted(
+        ["Brakes", "Discs", "Pads"]
+    )
+    assert not search.search(Category.objects.all(), "led").exists()
+
+    job = _post(staff_client, "bulk_delete_categories", [used_root.pk])
+    assert job["result"]["status"] == "partial"
+    assert "Brakes" in job["result"]["message"]
+
+
+def test_bulk_delete_drops_cached_counts(client, db, django_capture_on_commit_callbacks):
+    suppliers = Supplier.objects.bulk_create(
+        [Supplier(supplier_name=f"Supplier {n}", phone_number="1") for n in range(5)]
+    )
+    # Not bulk_create: save() keeps the materialized path.
+    categories = [Category.objects.create(category_name=f"Category {n}") for n in range(3)]
+
+    def totals():
+        query = {"draw": 1, "start": 0, "length": 10}
+        return (
+            client.get(reverse("ajax_supplier_list_data"), query).json()["recordsTotal"],
+            client.get(reverse("ajax_category_list_data"), query).json()["recordsTotal"],
+        )
+
+    assert totals() == (5, 3)
+    with django_capture_on_commit_callbacks(execute=True):
+        catalog.delete_unused_suppliers([s.pk for s in suppliers[:2]])
+        catalog.delete_unused_categories([categories[0].pk])
+
+    assert totals() == (3, 2)
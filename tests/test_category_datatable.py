@@ -0,0 +1,56 @@
+import pytest
+from django.urls import reverse
+
+from inventory.models import Category
+
+
+def _draw(client, **params):
+    query = {"draw": 1, "start": 0, "length": 10, **params}
+    return client.get(reverse("ajax_category_list_data"), query).json()
+
+
+@pytest.fixture
+def categories(db):
+    parents = [Category.objects.create(category_name=f"Parent {n}") for n in range(12)]
+    Category.objects.bulk_create(
+        [
+            Category(category_name=f"Child {p.pk}-{n}", parent_category=p, is_active=n % 2 == 0)
+            for p in parents
+            for n in range(3 if p.pk % 2 else 300)
+        ]
+    )
+    return parents
+
+
+def test_page_renders_from_the_prefetch_only(client, categories, django_assert_num_queries):
+    # One count (reused for both totals), the page and the sub-category prefetch.
+    with django_assert_num_queries(3):
+        data = _draw(client)
+    assert len(data["data"]) == 10
+
+    # Filtered draws add the filtered count only.
+    with django_assert_num_queries(4):
+        data = _draw(client, **{"search[value]": "parent 1"})
+    assert data["recordsFiltered"] == 3
+
+
+def test_rows_list_every_sub_category(client, categories):
+    big = Category.objects.filter(parent_category__isnull=True).order_by("-created_at", "-id")[0]
+    row = next(r for r in _draw(client)["data"] if r["id"] == big.pk)
+
+    count = big.sub_categories.count()
+    assert f">{count}</span>" in row["Category"]
+    assert row["Sub-Category"].count("list-group-item py-1") == count
+    assert row["Sub-Category"].count("bi-x-circle-fill") == count // 2
+    assert f'id="subcat-{big.pk}"' in row["Sub-Category"]
+    assert reverse("category_ledger", args=[big.pk]) in row["Action"]
+
+
+def test_names_are_escaped_and_empty_parents_say_so(client, db):
+    Category.objects.create(category_name="<Brakes & Pads>")
+
+    row = _draw(client)["data"][0]
+
+    assert row["Category"].startswith("&lt;Brakes &amp; Pads&gt; ")
+    assert 'data-category-name="&lt;Brakes &amp; Pads&gt;"' in row["Action"]
+    assert "No Sub-Categories" in row["Sub-Category"]
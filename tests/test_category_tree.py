@@ -0,0 +1,73 @@
+import pytest
+from django.core.exceptions import ValidationError
+
+from inventory.models import Category, Product
+
+
+@pytest.fixture
+def tree(db):
+    root = Category.objects.create(category_name="Vehicle")
+    brakes = Category.objects.create(category_name="Brakes", parent_category=root)
+    pads = Category.objects.create(category_name="Pads", parent_category=brakes)
+    ceramic = Category.objects.create(category_name="Ceramic", parent_category=pads)
+    engine = Category.objects.create(category_name="Engine", parent_category=root)
+    return {c.category_name: c for c in (root, brakes, pads, ceramic, engine)}
+
+
+def _names(qs):
+    return sorted(qs.values_list("category_name", flat=True))
+
+
+def test_paths_follow_the_hierarchy(tree):
+    ceramic = tree["Ceramic"]
+    root, brakes, pads = tree["Vehicle"], tree["Brakes"], tree["Pads"]
+
+    assert ceramic.path == f"/{root.pk}/{brakes.pk}/{pads.pk}/{ceramic.pk}/"
+    assert ceramic.depth == 3
+    assert list(ceramic.ancestors()) == [root, brakes, pads]
+    assert _names(brakes.descendants()) == ["Ceramic", "Pads"]
+
+
+def test_descendants_are_one_query(tree, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        assert len(list(tree["Vehicle"].descendants())) == 4
+
+
+def test_moving_a_category_reroots_its_subtree(tree):
+    pads = tree["Pads"]
+    pads.parent_category = tree["Engine"]
+    pads.save()
+
+    ceramic = Category.objects.get(pk=tree["Ceramic"].pk)
+    assert ceramic.path == f"{pads.path}{ceramic.pk}/"
+    assert ceramic.depth == 3
+    assert _names(tree["Brakes"].descendants()) == []
+    assert _names(tree["Engine"].descendants()) == ["Ceramic", "Pads"]
+
+
+def test_cannot_move_under_own_descendant(tree):
+    brakes = Category.objects.get(pk=tree["Brakes"].pk)
+    brakes.parent_category = tree["Ceramic"]
+
+    with pytest.raises(ValidationError):
+        brakes.save()
+
+
+def test_subtree_queries(tree, make_product, django_assert_num_queries):
+    make_product(category=tree["Ceramic"])
+    make_product(category=tree["Pads"])
+    make_product(category=tree["Engine"])
+
+    with django_assert_num_queries(1):
+        counts = dict(
+            Category.objects.with_subtree_product_counts().values_list(
+                "category_name", "subtree_products"
+            )
+        )
+    assert counts == {"Vehicle": 3, "Brakes": 2, "Pads": 2, "Ceramic": 1, "Engine": 1}
+
+    with django_assert_num_queries(1):
+        subtree = _names(Category.objects.filter(pk=tree["Brakes"].pk).subtrees())
+    assert subtree == ["Brakes", "Ceramic", "Pads"]
+
+    assert Product.objects.filter(tree["Brakes"].subtree_q("category__")).count() == 2
@@ -0,0 +1,61 @@
+import pytest
+from django.urls import reverse
+
+from inventory.category_tree import get_tree
+from inventory.forms import CategoryForm, ProductForm
+from inventory.models import Category
+
+
+@pytest.fixture
+def chain(db):
+    root = Category.objects.create(category_name="Vehicle")
+    brakes = Category.objects.create(category_name="Brakes", parent_category=root)
+    pads = Category.objects.create(category_name="Pads", parent_category=brakes)
+    return root, brakes, pads
+
+
+def test_str_reads_the_parent_chain_from_the_tree(chain, django_assert_num_queries):
+    pads = Category.objects.get(pk=chain[2].pk)
+    get_tree()
+
+    with django_assert_num_queries(0):
+        assert str(pads) == "Vehicle -> Brakes -> Pads"
+
+
+def test_saves_invalidate_the_tree(chain):
+    root, _, pads = chain
+    assert str(pads) == "Vehicle -> Brakes -> Pads"
+
+    root.category_name = "Car"
+    root.save()
+
+    assert str(Category.objects.get(pk=pads.pk)) == "Car -> Brakes -> Pads"
+
+
+def test_product_form_renders_without_per_option_queries(chain, django_assert_max_num_queries):
+    root = chain[0]
+    for n in range(200):
+        Category.objects.create(category_name=f"Sub {n}", parent_category=root)
+    get_tree()
+
+    # Warehouse and supplier choices only; categories come from the tree.
+    with django_assert_max_num_queries(2):
+        html = str(ProductForm()["category"])
+    assert "Vehicle -&gt; Sub 199" in html
+    assert "Vehicle -&gt; Brakes -&gt; Pads" in html
+
+    with django_assert_max_num_queries(0):
+        choices = dict(CategoryForm().fields["parent_category"].choices)
+    assert choices[root.pk] == "Vehicle"
+
+
+def test_ledger_groups_subtree_products_by_sub_category(client, chain, make_product):
+    root, brakes, pads = chain
+    make_product(category=pads, product_name="Ceramic Pad")
+    make_product(category=brakes, product_name="Caliper")
+
+    response = client.get(reverse("category_ledger", args=[root.pk]))
+
+    (sub,) = response.context["sub_categories"]
+    assert sub["category_name"] == "Brakes"
+    assert sorted(p.product_name for p in sub["products"]) == ["Caliper", "Ceramic Pad"]
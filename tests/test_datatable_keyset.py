@@ -0,0 +1,97 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from inventory.datatables import encode_cursor
+from inventory.models import Supplier
+
+URL = "ajax_supplier_list_data"
+
+
+def _draw(client, start, **params):
+    query = {"draw": 1, "start": start, "length": 10, **params}
+    with CaptureQueriesContext(connection) as queries:
+        data = client.get(reverse(URL), query).json()
+    return data, [q["sql"] for q in queries]
+
+
+@pytest.fixture
+def suppliers(db):
+    # Duplicate names so the id tie-breaker matters.
+    return [
+        Supplier.objects.create(supplier_name=f"Supplier {n % 7}", phone_number=str(n))
+        for n in range(25)
+    ]
+
+
+def _ids(data):
+    return [row["id"] for row in data["data"]]
+
+
+def test_next_page_seeks_from_cached_boundary(client, suppliers):
+    order = {"order[0][column]": 1, "order[0][dir]": "asc"}
+    expected = list(
+        Supplier.objects.order_by("supplier_name", "id").values_list("id", flat=True)
+    )
+
+    pages = []
+    for start in (0, 10, 20):
+        data, sql = _draw(client, start, **order)
+        pages.extend(_ids(data))
+        assert not any("OFFSET" in q for q in sql)
+    assert pages == expected
+
+
+def test_cursor_from_response_pages_without_offset(client, suppliers):
+    first, _ = _draw(client, 0)
+    second, sql = _draw(client, 10, cursor=first["cursor"], draw=2)
+
+    expected = list(Supplier.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+    assert _ids(first) + _ids(second) == expected[:20]
+    assert not any("OFFSET" in q for q in sql)
+
+
+def test_jumps_fall_back_to_offset(client, suppliers):
+    data, sql = _draw(client, 20)
+
+    assert len(data["data"]) == 5
+    assert any("OFFSET" in q for q in sql)
+
+
+def test_counts_are_cached(client, suppliers):
+    _draw(client, 0)
+    data, sql = _draw(client, 0, draw=2)
+
+    assert data["recordsTotal"] == data["recordsFiltered"] == 25
+    assert not any("COUNT(" in q for q in sql)
+
+
+def test_saving_a_supplier_invalidates_cached_counts(client, suppliers, django_capture_on_commit_callbacks):
+    _draw(client, 0)
+    with django_capture_on_commit_callbacks(execute=True):
+        Supplier.objects.create(supplier_name="Late Supplier", phone_number="1")
+
+    data, sql = _draw(client, 0, draw=2)
+
+    assert data["recordsTotal"] == 26
+    assert any("COUNT(" in q for q in sql)
+
+
+def test_counts_are_cached_per_normalized_search(client, suppliers):
+    first, _ = _draw(client, 0, **{"search[value]": "Supplier 3"})
+    data, sql = _draw(client, 0, **{"search[value]": "  supplier   3 "})
+
+    assert data["recordsFiltered"] == first["recordsFiltered"] == 4
+    assert not any("COUNT(" in q for q in sql)
+
+
+@pytest.mark.parametrize(
+    "values", [["not a date", 1], ["2024-01-01T00:00:00+00:00", "x"], [None, 1], [[1], {}]]
+)
+def test_tampered_cursor_falls_back_to_offset(client, suppliers, values):
+    data, sql = _draw(client, 10, cursor=encode_cursor(values))
+
+    expected = list(Supplier.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+    assert _ids(data) == expected[10:20]
+    assert any("OFFSET" in q for q in sql)
@@ -0,0 +1,86 @@
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from inventory import audit, ledger
+from inventory.models import InventoryAudit
+
+
+@pytest.mark.django_db(transaction=True)
+def test_audits_are_bulk_written_on_commit(make_product):
+    products = [make_product(stock=10) for _ in range(20)]
+    InventoryAudit.objects.all().delete()
+
+    with CaptureQueriesContext(connection) as queries:
+        with transaction.atomic():
+            for product in products:
+                audit.record_change(product.pk, 10, 9, note="sync")
+            assert not InventoryAudit.objects.exists()
+
+    inserts = [q for q in queries if q["sql"].startswith('INSERT INTO "inventory_inventoryaudit"')]
+    assert len(inserts) == 1
+    assert InventoryAudit.objects.filter(note="sync").count() == 20
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rolled_back_audits_are_dropped(make_product):
+    product = make_product(stock=10)
+    InventoryAudit.objects.all().delete()
+
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            ledger.post({product.pk: -3}, "adjustment", note="rolled back")
+            raise RuntimeError()
+    with transaction.atomic():
+        ledger.post({product.pk: 2}, "adjustment", note="kept")
+
+    assert list(InventoryAudit.objects.values_list("note", "old_quantity", "new_quantity")) == [
+        ("kept", 10, 12)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_audits_of_rolled_back_savepoints_are_dropped(make_product):
+    a, b = make_product(stock=10), make_product(stock=10)
+    InventoryAudit.objects.all().delete()
+
+    with CaptureQueriesContext(connection) as queries:
+        with transaction.atomic():
+            ledger.post({a.pk: 1}, "adjustment", note="first")
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    ledger.post({b.pk: -1}, "adjustment", note="rolled back")
+                    raise RuntimeError()
+            for _ in range(10):
+                ledger.post({a.pk: 1}, "adjustment", note="loop")
+
+    assert list(InventoryAudit.objects.order_by("id").values_list("note", flat=True)) == [
+        "first"
+    ] + ["loop"] * 10
+    # Each post runs in its own savepoint; their rows are still batched.
+    inserts = [q for q in queries if q["sql"].startswith('INSERT INTO "inventory_inventoryaudit"')]
+    assert len(inserts) <= 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rollback_forgets_the_buffer(make_product):
+    product = make_product(stock=10)
+
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            audit.record_change(product.pk, 10, 9, note="rolled back")
+            (buffer,) = audit._local.buffers
+            raise RuntimeError()
+
+    assert audit._local.buffers == []
+    assert buffer.rows == []
+
+
+@pytest.mark.django_db
+def test_str_does_not_query(make_product, django_assert_num_queries):
+    product = make_product(stock=1)
+    row = InventoryAudit.objects.create(product=product, old_quantity=1, new_quantity=2)
+    row = InventoryAudit.objects.get(pk=row.pk)
+
+    with django_assert_num_queries(0):
+        assert str(row) == f"Product #{product.pk} changed from 1 to 2 by None"
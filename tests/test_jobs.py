@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from inventory import jobs
+from inventory.models import Job
+
+
+@jobs.task("test_echo")
+def _echo(progress, value, fail_times=0):
+    progress(1, 2)
+    if Job.objects.filter(task="test_echo", attempts__lte=fail_times).exists():
+        raise RuntimeError("boom")
+    return {"value": value}
+
+
+pytestmark = pytest.mark.django_db
+
+
+def test_job_runs_once_and_records_result_and_progress():
+    job = jobs.enqueue("test_echo", {"value": 7})
+
+    assert jobs.work(burst=True) == 1
+    job.refresh_from_db()
+    assert job.status == Job.SUCCEEDED
+    assert job.result == {"value": 7}
+    assert (job.progress, job.total, job.attempts) == (1, 2, 1)
+    assert job.locked_by == "" and job.finished_at is not None
+    assert jobs.work(burst=True) == 0
+
+
+def test_only_one_worker_claims_a_job():
+    job = jobs.enqueue("test_echo", {"value": 1})
+
+    assert jobs.claim("a").pk == job.pk
+    assert jobs.claim("b") is None
+
+
+def test_failures_back_off_then_fail(settings):
+    settings.JOB_RETRY_BACKOFF = 10
+    job = jobs.enqueue("test_echo", {"value": 1, "fail_times": 5}, max_attempts=2)
+
+    jobs.work(burst=True)
+    job.refresh_from_db()
+    assert job.status == Job.QUEUED
+    assert "boom" in job.error
+    assert job.run_at > timezone.now() + timedelta(seconds=5)
+    # Not due yet.
+    assert jobs.work(burst=True) == 0
+
+    Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+    jobs.work(burst=True)
+    job.refresh_from_db()
+    assert (job.status, job.attempts) == (Job.FAILED, 2)
+
+
+def test_retry_succeeds():
+    job = jobs.enqueue("test_echo", {"value": 3, "fail_times": 1})
+    jobs.work(burst=True)
+    Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+    jobs.work(burst=True)
+
+    job.refresh_from_db()
+    assert (job.status, job.attempts, job.result) == (Job.SUCCEEDED, 2, {"value": 3})
+
+
+def test_silent_worker_loses_its_job(settings):
+    settings.JOB_LOCK_TIMEOUT = 60
+    job = jobs.enqueue("test_echo", {"value": 1})
+    claimed = jobs.claim("dead")
+    Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(minutes=5))
+
+    assert jobs.requeue_stale() == 1
+    job.refresh_from_db()
+    assert job.status == Job.QUEUED and "dead" in job.error
+
+    # The old worker's late result no longer applies to the job.
+    Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+    assert jobs.claim("alive").attempts == 2
+    jobs.run(claimed)
+    job.refresh_from_db()
+    assert job.status == Job.RUNNING and job.locked_by == "alive"
+
+
+def test_unknown_task_is_rejected():
+    with pytest.raises(KeyError):
+        jobs.enqueue("no_such_task")
+
+
+def test_reconcile_job(make_product, dealer):
+    from inventory.models import Order, OrderItem
+
+    product = make_product()
+    order = Order.objects.create(dealer=dealer)
+    OrderItem.objects.create(order=order, product=product, quantity=2, unit_price=500)
+    Order.objects.filter(pk=order.pk).update(total_amount=1)
+
+    job = jobs.enqueue("reconcile_order_totals", {"batch_size": 10})
+    jobs.work(burst=True)
+    job.refresh_from_db()
+    assert job.result == {"drifted": 1, "fixed": 1}
+    order.refresh_from_db()
+    assert order.total_amount == 1000
@@ -0,0 +1,81 @@
+import pytest
+from django.contrib.auth.models import User
+from django.template import Context, Template
+
+from dashboard.models import Notification
+
+HEADER = Template(
+    "{% load notification_tags %}"
+    "{% get_user_notifications user as notifications %}"
+    "{% get_unread_notification_count user as unread_count %}"
+    "{{ unread_count }}:{% for n in notifications %}{{ n.message }},{% endfor %}"
+)
+
+
+def render(user):
+    return HEADER.render(Context({"user": user}))
+
+
+@pytest.fixture
+def users(db):
+    return User.objects.create_user("alice"), User.objects.create_user("bob")
+
+
+def notify(captured, **kwargs):
+    with captured(execute=True):
+        return Notification.objects.create(notification_type="system_error", **kwargs)
+
+
+def test_for_user_is_one_or_condition(users):
+    sql = str(Notification.objects.for_user(users[0]).query)
+    assert sql.count("SELECT") == 1
+    assert "OR" in sql
+
+
+def test_header_is_served_from_cache(users, django_capture_on_commit_callbacks, django_assert_num_queries):
+    alice, bob = users
+    notify(django_capture_on_commit_callbacks, user=alice, message="mine")
+    notify(django_capture_on_commit_callbacks, user=bob, message="theirs")
+    notify(django_capture_on_commit_callbacks, user=None, message="all")
+
+    with django_assert_num_queries(1):
+        assert render(alice) == "2:all,mine,"
+    with django_assert_num_queries(0):
+        assert render(alice) == "2:all,mine,"
+
+
+def test_changes_invalidate_only_affected_users(users, django_capture_on_commit_callbacks, django_assert_num_queries):
+    alice, bob = users
+    mine = notify(django_capture_on_commit_callbacks, user=alice, message="mine")
+    render(alice), render(bob)
+
+    notify(django_capture_on_commit_callbacks, user=bob, message="theirs")
+    with django_assert_num_queries(0):
+        assert render(alice) == "1:mine,"
+    assert render(bob) == "1:theirs,"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        mine.mark_as_read()
+    assert render(alice) == "0:"
+
+    notify(django_capture_on_commit_callbacks, user=None, message="all")
+    assert render(alice) == "1:all,"
+    assert render(bob) == "2:all,theirs,"
+
+
+def test_superusers_see_every_change(users, django_capture_on_commit_callbacks):
+    admin = User.objects.create_superuser("admin")
+    assert render(admin) == "0:"
+
+    notify(django_capture_on_commit_callbacks, user=users[0], message="mine")
+    assert render(admin) == "1:mine,"
+
+
+def test_count_goes_past_the_dropdown(users, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        Notification.objects.bulk_create(
+            [Notification(user=users[0], notification_type="system_error", message=str(n)) for n in range(12)]
+        )
+        # bulk_create sends no signals; the next save invalidates.
+        Notification.objects.create(user=users[0], notification_type="system_error", message="x")
+    assert render(users[0]).startswith("13:")
@@ -0,0 +1,134 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from dashboard import notifications
+from dashboard.models import BroadcastReceipt, Notification, NotificationArchive
+
+
+@pytest.fixture
+def alice(db):
+    return User.objects.create_user("alice")
+
+
+def notify(days_ago=0, **kwargs):
+    kwargs.setdefault("notification_type", "low_stock")
+    kwargs.setdefault("message", "m")
+    return Notification.objects.create(
+        created_at=timezone.now() - timedelta(days=days_ago), **kwargs
+    )
+
+
+def test_mark_category_read(alice, django_assert_max_num_queries):
+    product = [notify(user=alice, category="product") for _ in range(30)]
+    order = notify(user=alice, category="order")
+
+    # One UPDATE and the broadcast lookup, in a savepoint.
+    with django_assert_max_num_queries(4):
+        assert notifications.mark_category_read(alice, "product") == 30
+
+    assert list(Notification.objects.unread_for(alice)) == [order]
+    assert not Notification.objects.filter(pk__in=[n.pk for n in product], is_read=False).exists()
+
+
+def test_mark_category_read_covers_broadcasts(alice):
+    broadcast = notify(category="product")
+    other = notify(category="order")
+
+    assert notifications.mark_category_read(alice, "product") == 1
+
+    assert list(Notification.objects.unread_for(alice)) == [other]
+    broadcast.refresh_from_db()
+    assert not broadcast.is_read
+
+
+def test_archive_moves_rows_in_batches(alice, django_capture_on_commit_callbacks):
+    old = [notify(days_ago=100, user=alice, message=f"old {n}") for n in range(5)]
+    old_broadcast = notify(days_ago=100, message="old broadcast")
+    BroadcastReceipt.objects.create(user=alice, notification=old_broadcast)
+    recent = notify(days_ago=1, user=alice)
+    assert notifications.unread_summary(alice)["count"] == 6
+
+    with django_capture_on_commit_callbacks(execute=True):
+        moved = notifications.archive(timezone.now() - timedelta(days=90), batch_size=2)
+
+    assert moved == 6
+    assert list(Notification.objects.all()) == [recent]
+    archived = NotificationArchive.objects.order_by("pk")
+    assert [a.pk for a in archived] == [n.pk for n in old] + [old_broadcast.pk]
+    assert archived[0].message == "old 0" and archived[0].user_id == alice.pk
+    assert archived[0].created_at == old[0].created_at
+    assert not BroadcastReceipt.objects.exists()
+    assert notifications.unread_summary(alice)["count"] == 1
+
+
+def test_archive_command(alice):
+    notify(days_ago=40, user=alice)
+    notify(days_ago=10, user=alice)
+
+    call_command("archive_notifications", "--older-than-days", "30")
+
+    assert Notification.objects.count() == 1
+    assert NotificationArchive.objects.count() == 1
+
+
+def test_bulk_endpoints(client, alice):
+    client.force_login(alice)
+    notify(user=alice, category="order")
+    notify(user=alice, category="product", days_ago=60)
+    theirs = notify(user=User.objects.create_user("bob"), days_ago=60)
+
+    response = client.post(reverse("mark_category_notifications_read", args=["order"]))
+    assert response.json() == {"status": "success", "updated": 1}
+    assert client.post(reverse("mark_category_notifications_read", args=["nope"])).status_code == 400
+
+    assert client.post(reverse("mark_all_notifications_read")).json()["updated"] == 1
+    assert not Notification.objects.unread_for(alice).exists()
+
+    response = client.post(reverse("archive_old_notifications"), {"days": 30})
+    assert response.json() == {"status": "success", "archived": 1}
+    assert Notification.objects.filter(pk=theirs.pk).exists()
+    assert client.get(reverse("archive_old_notifications")).status_code == 400
+
+
+def test_superuser_reads_every_row_they_count(alice, django_capture_on_commit_callbacks):
+    admin = User.objects.create_superuser("admin")
+    notify(user=alice, category="order")
+    notify(user=alice, category="product")
+    notify(user=admin, category="product")
+    notify(user=admin, category="order")
+    notify(category="product")
+    assert notifications.unread_summary(admin)["count"] == 5
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert notifications.mark_category_read(admin, "product") == 3
+    assert notifications.unread_summary(admin)["count"] == 2
+    # Their own product row is read; the broadcast is still unread for them.
+    assert notifications.unread_summary(alice)["count"] == 2
+
+    # "Mark all read" only touches the superuser's own rows...
+    with django_capture_on_commit_callbacks(execute=True):
+        assert notifications.mark_all_read(admin) == 1
+    assert notifications.unread_summary(admin)["count"] == 1
+    assert notifications.unread_summary(alice)["count"] == 2
+
+    # ...the separate everyone action reads the rest they count.
+    with django_capture_on_commit_callbacks(execute=True):
+        assert notifications.mark_everyone_read(admin) == 1
+    assert notifications.unread_summary(admin)["count"] == 0
+    assert notifications.unread_summary(alice)["count"] == 1
+
+
+def test_only_superusers_mark_everyone_read(alice, client):
+    notify(user=alice)
+    client.force_login(User.objects.create_user("bob"))
+    assert client.post(reverse("mark_everyone_notifications_read")).status_code == 403
+
+    client.force_login(User.objects.create_superuser("admin"))
+    response = client.post(reverse("mark_everyone_notifications_read"))
+    assert response.json() == {"status": "success", "updated": 1, "unread": 0}
+    assert not Notification.objects.unread_for(alice).exists()
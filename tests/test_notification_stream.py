@@ -0,0 +1,123 @@
+import asyncio
+import json
+
+import pytest
+from django.contrib.auth.models import User
+from django.test import AsyncClient
+from django.urls import reverse
+
+from dashboard import stream
+from dashboard.models import Notification
+
+
+@pytest.fixture(autouse=True)
+def hub(monkeypatch):
+    """A fresh hub, so ids published by other tests are not deduplicated here."""
+    hub = stream.Hub()
+    monkeypatch.setattr(stream, "hub", hub)
+    return hub
+
+
+def event(pk, user_id=None):
+    return {
+        "id": pk,
+        "user_id": user_id,
+        "notification_type": "low_stock",
+        "category": "product",
+        "message": f"n{pk}",
+        "created_at": None,
+    }
+
+
+def parse(message):
+    fields = dict(line.split(": ", 1) for line in message.strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+@pytest.mark.django_db(transaction=True)
+def test_hub_routes_and_dedupes(hub):
+    async def main():
+        alice = await hub.subscribe(User(pk=1))
+        admin = await hub.subscribe(User(pk=3, is_superuser=True))
+        hub.unsubscribe(await hub.subscribe(User(pk=4)))
+        for e in (event(10, user_id=1), event(11, user_id=2), event(12), event(12)):
+            hub.publish(e)
+        await asyncio.sleep(0)
+        received = [
+            [s.queue.get_nowait()["id"] for _ in range(s.queue.qsize())]
+            for s in (alice, admin)
+        ]
+        hub.unsubscribe(alice)
+        hub.unsubscribe(admin)
+        return received
+
+    assert asyncio.run(main()) == [[10, 12], [10, 11, 12]]
+    assert not hub._pollers
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_sends_count_then_new_notifications(settings, hub):
+    settings.NOTIFICATION_STREAM_POLL_INTERVAL = 0.05
+    user = User.objects.create_user("alice")
+    Notification.objects.create(user=user, notification_type="low_stock", message="old")
+
+    async def main():
+        messages = stream.events(user)
+        first = await messages.__anext__()
+        # Saved by "another process": only the poller can see it.
+        await asyncio.to_thread(
+            Notification.objects.bulk_create,
+            [Notification(notification_type="new_order", message="broadcast")],
+        )
+        second = await asyncio.wait_for(messages.__anext__(), 5)
+        await messages.aclose()
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert parse(first) == ("unread", {"count": 1})
+    kind, data = parse(second)
+    assert (kind, data["message"], data["user_id"]) == ("notification", "broadcast", None)
+    assert not hub._pollers
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_view_replays_since_last_event_id():
+    user = User.objects.create_user("alice")
+    seen = Notification.objects.create(user=user, notification_type="low_stock", message="seen")
+    Notification.objects.create(user=user, notification_type="low_stock", message="missed")
+    client = AsyncClient()
+    client.force_login(user)
+
+    async def main():
+        response = await client.get(
+            reverse("notification_stream"), headers={"Last-Event-ID": str(seen.pk)}
+        )
+        content = response.streaming_content
+        messages = [await content.__anext__(), await content.__anext__()]
+        await content.aclose()
+        return response, messages
+
+    response, messages = asyncio.run(main())
+    assert response["Content-Type"] == "text/event-stream"
+    assert parse(messages[0].decode()) == ("unread", {"count": 2})
+    assert parse(messages[1].decode())[1]["message"] == "missed"
+
+
+@pytest.mark.django_db
+def test_stream_view_answers_at_once_under_wsgi(client, settings):
+    settings.NOTIFICATION_STREAM_RETRY = 10
+    user = User.objects.create_user("alice")
+    seen = Notification.objects.create(user=user, notification_type="low_stock", message="seen")
+    missed = Notification.objects.create(user=user, notification_type="low_stock", message="missed")
+    Notification.objects.create(user=user, notification_type="low_stock", message="read", is_read=True)
+    client.force_login(user)
+
+    response = client.get(reverse("notification_stream"), headers={"Last-Event-ID": str(seen.pk)})
+
+    assert not response.streaming
+    retry, *messages = response.content.decode().split("\n\n")[:-1]
+    assert retry == "retry: 10000"
+    (kind, data), unread = [parse(m) for m in messages]
+    assert (kind, data["id"], data["message"]) == ("notification", missed.pk, "missed")
+    assert unread == ("unread", {"count": 2})
+    assert messages[-1].splitlines()[1] == f"id: {Notification.objects.latest('pk').pk}"
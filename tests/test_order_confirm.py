@@ -0,0 +1,118 @@
+import threading
+import time
+
+import pytest
+from django.db import OperationalError, connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from inventory.models import Inventory, Order, OrderItem
+from inventory.order_services import InsufficientStock, confirm_order
+
+
+def _order(dealer, lines):
+    order = Order.objects.create(dealer=dealer, status="draft")
+    for product, quantity in lines:
+        OrderItem.objects.create(
+            order=order, product=product, quantity=quantity, unit_price=500
+        )
+    return order
+
+
+@pytest.mark.django_db
+def test_confirm_deducts_stock(make_product, dealer):
+    a, b = make_product(stock=10), make_product(stock=5)
+    order = _order(dealer, [(a, 4), (b, 5), (a, 1)])
+
+    response = APIClient().post(reverse("order-confirm", args=[order.pk]))
+
+    assert response.status_code == 200
+    assert Inventory.objects.get(product=a).quantity == 5
+    assert Inventory.objects.get(product=b).quantity == 0
+    order.refresh_from_db()
+    assert order.status == "confirmed"
+
+
+@pytest.mark.django_db
+def test_confirm_insufficient_stock_payload(make_product, dealer):
+    product = make_product(stock=5, product_name="Brake Pad")
+    order = _order(dealer, [(product, 10)])
+
+    response = APIClient().post(reverse("order-confirm", args=[order.pk]))
+
+    assert response.status_code == 400
+    assert response.data == {
+        "error": "Insufficient stock for some products.",
+        "details": [{"product": "Brake Pad", "available": 5, "requested": 10}],
+    }
+    assert Inventory.objects.get(product=product).quantity == 5
+    order.refresh_from_db()
+    assert order.status == "draft"
+
+
+@pytest.mark.django_db
+def test_confirm_twice_is_rejected(make_product, dealer):
+    product = make_product(stock=10)
+    order = _order(dealer, [(product, 3)])
+    client = APIClient()
+
+    client.post(reverse("order-confirm", args=[order.pk]))
+    response = client.post(reverse("order-confirm", args=[order.pk]))
+
+    assert response.status_code == 400
+    assert response.data == {"error": "Only draft orders can be confirmed."}
+    assert Inventory.objects.get(product=product).quantity == 7
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("size", [1, 50])
+def test_confirm_query_count_is_flat(make_product, dealer, size, django_assert_num_queries):
+    products = [make_product(stock=10) for _ in range(size)]
+    order = _order(dealer, [(p, 1) for p in products])
+
+    # savepoint + order lock + line aggregate + inventory lock + other
+    # orders' holds + ledger post (6) + release own holds + status update
+    # + sales and order rollups (8) + release savepoint
+    with django_assert_num_queries(22):
+        confirm_order(order.pk)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_confirms_never_oversell(make_product, dealer):
+    hot = make_product(stock=10)
+    orders = [_order(dealer, [(hot, 3)]) for _ in range(8)]
+    confirmed, rejected = [], []
+
+    errors = []
+
+    def worker(order_id):
+        try:
+            for attempt in range(100):
+                try:
+                    confirm_order(order_id)
+                    confirmed.append(order_id)
+                except InsufficientStock:
+                    rejected.append(order_id)
+                except OperationalError:
+                    # SQLite refuses concurrent writers ("database is
+                    # locked"); the confirm rolled back, so try again.
+                    time.sleep(0.01 * (attempt % 10 + 1))
+                    continue
+                return
+            errors.append(order_id)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker, args=(o.pk,)) for o in orders]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    remaining = Inventory.objects.get(product=hot).quantity
+    assert not errors, "confirms still locked out after retrying"
+    assert len(confirmed) + len(rejected) == len(orders)
+    # Every order got a real answer, so exactly the stock's worth confirmed.
+    assert len(confirmed) == 3
+    assert remaining == 10 - 3 * len(confirmed)
+    assert Order.objects.filter(status="confirmed").count() == len(confirmed)
@@ -0,0 +1,78 @@
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from inventory.models import Order, OrderItem
+
+
+@pytest.mark.django_db
+def test_bulk_intake_creates_orders_with_totals(make_product, dealer):
+    a, b = make_product(selling_price=500), make_product(selling_price=250)
+    payload = {
+        "orders": [
+            {
+                "dealer": dealer.pk,
+                "items": [
+                    {"product": a.pk, "quantity": 2, "unit_price": "450.00"},
+                    {"product": b.pk, "quantity": 4},
+                ],
+            },
+            {"dealer": dealer.pk, "items": [{"product": b.pk, "quantity": 1}]},
+        ]
+    }
+
+    response = APIClient().post(reverse("order-bulk"), payload, format="json")
+
+    assert response.status_code == 201
+    assert response.data["created"] == 2
+    first = Order.objects.get(pk=response.data["results"][0]["id"])
+    assert first.total_amount == Decimal("1900.00")
+    assert first.status == "draft"
+    assert sorted(first.items.values_list("line_total", flat=True)) == [
+        Decimal("900.00"),
+        Decimal("1000.00"),
+    ]
+    assert OrderItem.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_bulk_intake_reports_per_order_errors(make_product, dealer):
+    product = make_product()
+    payload = {
+        "orders": [
+            {"dealer": dealer.pk, "items": [{"product": product.pk, "quantity": 1}]},
+            {"dealer": dealer.pk, "items": [{"product": 999999, "quantity": 1}]},
+            {"dealer": dealer.pk, "items": []},
+        ]
+    }
+
+    response = APIClient().post(reverse("order-bulk"), payload, format="json")
+
+    assert response.status_code == 207
+    statuses = [r["status"] for r in response.data["results"]]
+    assert statuses == ["created", "error", "error"]
+    assert "items" in response.data["results"][1]["errors"]
+    assert Order.objects.count() == 1
+
+
+# Like a real request, the intake runs outside a transaction, where order
+# numbers come from blocks rather than one at a time.
+@pytest.mark.django_db(transaction=True)
+def test_bulk_intake_query_count_is_flat(make_product, dealer, django_assert_max_num_queries):
+    products = [make_product() for _ in range(20)]
+    payload = {
+        "orders": [
+            {"dealer": dealer.pk, "items": [{"product": p.pk, "quantity": 1} for p in products]}
+            for _ in range(50)
+        ]
+    }
+
+    # Lookups, the first order-number block of the day, stock holds and the
+    # inserts; only SQLite's bulk-insert batching grows with the line count.
+    with django_assert_max_num_queries(40):
+        response = APIClient().post(reverse("order-bulk"), payload, format="json")
+
+    assert response.status_code == 201
+    assert OrderItem.objects.count() == 1000
@@ -0,0 +1,81 @@
+import datetime
+
+import pytest
+from django.db import connection, transaction
+
+from inventory import order_numbers
+from inventory.models import Order, OrderNumberSequence
+from inventory.order_numbers import BlockOrderNumberAllocator
+
+
+@pytest.mark.django_db(transaction=True)
+def test_allocator_reserves_blocks(django_assert_max_num_queries):
+    allocator = BlockOrderNumberAllocator(block_size=50)
+    day = datetime.date(2026, 1, 31)
+
+    # A handful of queries per 50-number block, none per number.
+    with django_assert_max_num_queries(3 * 6):
+        numbers = [allocator.allocate(day) for _ in range(120)]
+
+    assert len(set(numbers)) == 120
+    assert numbers[0] == "ORD-20260131-0001"
+    assert numbers[-1] == "ORD-20260131-0120"
+    assert OrderNumberSequence.objects.get(day=day).last_value == 150
+
+
+@pytest.mark.django_db
+def test_allocators_never_overlap():
+    day = datetime.date(2026, 1, 31)
+    first, second = BlockOrderNumberAllocator(10), BlockOrderNumberAllocator(10)
+
+    numbers = [a.allocate(day) for _ in range(25) for a in (first, second)]
+
+    assert len(set(numbers)) == len(numbers)
+
+
+@pytest.mark.django_db
+def test_order_save_uses_allocator(dealer):
+    orders = [Order.objects.create(dealer=dealer) for _ in range(3)]
+
+    assert len({o.order_number for o in orders}) == 3
+    assert all(o.order_number.startswith("ORD-") for o in orders)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sqlite_takes_numbers_inside_the_transaction():
+    day = datetime.date(2026, 1, 31)
+    allocator = BlockOrderNumberAllocator(10)
+
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            assert allocator.allocate(day) == "ORD-20260131-0001"
+            assert allocator.allocate(day) == "ORD-20260131-0002"
+            raise RuntimeError
+
+    # Both numbers went back with the transaction and no block is cached.
+    assert not OrderNumberSequence.objects.filter(day=day).exists()
+    assert allocator.allocate(day) == "ORD-20260131-0001"
+    with transaction.atomic():
+        # A block reserved outside a transaction is served from memory.
+        assert allocator.allocate(day) == "ORD-20260131-0002"
+    assert OrderNumberSequence.objects.get(day=day).last_value == 10
+
+
+@pytest.mark.django_db(transaction=True)
+def test_block_reserved_in_a_transaction_outlives_its_rollback(monkeypatch):
+    monkeypatch.setattr(connection, "vendor", "postgresql")
+    day = datetime.date(2026, 1, 31)
+    allocator = BlockOrderNumberAllocator(10)
+
+    try:
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                assert allocator.allocate(day) == "ORD-20260131-0001"
+                raise RuntimeError
+        # The block was committed on the reservation connection, so the
+        # rollback neither undid it nor made the rest of it unusable.
+        assert OrderNumberSequence.objects.get(day=day).last_value == 10
+        assert allocator.allocate(day) == "ORD-20260131-0002"
+        assert BlockOrderNumberAllocator(10).allocate(day) == "ORD-20260131-0011"
+    finally:
+        order_numbers._local.connection.close()
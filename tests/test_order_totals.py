@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+
+from inventory.models import Order, OrderItem
+from inventory.order_services import recalculate_order_totals
+
+
+def _total(order):
+    order.refresh_from_db(fields=["total_amount"])
+    return order.total_amount
+
+
+@pytest.mark.django_db
+def test_item_writes_keep_total_in_sync(make_product, dealer):
+    product = make_product()
+    order = Order.objects.create(dealer=dealer)
+
+    item = OrderItem.objects.create(order=order, product=product, quantity=2, unit_price=100)
+    OrderItem.objects.create(order=order, product=product, quantity=1, unit_price=50)
+    assert _total(order) == Decimal("250.00")
+
+    item = OrderItem.objects.get(pk=item.pk)
+    item.quantity = 5
+    item.save()
+    assert _total(order) == Decimal("550.00")
+
+    item.delete()
+    assert _total(order) == Decimal("50.00")
+
+
+@pytest.mark.django_db
+def test_moving_item_between_orders(make_product, dealer):
+    product = make_product()
+    first, second = Order.objects.create(dealer=dealer), Order.objects.create(dealer=dealer)
+    item = OrderItem.objects.create(order=first, product=product, quantity=1, unit_price=10)
+
+    item.order = second
+    item.save()
+
+    assert _total(first) == Decimal("0.00")
+    assert _total(second) == Decimal("10.00")
+
+
+@pytest.mark.django_db
+def test_recalculate_and_reconcile(make_product, dealer):
+    product = make_product()
+    orders = [Order.objects.create(dealer=dealer) for _ in range(3)]
+    OrderItem.objects.bulk_create(
+        [
+            OrderItem(order=o, product=product, quantity=1, unit_price=10, line_total=10)
+            for o in orders
+        ]
+    )
+    assert _total(orders[0]) == Decimal("0.00")
+
+    recalculate_order_totals([orders[0].pk])
+    assert _total(orders[0]) == Decimal("10.00")
+
+    call_command("reconcile_order_totals", batch_size=1)
+    assert [_total(o) for o in orders] == [Decimal("10.00")] * 3
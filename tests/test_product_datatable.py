@@ -0,0 +1,40 @@
+import pytest
+from django.urls import reverse
+
+from inventory.models import Warehouse
+
+
+def _draw(client, **params):
+    query = {"draw": 1, "start": 0, "length": 10, **params}
+    return client.get(reverse("ajax_product_list_data"), query)
+
+
+@pytest.mark.django_db
+def test_page_is_served_with_constant_queries(client, make_product, django_assert_num_queries):
+    for n in range(12):
+        make_product(product_name=f"Pad {n}")
+
+    # One (cached) count serves both totals when unfiltered, plus one page
+    # query with the warehouse joined.
+    with django_assert_num_queries(2):
+        response = _draw(client, **{"order[0][column]": 3, "order[0][dir]": "desc"})
+
+    data = response.json()
+    assert data["recordsTotal"] == 12
+    assert len(data["data"]) == 10
+    names = [row["Warehouse"] for row in data["data"]]
+    assert names == sorted(names, reverse=True)
+
+
+@pytest.mark.django_db
+def test_rows_render_escaped_name_and_links(client, make_product):
+    product = make_product(product_name='Pad "<b>"', stock=0)
+
+    row = _draw(client).json()["data"][0]
+
+    assert row["Status"].endswith("Inactive</span>")
+    assert row["Warehouse"] == Warehouse.objects.get(products=product).warehouse_name
+    assert reverse("edit_product", args=[product.pk]) in row["Action"]
+    assert reverse("delete_product", args=[product.pk]) in row["Action"]
+    assert 'data-product-name="Pad &quot;&lt;b&gt;&quot;"' in row["Action"]
+    assert row["Image"] == ""
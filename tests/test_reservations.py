@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from inventory.models import Inventory, Order, OrderItem, StockReservation
+from inventory.order_services import InsufficientStock, confirm_order
+from inventory.reservations import available_quantities, hold_items
+
+
+def _draft(dealer, product, quantity):
+    order = Order.objects.create(dealer=dealer)
+    item = OrderItem.objects.create(order=order, product=product, quantity=quantity, unit_price=10)
+    return order, item
+
+
+@pytest.mark.django_db
+def test_holds_reduce_availability(make_product, dealer):
+    product = make_product(stock=10)
+    _, first = _draft(dealer, product, 6)
+    _, second = _draft(dealer, product, 6)
+
+    assert hold_items([first]) == {first.pk}
+    assert hold_items([second]) == set()  # only 4 left unheld
+    assert available_quantities([product.pk]) == {product.pk: 4}
+
+
+@pytest.mark.django_db
+def test_confirm_respects_other_orders_holds(make_product, dealer):
+    product = make_product(stock=10)
+    held_order, held_item = _draft(dealer, product, 7)
+    hold_items([held_item])
+    other_order, _ = _draft(dealer, product, 5)
+
+    with pytest.raises(InsufficientStock) as excinfo:
+        confirm_order(other_order.pk)
+    assert excinfo.value.details[0]["available"] == 3
+
+    confirm_order(held_order.pk)
+    assert Inventory.objects.get(product=product).quantity == 3
+    assert not StockReservation.objects.exists()
+
+
+@pytest.mark.django_db
+def test_api_item_create_places_hold(make_product, dealer):
+    product = make_product(stock=10)
+    order = Order.objects.create(dealer=dealer)
+
+    APIClient().post(
+        reverse("orderitem-list"),
+        {"order": order.pk, "product": product.pk, "quantity": 4, "unit_price": "10.00"},
+        format="json",
+    )
+
+    response = APIClient().get(reverse("inventory-detail", args=[product.inventory.pk]))
+    assert response.data["quantity"] == 10
+    assert response.data["available"] == 6
+
+
+@pytest.mark.django_db
+def test_sweeper_releases_expired_holds(make_product, dealer):
+    product = make_product(stock=10)
+    items = [_draft(dealer, product, 1)[1] for _ in range(5)]
+    hold_items(items)
+    StockReservation.objects.filter(order_item__in=items[:3]).update(
+        expires_at=timezone.now() - timedelta(minutes=1)
+    )
+
+    assert available_quantities([product.pk]) == {product.pk: 8}
+    call_command("release_expired_reservations", batch_size=2)
+    assert StockReservation.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_api_item_update_reholds_only_the_change(make_product, dealer):
+    product = make_product(stock=10)
+    _, item = _draft(dealer, product, 6)
+    hold_items([item])
+    _, other = _draft(dealer, product, 3)
+    hold_items([other])
+    url = reverse("orderitem-detail", args=[item.pk])
+
+    # 1 unit is free: growing by 2 keeps the previous hold of 6.
+    assert APIClient().patch(url, {"quantity": 8}, format="json").status_code == 200
+    assert StockReservation.objects.get(order_item=item).quantity == 6
+
+    APIClient().patch(url, {"quantity": 7}, format="json")
+    assert StockReservation.objects.get(order_item=item).quantity == 7
+
+    APIClient().patch(url, {"quantity": 2}, format="json")
+    assert StockReservation.objects.get(order_item=item).quantity == 2
+    assert available_quantities([product.pk]) == {product.pk: 5}
+
+
+@pytest.mark.django_db
+def test_api_item_delete_releases_hold(make_product, dealer):
+    product = make_product(stock=10)
+    _, item = _draft(dealer, product, 6)
+    hold_items([item])
+
+    response = APIClient().delete(reverse("orderitem-detail", args=[item.pk]))
+
+    assert response.status_code == 204
+    assert available_quantities([product.pk]) == {product.pk: 10}
@@ -0,0 +1,129 @@
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from inventory.models import DailyOrderRollup, DailySalesRollup, Order, OrderItem
+from inventory.order_services import confirm_order, deliver_order
+
+
+def _order(dealer, lines):
+    order = Order.objects.create(dealer=dealer)
+    for product, quantity in lines:
+        OrderItem.objects.create(order=order, product=product, quantity=quantity, unit_price=10)
+    return order
+
+
+def _snapshot():
+    return sorted(
+        DailySalesRollup.objects.filter(order_count__gt=0).values_list(
+            "day", "dealer_id", "product_id", "status", "revenue", "quantity", "order_count"
+        )
+    ) + sorted(
+        DailyOrderRollup.objects.filter(order_count__gt=0).values_list(
+            "day", "dealer_id", "status", "order_count"
+        )
+    )
+
+
+@pytest.mark.django_db
+def test_transitions_move_sales_between_statuses(make_product, dealer):
+    a, b = make_product(), make_product()
+    first = _order(dealer, [(a, 2), (b, 1)])
+    second = _order(dealer, [(a, 3)])
+    _order(dealer, [(a, 100)])  # drafts are never rolled up
+
+    confirm_order(first.pk)
+    confirm_order(second.pk)
+    deliver_order(first.pk)
+
+    confirmed = DailySalesRollup.objects.get(product=a, status="confirmed")
+    delivered = DailySalesRollup.objects.get(product=a, status="delivered")
+    assert (confirmed.quantity, confirmed.order_count, confirmed.revenue) == (3, 1, Decimal("30.00"))
+    assert (delivered.quantity, delivered.order_count, delivered.revenue) == (2, 1, Decimal("20.00"))
+
+
+@pytest.mark.django_db
+def test_backfill_matches_incremental_rollups(make_product, dealer):
+    a, b = make_product(), make_product()
+    for lines in ([(a, 1)], [(a, 2), (b, 5)], [(b, 1)]):
+        confirm_order(_order(dealer, lines).pk)
+    incremental = _snapshot()
+
+    DailySalesRollup.objects.all().delete()
+    DailyOrderRollup.objects.all().delete()
+    call_command("backfill_sales_rollups")
+
+    assert _snapshot() == incremental
+
+
+@pytest.mark.django_db
+def test_sales_report_reads_rollups(staff_api_client, make_product, dealer, django_assert_num_queries):
+    a, b = make_product(), make_product()
+    confirm_order(_order(dealer, [(a, 1), (b, 2)]).pk)
+    confirm_order(_order(dealer, [(a, 4)]).pk)
+
+    with django_assert_num_queries(1):
+        response = staff_api_client.get(reverse("sales-report"), {"group_by": "product"})
+
+    assert response.status_code == 200
+    assert response.data["results"] == [
+        {"product": a.pk, "revenue": Decimal("50.00"), "quantity": 5, "order_count": 2},
+        {"product": b.pk, "revenue": Decimal("20.00"), "quantity": 2, "order_count": 1},
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("group_by", ["day", "dealer", "status"])
+def test_sales_report_counts_multi_product_orders_once(staff_api_client, make_product, dealer, group_by):
+    a, b = make_product(), make_product()
+    confirm_order(_order(dealer, [(a, 1), (b, 2)]).pk)
+    confirm_order(_order(dealer, [(a, 4)]).pk)
+
+    response = staff_api_client.get(reverse("sales-report"), {"group_by": group_by})
+
+    assert response.status_code == 200
+    (row,) = response.data["results"]
+    assert (row["revenue"], row["quantity"], row["order_count"]) == (Decimal("70.00"), 7, 2)
+
+
+@pytest.mark.django_db
+def test_sales_report_order_counts_follow_status(staff_api_client, make_product, dealer):
+    a, b = make_product(), make_product()
+    first = _order(dealer, [(a, 1), (b, 2)])
+    confirm_order(first.pk)
+    confirm_order(_order(dealer, [(a, 4), (b, 1)]).pk)
+    deliver_order(first.pk)
+
+    response = staff_api_client.get(reverse("sales-report"), {"group_by": "dealer,status"})
+
+    assert [(r["status"], r["order_count"]) for r in response.data["results"]] == [
+        ("confirmed", 1),
+        ("delivered", 1),
+    ]
+
+
+@pytest.mark.django_db
+def test_lines_of_confirmed_orders_are_locked(staff_api_client, make_product, dealer):
+    a, b = make_product(), make_product()
+    order = _order(dealer, [(a, 2)])
+    line = order.items.get()
+    confirm_order(order.pk)
+
+    added = staff_api_client.post(
+        reverse("orderitem-list"),
+        {"order": order.pk, "product": b.pk, "quantity": 5, "unit_price": "10.00"},
+        format="json",
+    )
+    changed = staff_api_client.patch(
+        reverse("orderitem-detail", args=[line.pk]), {"quantity": 9}, format="json"
+    )
+    removed = staff_api_client.delete(reverse("orderitem-detail", args=[line.pk]))
+    assert [r.status_code for r in (added, changed, removed)] == [400, 400, 400]
+
+    assert staff_api_client.post(reverse("order-deliver", args=[order.pk])).status_code == 200
+    delivered = DailySalesRollup.objects.get(product=a, status="delivered")
+    assert (delivered.quantity, delivered.revenue) == (2, Decimal("20.00"))
+    assert not DailySalesRollup.objects.filter(product=b, order_count__gt=0).exists()
+    assert not DailySalesRollup.objects.filter(status="confirmed", order_count__gt=0).exists()
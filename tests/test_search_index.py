@@ -0,0 +1,109 @@
+import pytest
+from django.contrib.auth.models import Group, User
+from django.core.management import call_command
+from django.urls import reverse
+
+from inventory import search
+from inventory.models import Category, Product, SearchDocument, Supplier
+
+
+def _search(model, query):
+    return set(search.search(model.objects.all(), query).values_list("pk", flat=True))
+
+
+def _draw(client, name, query):
+    response = client.get(
+        reverse(name), {"draw": 1, "start": 0, "length": 10, "search[value]": query}
+    )
+    return response.json()
+
+
+@pytest.mark.django_db
+def test_index_follows_saves_and_deletes(make_product):
+    pad = make_product(product_name="Brake Pad")
+    disc = make_product(product_name="Brake Disc")
+
+    assert _search(Product, "bra") == {pad.pk, disc.pk}
+    assert _search(Product, "brake pa") == {pad.pk}
+    assert _search(Product, "ake") == set()
+
+    pad.product_name = "Clutch Plate"
+    pad.save()
+    assert _search(Product, "brake") == {disc.pk}
+    assert _search(Product, "clu") == {pad.pk}
+
+    disc.delete()
+    assert not SearchDocument.objects.filter(label="inventory.product", object_id=disc.pk).exists()
+
+
+@pytest.mark.django_db
+def test_login_does_not_reindex_the_user(client):
+    user = User.objects.create_user("alice", password="x")
+    document = SearchDocument.objects.get(label="auth.user", object_id=user.pk)
+
+    assert client.login(username="alice", password="x")
+
+    assert SearchDocument.objects.get(label="auth.user", object_id=user.pk).pk == document.pk
+    user.first_name = "Alicia"
+    user.save(update_fields=["first_name"])
+    assert _search(User, "alicia") == {user.pk}
+
+
+@pytest.mark.django_db
+def test_rebuild_restores_documents_missed_by_bulk_writes(make_product):
+    product = make_product(product_name="Oil Filter")
+    Product.objects.filter(pk=product.pk).update(product_name="Air Filter")
+    assert _search(Product, "air") == set()
+
+    call_command("rebuild_search_index")
+
+    assert _search(Product, "air") == {product.pk}
+
+
+@pytest.mark.django_db
+def test_product_datatable_uses_the_index(client, make_product):
+    make_product(product_name="Brake Pad")
+    make_product(product_name="Wiper Blade")
+
+    data = _draw(client, "ajax_product_list_data", "wip")
+
+    assert data["recordsFiltered"] == 1
+    assert [row["Name"] for row in data["data"]] == ["Wiper Blade"]
+
+
+@pytest.mark.django_db
+def test_supplier_datatable_matches_email_prefix(client):
+    Supplier.objects.create(supplier_name="Acme", phone_number="98765", email="sales@acme.in")
+    Supplier.objects.create(supplier_name="Bolt", phone_number="12345", is_active=False)
+
+    assert [r["supplier_name"] for r in _draw(client, "ajax_supplier_list_data", "sale")["data"]] == ["Acme"]
+    assert [r["supplier_name"] for r in _draw(client, "ajax_supplier_list_data", "123")["data"]] == ["Bolt"]
+    assert [r["supplier_name"] for r in _draw(client, "ajax_supplier_list_data", "inactive")["data"]] == ["Bolt"]
+
+
+@pytest.mark.django_db
+def test_category_datatable_matches_sub_category_names(client):
+    brakes = Category.objects.create(category_name="Brakes")
+    Category.objects.create(category_name="Drum Shoes", parent_category=brakes)
+    Category.objects.create(category_name="Engine")
+
+    data = _draw(client, "ajax_category_list_data", "drum")
+
+    assert data["recordsFiltered"] == 1
+
+
+@pytest.mark.django_db
+def test_user_documents_follow_group_membership():
+    user = User.objects.create(username="ravi", email="ravi@example.com")
+    group = Group.objects.create(name="Warehouse Staff")
+
+    user.groups.add(group)
+    assert _search(User, "wareh") == {user.pk}
+
+    group.name = "Dispatch"
+    group.save()
+    assert _search(User, "dispatch") == {user.pk}
+
+    group.user_set.clear()
+    assert _search(User, "dispatch") == set()
+    assert _search(User, "rav") == {user.pk}
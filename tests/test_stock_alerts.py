@@ -0,0 +1,92 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from dashboard.models import Notification
+from inventory import stock_alerts
+from inventory.models import Category, Order, OrderItem
+
+pytestmark = pytest.mark.django_db
+
+
+def alerts():
+    return sorted(
+        Notification.objects.filter(category="product").values_list("object_id", "notification_type")
+    )
+
+
+def test_confirming_a_big_order_is_one_batched_evaluation(
+    make_product, dealer, django_capture_on_commit_callbacks, django_assert_max_num_queries
+):
+    category = Category.objects.create(category_name="Filters", reorder_level=5)
+    products = [make_product(stock=10, category=category) for _ in range(30)]
+    order = Order.objects.create(dealer=dealer)
+    for n, product in enumerate(products):
+        # Leaves 10, 5 or 0 in stock.
+        OrderItem.objects.create(order=order, product=product, quantity=(0, 5, 10)[n % 3] or 1, unit_price=1)
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        response = APIClient().post(reverse("order-confirm", args=[order.pk]))
+    assert response.status_code == 200
+
+    # Stock alerts, audit flush and notification fan-out, whatever the size.
+    with django_assert_max_num_queries(8):
+        for callback in callbacks:
+            callback()
+
+    expected = sorted(
+        (p.pk, "out_of_stock" if n % 3 == 2 else "low_stock")
+        for n, p in enumerate(products)
+        if n % 3
+    )
+    assert alerts() == expected
+
+
+def test_alerts_are_deduplicated_within_the_window(make_product, settings):
+    product = make_product(stock=3, reorder_level=5)
+
+    assert len(stock_alerts.evaluate([product.pk])) == 1
+    assert stock_alerts.evaluate([product.pk]) == []
+
+    settings.STOCK_ALERT_WINDOW = 0
+    assert len(stock_alerts.evaluate([product.pk])) == 1
+
+
+def test_reorder_level_falls_back_to_category_then_parent(make_product):
+    parent = Category.objects.create(category_name="Brakes", reorder_level=8)
+    child = Category.objects.create(category_name="Pads", parent_category=parent)
+    overridden = Category.objects.create(category_name="Discs", parent_category=parent, reorder_level=2)
+    inherits = make_product(stock=7, category=child)
+    own = make_product(stock=7, category=child, reorder_level=6)
+    category_level = make_product(stock=7, category=overridden)
+
+    stock_alerts.evaluate([inherits.pk, own.pk, category_level.pk])
+
+    assert alerts() == [(inherits.pk, "low_stock")]
+
+
+def test_reorder_level_is_inherited_from_any_ancestor(make_product):
+    root = Category.objects.create(category_name="Engine", reorder_level=8)
+    middle = Category.objects.create(category_name="Cooling", parent_category=root)
+    leaf = Category.objects.create(category_name="Hoses", parent_category=middle)
+    low = make_product(stock=7, category=leaf)
+    stocked = make_product(stock=9, category=leaf)
+
+    stock_alerts.evaluate([low.pk, stocked.pk])
+
+    assert alerts() == [(low.pk, "low_stock")]
+
+
+def test_inventory_update_raises_out_of_stock(make_product, django_capture_on_commit_callbacks):
+    inventory = make_product(stock=10).inventory
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = APIClient().patch(
+            reverse("inventory-detail", args=[inventory.pk]), {"quantity": 0}, format="json"
+        )
+
+    assert response.status_code == 200
+    (alert,) = Notification.objects.filter(object_id=inventory.product_id)
+    assert alert.notification_type == "out_of_stock"
+    assert alert.user_id is None
+    assert reverse("view_product", args=[inventory.product_id]) in alert.message
@@ -0,0 +1,65 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from inventory import ledger
+from inventory.models import Inventory, Order, OrderItem, Product, StockMovement
+from inventory.order_services import confirm_order
+
+
+def _balances(product):
+    product.refresh_from_db()
+    return product.stock, Inventory.objects.get(product=product).quantity
+
+
+@pytest.mark.django_db
+def test_product_stock_and_inventory_move_together(make_product, dealer):
+    product = make_product(stock=10)
+    order = Order.objects.create(dealer=dealer)
+    OrderItem.objects.create(order=order, product=product, quantity=4, unit_price=10)
+
+    confirm_order(order.pk)
+    assert _balances(product) == (6, 6)
+
+    product.stock = 9  # edited through the product form / API
+    product.save()
+    assert _balances(product) == (9, 9)
+
+    response = APIClient().patch(
+        reverse("inventory-detail", args=[product.inventory.pk]), {"quantity": 2}, format="json"
+    )
+    assert response.status_code == 200
+    assert _balances(product) == (2, 2)
+    assert list(
+        StockMovement.objects.filter(product=product).values_list("reason", "delta")
+    ) == [("opening", 10), ("order_confirmed", -4), ("adjustment", 3), ("adjustment", -7)]
+
+
+@pytest.mark.django_db
+def test_post_refuses_negative_balance(make_product):
+    product = make_product(stock=3)
+
+    with pytest.raises(ledger.NegativeBalance):
+        ledger.post({product.pk: -5}, "adjustment")
+
+    assert _balances(product) == (3, 3)
+    assert StockMovement.objects.filter(product=product).count() == 1
+
+
+@pytest.mark.django_db
+def test_rebuild_from_checkpoint_and_tail(make_product):
+    a, b = make_product(stock=10), make_product(stock=5)
+    ledger.post({a.pk: -2, b.pk: 1}, "adjustment")
+    ledger.take_checkpoint()
+    ledger.post({a.pk: -3}, "adjustment")
+
+    # Simulate drift from an out-of-band write.
+    Product.objects.filter(pk=a.pk).update(stock=99)
+    Inventory.objects.filter(product=b).update(quantity=0)
+
+    assert ledger.rebuild_projection(dry_run=True) == {a.pk: 5, b.pk: 6}
+    call_command("rebuild_stock_projection", checkpoint=True)
+    assert _balances(a) == (5, 5)
+    assert _balances(b) == (6, 6)
+    assert ledger.balance(a.pk) == 5
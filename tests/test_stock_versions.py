@@ -0,0 +1,114 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from inventory import ledger
+from inventory.concurrency import StaleWrite
+from inventory.models import Inventory, InventoryAudit, Product
+
+
+@pytest.mark.django_db
+def test_stale_save_is_rejected(make_product):
+    product = make_product(stock=10)
+    first, second = Product.objects.get(pk=product.pk), Product.objects.get(pk=product.pk)
+
+    first.stock = 7
+    first.save()
+    second.stock = 3
+    with pytest.raises(StaleWrite):
+        second.save()
+
+    product.refresh_from_db()
+    assert (product.stock, product.version) == (7, 1)
+
+
+@pytest.mark.django_db
+def test_inventory_put_bumps_version_and_audits(make_product, django_capture_on_commit_callbacks):
+    client = APIClient()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        inventory = make_product(stock=10).inventory
+        response = client.patch(
+            reverse("inventory-detail", args=[inventory.pk]),
+            {"quantity": 15, "note": "recount"},
+            format="json",
+        )
+
+    assert response.status_code == 200
+    assert response.data["version"] == inventory.version + 1
+    assert InventoryAudit.objects.get(note="recount").new_quantity == 15
+
+
+@pytest.mark.django_db
+def test_inventory_put_with_stale_version_conflicts(make_product):
+    inventory = make_product(stock=10).inventory
+    Inventory.objects.filter(pk=inventory.pk).update(version=4)
+
+    response = APIClient().patch(
+        reverse("inventory-detail", args=[inventory.pk]),
+        {"quantity": 15},
+        format="json",
+        HTTP_IF_MATCH="3",
+    )
+
+    assert response.status_code == 409
+    assert response.data["version"] == 4
+    assert Inventory.objects.get(pk=inventory.pk).quantity == 10
+    assert not InventoryAudit.objects.exists()
+
+
+@pytest.mark.django_db
+def test_update_retries_after_losing_a_race(make_product, monkeypatch):
+    inventory = make_product(stock=10).inventory
+    original_post = ledger.post
+    calls = {"n": 0}
+
+    def racing_post(deltas, *args, **kwargs):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            # Another worker sneaks in between our read and our write.
+            original_post({inventory.product_id: 5}, "adjustment")
+        return original_post(deltas, *args, **kwargs)
+
+    monkeypatch.setattr(ledger, "post", racing_post)
+    response = APIClient().patch(
+        reverse("inventory-detail", args=[inventory.pk]), {"quantity": 12}, format="json"
+    )
+
+    assert response.status_code == 200
+    assert calls["n"] == 2
+    assert Inventory.objects.get(pk=inventory.pk).quantity == 12
+
+
+@pytest.mark.django_db
+def test_product_put_below_the_ledger_balance_is_rejected(make_product):
+    product = make_product(stock=10)
+    # The Inventory projection holds less than Product.stock claims.
+    Inventory.objects.filter(product=product).update(quantity=2)
+
+    response = APIClient().patch(
+        reverse("product-detail", args=[product.pk]), {"stock": 1}, format="json"
+    )
+
+    assert response.status_code == 400
+    assert response.data == {"error": "Insufficient stock for some products."}
+    assert Inventory.objects.get(product=product).quantity == 2
+
+
+@pytest.mark.django_db
+def test_inventory_put_below_the_ledger_balance_is_rejected(make_product, monkeypatch):
+    inventory = make_product(stock=10).inventory
+    original_post = ledger.post
+
+    def draining_post(deltas, *args, **kwargs):
+        # Stock taken by a movement that does not bump the version.
+        Inventory.objects.filter(pk=inventory.pk).update(quantity=1)
+        return original_post(deltas, *args, **kwargs)
+
+    monkeypatch.setattr(ledger, "post", draining_post)
+    response = APIClient().patch(
+        reverse("inventory-detail", args=[inventory.pk]), {"quantity": 2}, format="json"
+    )
+
+    assert response.status_code == 400
+    assert response.data == {"error": "Insufficient stock for some products."}